@@ -72,27 +72,18 @@ async def _retrieve_rag_context(task: str, user_id: str):
     """
     Retrieve relevant context via RAG (Phase 3 integration).
     
-    This is a helper function that initializes RAG services
-    and performs semantic search.
+    Uses the process-wide RAGService (services.rag_runtime), whose
+    audit writer and embedding service are drained on worker shutdown.
     """
-    import os
-    from supabase import create_client
-    from services.rag_service import RAGService
-    from services.embedding_service import EmbeddingService
     from services.context_builder import ContextBuilder
+    from services.rag_runtime import get_rag_service
     
-    supabase_url = os.getenv('SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_ANON_KEY')
-    
-    if not supabase_url or not supabase_key:
+    rag_service = get_rag_service()
+    if rag_service is None:
         logger.warning("Supabase credentials not configured, skipping RAG")
         return None
     
-    # Initialize services
-    supabase = create_client(supabase_url, supabase_key)
-    embedding_service = EmbeddingService(supabase, primary_model="openai", fallback_to_local=True)
-    rag_service = RAGService(supabase, embedding_service, similarity_threshold=0.7)
-    context_builder = ContextBuilder(max_tokens=4000)
+    context_builder = ContextBuilder(max_tokens=4000, diversify=True)
     
     # Query for relevant context
     rag_query = f"How to {task}?"
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Phase 3: Embedding Dimensions Backfill
+
+Moves stored embeddings to a reduced size (256/512/1024) by Matryoshka
+truncation, without re-embedding any text. Drives the SQL functions from
+supabase/migrations/20261017_embedding_dimensions.sql in batches, and can
+rewrite a local EmbeddingSegmentStore the same way.
+
+Usage:
+    python scripts/backfill_embedding_dimensions.py --dimensions 512
+    python scripts/backfill_embedding_dimensions.py --dimensions 512 --switch
+    python scripts/backfill_embedding_dimensions.py --dimensions 512 \\
+        --segment-store /var/lib/orion/embeddings --skip-supabase
+
+Run without --switch first (online, resumable), then with --switch in a
+quiet period, then deploy with EMBEDDING_DIMENSIONS set to the new size.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+
+def run_batches(supabase, function: str, dimensions: int, batch_size: int) -> int:
+    """Call a batch backfill RPC until it reports no more rows."""
+    total = 0
+    while True:
+        start = time.time()
+        count = supabase.rpc(function, {'target': dimensions, 'batch_size': batch_size}).execute().data or 0
+        total += count
+        print(f"   {function}: +{count} rows ({total} total, {time.time() - start:.1f}s)")
+        if count < batch_size:
+            return total
+
+
+def rewrite_segment_store(path: str, dimensions: int, batch_rows: int = 50000) -> int:
+    """
+    Rewrite a segment store with truncated vectors (live rows only).
+
+    The new store is built beside the old one and swapped in; the old
+    directory is kept as <path>.<old dims>d until removed by hand.
+    """
+    from services.embedding_store import EmbeddingSegmentStore
+    from utils.vector_utils import truncate_embeddings
+
+    source = EmbeddingSegmentStore(path)
+    if source.dimensions is None or source.dimensions == dimensions:
+        print(f"   {path}: nothing to do ({source.dimensions}d)")
+        return 0
+
+    staging = f"{path}.{dimensions}d-staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    target = EmbeddingSegmentStore(staging, max_segments=1_000_000)
+    written = 0
+    for vectors, rows, live in source.segments():
+        for start in range(0, len(rows), batch_rows):
+            keep = [i for i in range(start, min(start + batch_rows, len(rows))) if live[i]]
+            if not keep:
+                continue
+            reduced = truncate_embeddings(vectors[keep], dimensions)
+            target.append([{**row, 'embedding': vec} for row, vec in zip(rows.fetch(keep), reduced)])
+            written += len(keep)
+    target.compact()
+
+    backup = f"{path}.{source.dimensions}d"
+    os.replace(path, backup)
+    os.replace(staging, path)
+    print(f"   {path}: {written} rows rewritten at {dimensions}d (previous store kept at {backup})")
+    return written
+
+
+def main() -> int:
+    from utils.embedding_dimensions import SUPPORTED_DIMENSIONS
+
+    parser = argparse.ArgumentParser(description="Backfill reduced-dimension embeddings")
+    parser.add_argument('--dimensions', type=int, required=True, choices=SUPPORTED_DIMENSIONS)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--switch', action='store_true',
+                        help="Swap document_chunks.embedding to the reduced vectors")
+    parser.add_argument('--segment-store', action='append', default=[],
+                        help="Local EmbeddingSegmentStore directory to rewrite (repeatable)")
+    parser.add_argument('--skip-supabase', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PHASE 3: Embedding Dimensions Backfill → {args.dimensions}d")
+    print("=" * 60)
+
+    if not args.skip_supabase:
+        supabase_url = os.getenv('SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        if not supabase_url or not supabase_key:
+            print("\nERROR: Missing Supabase credentials")
+            print("Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (or pass --skip-supabase)")
+            return 1
+
+        from supabase import create_client
+        supabase = create_client(supabase_url, supabase_key)
+
+        print("\n📦 embedding_cache")
+        run_batches(supabase, 'backfill_embedding_cache', args.dimensions, args.batch_size)
+        print("\n📄 document_chunks")
+        run_batches(supabase, 'backfill_chunk_embeddings', args.dimensions, args.batch_size)
+        if args.switch:
+            print("\n🔀 Switching document_chunks.embedding (rebuilds indexes)")
+            supabase.rpc('switch_chunk_embedding_dimensions', {'target': args.dimensions}).execute()
+
+    for path in args.segment_store:
+        print("\n💾 Segment store")
+        rewrite_segment_store(path, args.dimensions)
+
+    print(f"\n✅ Done. Deploy with EMBEDDING_DIMENSIONS={args.dimensions}"
+          + ("" if args.switch or args.skip_supabase else " after running again with --switch"))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,13 +2,21 @@
 """
 Phase 3: Document Ingestion CLI
 
-Command-line tool for batch document ingestion.
-Usage: python scripts/ingest_documents.py
+Ingests a directory tree or glob of text files, resumably: every
+ingested file is checkpointed in a local manifest, so re-runs skip
+unchanged files and an interrupted run continues where it stopped.
+
+Usage:
+  python scripts/ingest_documents.py docs/ 'wiki/**/*.md' --created-by <user id>
+      [--manifest .ingest-manifest.jsonl] [--batch-size 128]
+      [--read-concurrency 32] [--chunk-workers N] [--visibility public]
+      [--source-id <stable tree name>]
 """
 
 import os
 import sys
 import asyncio
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -19,107 +27,107 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv()
 
 
-def progress_callback(current: int, total: int, title: str):
-    """Print progress for batch ingestion."""
-    percent = (current / total) * 100
-    print(f"[{current}/{total}] ({percent:.0f}%) {title}")
+def print_progress(report: dict):
+    """Print running totals and throughput after each batch."""
+    done = report['ingested'] + report['updated'] + report['unchanged'] + report['failed']
+    hit_rate = 'n/a' if report['cache_hit_rate'] is None else f"{report['cache_hit_rate']:.0%}"
+    print(
+        f"[{done}/{report['files']}] {report['ingested']} new, {report['updated']} updated, "
+        f"{report['unchanged']} unchanged, {report['failed']} failed | "
+        f"{report['docs_per_sec']:.1f} docs/s, {report['chunks_per_sec']:.1f} chunks/s, "
+        f"cache hit rate {hit_rate}"
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest a directory tree or glob of documents")
+    parser.add_argument('sources', nargs='+', help="Files, directories, or globs ('docs/**/*.md')")
+    parser.add_argument('--created-by', required=True, help="User ID recorded as the documents' creator")
+    parser.add_argument('--manifest', default='.ingest-manifest.jsonl', help="Resumable checkpoint file")
+    parser.add_argument('--ext', nargs='+', default=None, help="File extensions (default: .md .markdown .txt .rst)")
+    parser.add_argument('--document-type', default='guide')
+    parser.add_argument('--visibility', default='private', choices=['private', 'team', 'org', 'public'])
+    parser.add_argument('--team-id', default=None)
+    parser.add_argument('--source-id', default=None,
+                        help="Stable name of the tree for document keys (default: absolute paths)")
+    parser.add_argument('--batch-size', type=int, default=128, help="New files per ingestion batch")
+    parser.add_argument('--read-concurrency', type=int, default=32, help="Files read at once")
+    parser.add_argument('--chunk-workers', type=int, default=0,
+                        help="Chunking processes (0 = chunk in the main process)")
+    return parser.parse_args(argv)
 
 
-async def ingest_sample_documents():
-    """Ingest sample documents for testing."""
+async def ingest_directory(args: argparse.Namespace) -> bool:
+    """Ingest new and changed files under args.sources."""
     print("="*60)
     print("PHASE 3: Document Ingestion")
     print("="*60)
-    
+
     # Check environment
     supabase_url = os.getenv('SUPABASE_URL')
     supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')  # Use service role for ingestion
-    
+
     if not supabase_url or not supabase_key:
         print("\nERROR: Missing Supabase credentials")
         print("Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
         return False
-    
+
     # Initialize services
     from supabase import create_client
+    from services.directory_ingestion import DirectoryIngestor
     from services.document_ingestion import DocumentIngestionService
-    
+    from services.ingest_manifest import IngestManifest
+    from services.parallel_chunker import ParallelChunker
+    from utils.file_discovery import DEFAULT_EXTENSIONS
+
     supabase = create_client(supabase_url, supabase_key)
     ingestion_service = DocumentIngestionService(supabase)
-    
-    # Sample documents
-    documents = [
-        {
-            'title': 'Python Async Best Practices',
-            'content': '''
-            Python async programming allows concurrent execution of I/O-bound tasks.
-            
-            Key concepts:
-            1. async/await syntax for defining coroutines
-            2. asyncio.create_task() for concurrent execution
-            3. asyncio.gather() for waiting on multiple tasks
-            
-            Best practices:
-            - Use async for I/O operations (database, API calls)
-            - Avoid blocking calls inside async functions
-            - Handle exceptions with try/except in coroutines
-            ''',
-            'created_by': '00000000-0000-0000-0000-000000000000',  # Placeholder
-            'document_type': 'guide',
-            'visibility': 'public'
-        },
-        {
-            'title': 'Supabase RLS Patterns',
-            'content': '''
-            Row Level Security (RLS) in Supabase enforces permissions at the database level.
-            
-            Common patterns:
-            1. Owner-only: WHERE created_by = auth.uid()
-            2. Team-based: WHERE team_id IN (SELECT team_id FROM team_members WHERE user_id = auth.uid())
-            3. Public: WHERE visibility = 'public'
-            
-            Security notes:
-            - Always enable RLS on user-facing tables
-            - Test with actual user JWTs, not service_role
-            - Use EXPLAIN to check RLS query performance
-            ''',
-            'created_by': '00000000-0000-0000-0000-000000000000',
-            'document_type': 'guide',
-            'visibility': 'public'
-        }
-    ]
-    
-    print(f"\nIngesting {len(documents)} sample documents...")
-    
-    # Ingest batch
-    stats = await ingestion_service.ingest_documents_batch(
-        documents,
-        progress_callback=progress_callback
-    )
-    
+    parallel_chunker = ParallelChunker(ingestion_service.chunker, workers=args.chunk_workers) \
+        if args.chunk_workers else None
+
+    with IngestManifest(args.manifest) as manifest:
+        print(f"\nManifest: {args.manifest} ({len(manifest)} files ingested previously)")
+        ingestor = DirectoryIngestor(
+            ingestion_service, manifest, args.created_by,
+            document_type=args.document_type, visibility=args.visibility, team_id=args.team_id,
+            batch_size=args.batch_size, read_concurrency=args.read_concurrency,
+            parallel_chunker=parallel_chunker, on_progress=print_progress,
+            source_id=args.source_id
+        )
+        try:
+            report = await ingestor.run(args.sources, args.ext or DEFAULT_EXTENSIONS)
+        finally:
+            if parallel_chunker:
+                parallel_chunker.close()
+            await ingestion_service.embedding_service.aclose()
+        manifest.compact()
+
     # Print results
     print("\n" + "="*60)
     print("INGESTION COMPLETE")
     print("="*60)
-    print(f"\nTotal documents: {stats['total_documents']}")
-    print(f"Successful: {stats['successful']}")
-    print(f"Failed: {stats['failed']}")
-    print(f"Total chunks: {stats['total_chunks']}")
-    print(f"Total embeddings: {stats['total_embeddings']}")
-    
-    if stats['errors']:
+    print(f"\nFiles found: {report['files']}")
+    print(f"New: {report['ingested']}  Updated: {report['updated']}  "
+          f"Unchanged: {report['unchanged']}  Failed: {report['failed']}")
+    print(f"Chunks: {report['chunks']}  Embeddings generated: {report['embeddings']}")
+    print(f"Elapsed: {report['elapsed_seconds']:.1f}s  "
+          f"({report['docs_per_sec']:.1f} docs/s, {report['chunks_per_sec']:.1f} chunks/s)")
+    if report['cache_hit_rate'] is not None:
+        print(f"Embedding cache hit rate: {report['cache_hit_rate']:.1%}")
+
+    if report['errors']:
         print("\nErrors:")
-        for error in stats['errors']:
-            print(f"  - {error['title']}: {error['error']}")
-    
-    return stats['failed'] == 0
+        for error in report['errors']:
+            print(f"  - {error['path']}: {error['error']}")
+
+    return report['failed'] == 0
 
 
 def main():
     """Run document ingestion."""
-    loop = asyncio.get_event_loop()
-    success = loop.run_until_complete(ingest_sample_documents())
-    
+    args = parse_args()
+    success = asyncio.run(ingest_directory(args))
+
     return 0 if success else 1
 
 
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Phase 3: Offline RAG Benchmarks
+
+Runs the chunking, ingestion, RAG query and vector retrieval benchmarks
+at several corpus sizes with no network access (in-memory Supabase,
+deterministic hashing embedder), writes machine-readable JSON, and
+optionally fails on regressions against a baseline results file.
+
+Text-path tiers (chunk, embed, write, query) run up to --text-cap
+chunks; larger tiers run the retrieval benchmarks on synthetic vectors.
+
+Usage:
+  python scripts/run_benchmarks.py [--sizes 1000 10000 100000 1000000]
+      [--output benchmark_results.json] [--baseline previous.json]
+      [--tolerance 0.2] [--chunk-workers N] [--text-cap 100000]
+"""
+
+import gc
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline RAG pipeline benchmarks")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000, 1000000],
+                        help="Corpus sizes in chunks")
+    parser.add_argument('--dimensions', type=int, default=256, choices=[256, 512, 1024, 1536])
+    parser.add_argument('--queries', type=int, default=200, help="Queries per tier")
+    parser.add_argument('--text-cap', type=int, default=100000,
+                        help="Largest tier that runs the text path (chunk, embed, ingest, query)")
+    parser.add_argument('--chunk-workers', type=int, default=0,
+                        help="Also benchmark ParallelChunker with this many processes")
+    parser.add_argument('--no-quantized', action='store_true', help="Skip quantized retrieval")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="Results file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative slowdown before a metric counts as regressed")
+    return parser.parse_args(argv)
+
+
+async def run_text_tier(size: int, args: argparse.Namespace) -> dict:
+    """Chunking, ingestion and RAG benchmarks for a corpus of ~size chunks."""
+    from services.benchmark import (
+        ServiceStack, SyntheticCorpus, bench_chunking, bench_ingest, bench_rag
+    )
+    from services.document_chunker import DocumentChunker
+
+    chunker = DocumentChunker()
+    corpus = SyntheticCorpus(seed=args.seed)
+    documents = corpus.documents_for_chunks(size, chunker)
+    stack = ServiceStack.build(chunker, dimensions=args.dimensions)
+    result = {'chunking': bench_chunking(documents, chunker, args.chunk_workers)}
+    result['ingest'] = await bench_ingest(stack, documents)
+    queries = corpus.queries(documents, max(1, args.queries // 2))
+    result['rag'] = await bench_rag(stack, queries, args.queries, seed=args.seed)
+    await stack.embedding_service.aclose()
+    return result
+
+
+def run_vector_tier(size: int, args: argparse.Namespace) -> dict:
+    """Retrieval benchmarks on size synthetic vectors."""
+    from services.benchmark import SyntheticCorpus, bench_retrieval
+
+    corpus = SyntheticCorpus(seed=args.seed)
+    vectors = corpus.vectors(size, args.dimensions)
+    queries = corpus.vector_queries(vectors, args.queries)
+    return bench_retrieval(vectors, queries, quantized=not args.no_quantized)
+
+
+def print_tier(tier: dict):
+    print(f"\n--- {tier['chunks']} chunks ---")
+    if 'ingest' in tier:
+        ingest, rag = tier['ingest'], tier['rag']
+        print(f"  chunking: {tier['chunking']['chunks_per_sec']:.0f} chunks/s")
+        print(f"  ingest:   {ingest['chunks_per_sec']:.0f} chunks/s, "
+              f"reingest cache hit rate {ingest.get('reingest', {}).get('cache_hit_rate', 0):.0%}")
+        print(f"  rag:      p50 {rag['query']['p50_ms']:.2f}ms, p99 {rag['query']['p99_ms']:.2f}ms, "
+              f"result cache {rag['result_cache_hit_rate']:.0%}, recall@10 {rag['recall_at_10']:.3f}")
+    retrieval = tier['retrieval']
+    print(f"  exact:    p50 {retrieval['exact']['p50_ms']:.2f}ms, p99 {retrieval['exact']['p99_ms']:.2f}ms")
+    for name, value in retrieval['ivf'].items():
+        if name.startswith('nprobe_'):
+            print(f"  ivf {name}: p50 {value['p50_ms']:.2f}ms, recall@10 {value['recall_at_10']:.3f}")
+    for mode in ('binary', 'int8'):
+        value = retrieval.get('quantized', {}).get(mode)
+        if value:
+            print(f"  {mode}:   p50 {value['p50_ms']:.2f}ms, recall@10 {value['recall_at_10']:.3f}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from services.benchmark import compare_results, write_results
+
+    print("=" * 60)
+    print("OFFLINE RAG BENCHMARKS")
+    print("=" * 60)
+    tiers = []
+    for size in sorted(args.sizes):
+        tier = {'chunks': size}
+        if size <= args.text_cap:
+            tier.update(asyncio.run(run_text_tier(size, args)))
+        tier['retrieval'] = run_vector_tier(size, args)
+        gc.collect()
+        print_tier(tier)
+        tiers.append(tier)
+
+    config = {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')}
+    write_results(args.output, config, tiers)
+    print(f"\nResults written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.output) as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print(f"{len(regressions)} regression(s) vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
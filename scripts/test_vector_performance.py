@@ -7,15 +7,27 @@ Validates:
 - Query time <100ms for top-10 results
 - Recall rate >90% vs brute-force
 
+Also benchmarks quantized search offline (no Supabase needed):
+- int8 / binary first pass + exact float32 rescoring
+- recall@10 and latency vs brute force, memory per vector
+
 Risk: MEDIUM - Affects RAG query responsiveness
+
+Usage:
+    python scripts/test_vector_performance.py [num_vectors] [dimensions]
 """
 
 import os
 import sys
 import time
 import random
+import tempfile
+from pathlib import Path
 from typing import List
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 def generate_random_vector(dimensions: int = 1536) -> List[float]:
     """Generate random normalized vector."""
     vector = [random.gauss(0, 1) for _ in range(dimensions)]
@@ -176,12 +188,82 @@ def test_index_build_time():
     print("   - Build during off-peak hours")
     print("   - Consider lower ef_construction for faster builds")
 
+def clustered_vectors(num_vectors: int, dimensions: int, seed: int = 0):
+    """Unit vectors around topic centroids (closer to real embeddings than noise)."""
+    import numpy as np
+    from utils.vector_utils import normalize_matrix
+
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, num_vectors // 100), dimensions))
+    assignment = rng.integers(0, len(centers), size=num_vectors)
+    noise = rng.normal(scale=0.6, size=(num_vectors, dimensions))
+    return normalize_matrix((centers[assignment] + noise).astype(np.float32))
+
+
+def test_quantized_search(num_vectors: int = 20000, dimensions: int = 1536,
+                          num_queries: int = 50, k: int = 10) -> bool:
+    """Recall and latency of quantized search + rescoring vs brute force."""
+    import numpy as np
+    from services.embedding_store import EmbeddingSegmentStore
+    from services.quantized_vector_backend import QuantizedSegmentBackend
+    from services.segment_vector_backend import SegmentVectorBackend
+    from utils.quantization import code_bytes
+
+    print("\n" + "=" * 60)
+    print("Quantized Search (offline)")
+    print("=" * 60)
+    print(f"\n📋 {num_vectors:,} vectors × {dimensions}d, {num_queries} queries, top-{k}")
+
+    vectors = clustered_vectors(num_vectors + num_queries, dimensions)
+    corpus, queries = vectors[:num_vectors], vectors[num_vectors:]
+    rows = [
+        {'id': str(i), 'document_id': f"doc-{i // 50}", 'document_title': '',
+         'chunk_index': i % 50, 'chunk_text': '', 'embedding': vec}
+        for i, vec in enumerate(corpus)
+    ]
+
+    def measure(backend):
+        latencies, results = [], []
+        for query in queries:
+            start = time.perf_counter()
+            found = backend.search_sync(query, match_threshold=-1.0, match_count=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append([r['id'] for r in found])
+        return results, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+    with tempfile.TemporaryDirectory() as path:
+        store = EmbeddingSegmentStore(path)
+        store.append(rows)
+        truth, p50, p95 = measure(SegmentVectorBackend(store))
+
+        print(f"\n{'Mode':<18} {'Bytes/vec':>10} {'Smaller':>8} {'Recall@' + str(k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        print("-" * 66)
+        full = code_bytes(dimensions)
+        print(f"{'float32 (exact)':<18} {full:>10} {'1.0×':>8} {1.0:>10.3f} {p50:>8.1f} {p95:>8.1f}")
+
+        passed = True
+        for mode, target in (('int8', 0.99), ('binary', 0.90)):
+            backend = QuantizedSegmentBackend(store, mode=mode, rescore_factor=10)
+            backend.build_codes()
+            found, p50, p95 = measure(backend)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)])
+            size = code_bytes(dimensions, mode)
+            print(f"{mode + ' + rescore':<18} {size:>10} {full / size:>7.1f}× {recall:>10.3f} {p50:>8.1f} {p95:>8.1f}")
+            passed &= recall >= target
+
+    print("\n✅ Quantized recall targets met (int8 ≥0.99, binary ≥0.90)" if passed
+          else "\n❌ Quantized recall below target")
+    return passed
+
+
 def main():
     """Run HNSW performance validation."""
     print("\n" + "=" * 60)
     print("PHASE 3 VAN QA - TEST 2: HNSW Performance")
     print("=" * 60)
     
+    args = [int(a) for a in sys.argv[1:3]]
+    quantized_ok = test_quantized_search(*args)
     test_hnsw_performance()
     test_recall_accuracy()
     test_index_build_time()
@@ -196,6 +278,8 @@ def main():
     print("   - Recall: >90% (ideal >95%)")
     print("   - Build time: <2min for 10k vectors")
     
+    if not quantized_ok:
+        return 1
     return 2  # Manual verification
 
 if __name__ == '__main__':
@@ -0,0 +1,38 @@
+"""
+Phase 3: Offline RAG Benchmarks
+Throughput, latency, cache and recall benchmarks over the real services,
+with in-memory stand-ins for Supabase and the embedding provider.
+"""
+
+from .memory_supabase import InMemorySupabase
+from .fake_embedder import HashingEmbedder
+from .corpus import SyntheticCorpus
+from .report import (
+    compare_results,
+    latency_summary,
+    write_results
+)
+from .pipeline_bench import (
+    ServiceStack,
+    bench_chunking,
+    bench_ingest,
+    bench_rag
+)
+from .retrieval_bench import bench_retrieval
+
+__all__ = [
+    # Stand-ins
+    "InMemorySupabase",
+    "HashingEmbedder",
+    "SyntheticCorpus",
+    # Benchmarks
+    "ServiceStack",
+    "bench_chunking",
+    "bench_ingest",
+    "bench_rag",
+    "bench_retrieval",
+    # Reports
+    "compare_results",
+    "latency_summary",
+    "write_results",
+]
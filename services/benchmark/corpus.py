@@ -0,0 +1,123 @@
+"""
+Phase 3: Synthetic Benchmark Corpus
+
+Deterministic corpora for offline benchmarks (same seed = same data):
+- text: documents on one of several topics; words are pseudo-words
+  drawn from a Zipf distribution over a topic-specific vocabulary mixed
+  with common words, arranged in sentences and paragraphs so chunkers
+  see realistic separators
+- queries: a few words taken from a random paragraph of the corpus
+- vectors: clustered unit vectors (Gaussian noise around cluster
+  centroids) for retrieval tiers too large to embed text for, generated
+  block-wise so 1M × D corpora never need a second full-size copy
+"""
+
+from typing import Dict, List, Optional
+import math
+
+import numpy as np
+
+_SYLLABLES = ['ka', 'lo', 'mi', 'ren', 'tu', 'sa', 'vi', 'dor', 'pe', 'qua', 'xi', 'bel', 'no', 'fra', 'zu', 'ty']
+
+
+def pseudo_word(index: int) -> str:
+    """Unique pronounceable word for an index (base-16 syllables)."""
+    word = ''
+    while True:
+        word += _SYLLABLES[index % len(_SYLLABLES)]
+        index //= len(_SYLLABLES)
+        if index == 0:
+            return word
+
+
+class SyntheticCorpus:
+    """Seeded generator of documents, queries and vectors."""
+
+    def __init__(self, seed: int = 0, topics: int = 32, vocabulary: int = 5000, topic_words: int = 300):
+        """
+        Args:
+            seed: Random seed for every generated artifact
+            topics: Number of topics (documents pick one each)
+            vocabulary: Distinct words
+            topic_words: Words specific to each topic
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.words = np.array([pseudo_word(i) for i in range(vocabulary)], dtype=object)
+        self.topic_vocab = [self.rng.choice(vocabulary, topic_words, replace=False) for _ in range(topics)]
+        ranks = np.arange(1, topic_words + 1)
+        self.topic_p = (1 / ranks) / (1 / ranks).sum()
+        self.documents_made = 0
+
+    def _sentence(self, topic: int, words: int) -> str:
+        local = self.topic_vocab[topic][self.rng.choice(len(self.topic_p), words, p=self.topic_p)]
+        common = self.rng.integers(0, 64, words)  # the 64 most common words
+        picked = np.where(self.rng.random(words) < 0.7, local, common)
+        text = ' '.join(self.words[picked])
+        return text[0].upper() + text[1:] + '.'
+
+    def document(self, paragraphs: int = 6, sentences: int = 5, words: int = 14) -> Dict:
+        """One document dict (title, content, created_by, visibility)."""
+        topic = int(self.rng.integers(len(self.topic_vocab)))
+        content = '\n\n'.join(
+            ' '.join(self._sentence(topic, words) for _ in range(sentences)) for _ in range(paragraphs)
+        )
+        self.documents_made += 1
+        return {
+            'title': f"doc-{self.documents_made:07d} topic-{topic}",
+            'content': content,
+            'created_by': 'benchmark-user',
+            'visibility': 'public',
+            'metadata': {'topic': topic}
+        }
+
+    def documents_for_chunks(self, chunks: int, chunker, paragraphs: int = 6) -> List[Dict]:
+        """Documents that chunk into about `chunks` chunks with chunker."""
+        sample = [self.document(paragraphs) for _ in range(8)]
+        per_doc = sum(len(chunker.chunk_text(d['content'], None)) for d in sample) / len(sample)
+        count = max(1, math.ceil(chunks / max(per_doc, 1e-9)))
+        return (sample + [self.document(paragraphs) for _ in range(max(0, count - len(sample)))])[:count]
+
+    def queries(self, documents: List[Dict], count: int, words: int = 6) -> List[str]:
+        """Short queries lifted from random paragraphs of documents."""
+        queries = []
+        for i in self.rng.integers(0, len(documents), count):
+            tokens = documents[i]['content'].replace('.', '').split()
+            start = int(self.rng.integers(0, max(1, len(tokens) - words)))
+            queries.append(' '.join(tokens[start:start + words]).lower())
+        return queries
+
+    def vectors(
+        self,
+        count: int,
+        dimensions: int,
+        clusters: int = 1024,
+        noise: float = 1.0,
+        block: int = 65536,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        count × dimensions float32 unit vectors around random centroids.
+
+        Args:
+            noise: Per-component noise relative to the centroid scale
+                (higher = harder nearest-neighbour problem)
+            block: Rows generated per step
+            out: Preallocated array to fill (allocated if None)
+        """
+        rng = np.random.default_rng([self.seed, count, dimensions])
+        centroids = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+        out = np.empty((count, dimensions), dtype=np.float32) if out is None else out
+        for start in range(0, count, block):
+            end = min(start + block, count)
+            rows = centroids[rng.integers(0, clusters, end - start)]
+            rows += noise * rng.standard_normal(rows.shape, dtype=np.float32)
+            out[start:end] = rows / np.linalg.norm(rows, axis=1, keepdims=True)
+        return out
+
+    def vector_queries(self, vectors: np.ndarray, count: int, noise: float = 0.3) -> np.ndarray:
+        """Queries near random corpus vectors (unit length)."""
+        rng = np.random.default_rng([self.seed, len(vectors), count])
+        queries = vectors[rng.integers(0, len(vectors), count)].copy()
+        queries += noise / math.sqrt(vectors.shape[1]) * rng.standard_normal(queries.shape, dtype=np.float32)
+        return queries / np.linalg.norm(queries, axis=1, keepdims=True)
@@ -0,0 +1,67 @@
+"""
+Phase 3: Deterministic Fake Embedder
+
+Offline embedding provider for benchmarks, with LocalEmbedder's embed()
+interface so it plugs into EmbeddingService(local_embedder=...):
+- each word maps to a fixed pseudo-random unit vector (seeded by a
+  CRC32 of the word), and a text embeds to the normalized sum of its
+  word vectors; texts sharing words are similar, so retrieval quality
+  is meaningful and repeatable across runs and machines
+- an optional per-request delay stands in for provider latency
+"""
+
+from typing import Dict, List
+import asyncio
+import re
+import zlib
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Bag-of-words random-projection embeddings (no model, no network)."""
+
+    def __init__(self, dimensions: int = 256, seed: int = 0, delay_seconds: float = 0.0):
+        """
+        Args:
+            dimensions: Vector size
+            seed: Changes every word vector (same seed = same embeddings)
+            delay_seconds: Simulated latency per embed() call
+        """
+        self.dimensions = dimensions
+        self.seed = seed
+        self.delay_seconds = delay_seconds
+        self.requests = 0
+        self.texts = 0
+        self._words: Dict[str, np.ndarray] = {}
+
+    def _word(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            rng = np.random.default_rng([zlib.crc32(word.encode()), self.seed])
+            vector = rng.standard_normal(self.dimensions).astype(np.float32)
+            self._words[word] = vector
+        return vector
+
+    def embed_sync(self, texts: List[str]) -> np.ndarray:
+        """N×D float32 unit vectors (zero for texts without words)."""
+        out = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            if words:
+                out[i] = np.sum([self._word(w) for w in words], axis=0)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return np.divide(out, norms, out=out, where=norms > 0)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts (LocalEmbedder interface)."""
+        self.requests += 1
+        self.texts += len(texts)
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        return self.embed_sync(texts).tolist()
+
+    def shutdown(self):
+        """Nothing to release (LocalEmbedder interface)."""
@@ -0,0 +1,183 @@
+"""
+Phase 3: In-Memory Supabase
+
+Stand-in for the subset of the Supabase client the Phase 3 services use,
+so the ingestion and retrieval paths can be benchmarked offline:
+- table().select/insert/upsert/update/delete with eq / in_ / range /
+  limit / order, executed against lists of dict rows
+- eq and in_ filters use per-column hash indexes built on first use and
+  kept current on insert, so lookups stay O(matches) at 1M rows
+- rpc('match_documents') is exact cosine search over document_chunks
+  (the pgvector reference), other RPCs return None
+
+There is no RLS: every row is visible to every caller.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+import itertools
+
+import numpy as np
+
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix, top_k
+
+
+class MemoryQuery:
+    """Chainable query mirroring supabase-py's fluent API."""
+
+    def __init__(self, db: 'InMemorySupabase', table: str):
+        self.db = db
+        self.table = table
+        self.op = 'select'
+        self.payload: Any = None
+        self.options: Dict[str, Any] = {}
+        self.filters: List[tuple] = []  # (column, set of values)
+        self._range: Optional[tuple] = None
+        self._limit: Optional[int] = None
+
+    def select(self, columns: str = '*'):
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = 'insert', payload
+        return self
+
+    def upsert(self, payload, **options):
+        self.op, self.payload, self.options = 'upsert', payload, options
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = 'update', payload
+        return self
+
+    def delete(self):
+        self.op = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, {value}))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, set(values)))
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def _matched(self) -> List[Dict]:
+        if not self.filters:
+            return list(self.db.rows(self.table))
+        column, values = min(self.filters, key=lambda f: len(f[1]))
+        index = self.db.index(self.table, column)
+        candidates = [row for value in values for row in index.get(value, ())]
+        return [row for row in candidates if all(row.get(c) in v for c, v in self.filters)]
+
+    def execute(self):
+        self.db.calls += 1
+        if self.op in ('insert', 'upsert'):
+            records = self.payload if isinstance(self.payload, list) else [self.payload]
+            return SimpleNamespace(data=self.db.write(self.table, records, self.op, self.options))
+        matched = self._matched()
+        if self.op == 'update':
+            for row in matched:
+                row.update(self.payload)
+            self.db.changed(self.table)
+        elif self.op == 'delete':
+            doomed = {id(row) for row in matched}
+            self.db.tables[self.table] = [r for r in self.db.rows(self.table) if id(r) not in doomed]
+            self.db.changed(self.table)
+        if self._range:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return SimpleNamespace(data=[dict(row) for row in matched])
+
+
+class InMemorySupabase:
+    """Tables of dict rows with lazily built column indexes."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.rpc_handlers: Dict[str, Callable[[Dict], Any]] = {'match_documents': self._match_documents}
+        self.calls = 0
+        self._indexes: Dict[str, Dict[str, Dict[Any, List[Dict]]]] = {}
+        self._ids = itertools.count(1)
+        self._matrix = None  # (normalized chunk embeddings, rows) for match_documents
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rows(self, table: str) -> List[Dict]:
+        return self.tables.setdefault(table, [])
+
+    def index(self, table: str, column: str) -> Dict[Any, List[Dict]]:
+        indexes = self._indexes.setdefault(table, {})
+        if column not in indexes:
+            built: Dict[Any, List[Dict]] = {}
+            for row in self.rows(table):
+                built.setdefault(row.get(column), []).append(row)
+            indexes[column] = built
+        return indexes[column]
+
+    def changed(self, table: str):
+        """Drop derived state after in-place updates or deletes."""
+        self._indexes.pop(table, None)
+        if table == 'document_chunks':
+            self._matrix = None
+
+    def write(self, table: str, records: List[Dict], op: str, options: Dict) -> List[Dict]:
+        key = options.get('on_conflict') if op == 'upsert' else None
+        existing = self.index(table, key) if key else {}
+        inserted = []
+        for record in records:
+            record = dict(record)
+            record.setdefault('id', f"{table}-{next(self._ids)}")
+            current = existing.get(record.get(key)) if key else None
+            if current:
+                if not options.get('ignore_duplicates'):
+                    current[0].update(record)
+                continue
+            self.rows(table).append(record)
+            for column, index in self._indexes.get(table, {}).items():
+                index.setdefault(record.get(column), []).append(record)
+            inserted.append(record)
+        if table == 'document_chunks':
+            self._matrix = None
+        return inserted
+
+    def rpc(self, name: str, params: Dict):
+        self.calls += 1
+        handler = self.rpc_handlers.get(name, lambda p: None)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=handler(params)))
+
+    def _match_documents(self, params: Dict) -> List[Dict]:
+        """Exact cosine top-k over document_chunks (match_documents shape)."""
+        if self._matrix is None:
+            rows = [r for r in self.rows('document_chunks') if r.get('embedding') is not None]
+            vectors = np.stack([to_float32(r['embedding']) for r in rows]) if rows else np.zeros((0, 1))
+            self._matrix = (normalize_matrix(vectors), rows)
+        vectors, rows = self._matrix
+        if not rows:
+            return []
+        scores = vectors @ normalize_matrix(to_float32(params['query_embedding']))[0]
+        idx, best = top_k(scores, params['match_count'])
+        titles = self.index('documents', 'id')
+        return [
+            {
+                'id': rows[i]['id'], 'document_id': rows[i]['document_id'],
+                'document_title': (titles.get(rows[i]['document_id']) or [{}])[0].get('title'),
+                'chunk_text': rows[i]['chunk_text'], 'chunk_index': rows[i]['chunk_index'],
+                'similarity': float(score)
+            }
+            for i, score in zip(idx.tolist(), best.tolist()) if score >= params['match_threshold']
+        ]
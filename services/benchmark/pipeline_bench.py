@@ -0,0 +1,167 @@
+"""
+Phase 3: Pipeline Benchmarks
+
+Text-path benchmarks over the real services, wired to offline stand-ins
+(InMemorySupabase, HashingEmbedder):
+- chunking: DocumentChunker throughput, plus ParallelChunker if workers > 1
+- ingest: ingest_documents_batch end to end (chunk, embed through
+  EmbeddingService and its two cache tiers, bulk write, local index),
+  then a re-ingest of copied documents to measure embedding cache hits
+- rag: RAGService.query latency over a Zipf-skewed query stream (so the
+  result cache sees realistic repeats), ContextBuilder latency, and
+  recall@k of the local index against exact match_documents search
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+import time
+
+import numpy as np
+
+from services.benchmark.fake_embedder import HashingEmbedder
+from services.benchmark.memory_supabase import InMemorySupabase
+from services.benchmark.report import latency_summary, rate
+from services.context_builder import ContextBuilder
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.embedding_service import EmbeddingService
+from services.local_vector_index import LocalVectorIndex
+from services.parallel_chunker import ParallelChunker
+from services.rag_cache import RAGResultCache
+from services.rag_service import RAGService
+from utils.vector_cache import VectorLRUCache
+
+USER_ID = 'benchmark-user'
+
+
+@dataclass
+class ServiceStack:
+    """Real services over offline stand-ins."""
+    supabase: InMemorySupabase
+    embedder: HashingEmbedder
+    embedding_service: EmbeddingService
+    index: LocalVectorIndex
+    ingestion: DocumentIngestionService
+
+    @classmethod
+    def build(cls, chunker: DocumentChunker, dimensions: int = 256, embed_delay: float = 0.0) -> 'ServiceStack':
+        supabase = InMemorySupabase()
+        embedder = HashingEmbedder(dimensions, delay_seconds=embed_delay)
+        embedding_service = EmbeddingService(
+            supabase, primary_model='local', fallback_to_local=False,
+            l1_cache=VectorLRUCache(), local_embedder=embedder, dimensions=dimensions
+        )
+        index = LocalVectorIndex()
+        ingestion = DocumentIngestionService(
+            supabase, chunker=chunker, embedding_service=embedding_service,
+            vector_index=index, rag_cache=RAGResultCache()
+        )
+        return cls(supabase, embedder, embedding_service, index, ingestion)
+
+
+def bench_chunking(documents: List[Dict], chunker: DocumentChunker, workers: int = 0) -> Dict:
+    """Serial (and optionally process-pool) chunking throughput."""
+    texts = [doc['content'] for doc in documents]
+    start = time.perf_counter()
+    chunks = sum(len(chunker.chunk_text(text, None)) for text in texts)
+    seconds = time.perf_counter() - start
+    megabytes = sum(len(text) for text in texts) / 1e6
+    result = {
+        'documents': len(texts), 'chunks': chunks, 'megabytes': megabytes, 'seconds': seconds,
+        'chunks_per_sec': rate(chunks, seconds), 'mb_per_sec': rate(megabytes, seconds)
+    }
+    if workers > 1:
+        with ParallelChunker(chunker, workers=workers) as parallel:
+            parallel.chunk_many(texts[:workers])  # start the pool outside the timing
+            start = time.perf_counter()
+            parallel.chunk_many(texts)
+            seconds = time.perf_counter() - start
+        result['parallel'] = {'workers': workers, 'seconds': seconds, 'chunks_per_sec': rate(chunks, seconds)}
+    return result
+
+
+def _cache_counts(stack: ServiceStack):
+    cache = stack.embedding_service.cache
+    return cache.hits, cache.lookups
+
+
+async def bench_ingest(stack: ServiceStack, documents: List[Dict], reingest_fraction: float = 0.2) -> Dict:
+    """Batch ingest throughput, then cache hits when content repeats."""
+    start = time.perf_counter()
+    summary = await stack.ingestion.ingest_documents_batch(documents)
+    seconds = time.perf_counter() - start
+    result = {
+        'documents': len(documents), 'chunks': summary['total_chunks'], 'failed': summary['failed'],
+        'seconds': seconds, 'docs_per_sec': rate(len(documents), seconds),
+        'chunks_per_sec': rate(summary['total_chunks'], seconds),
+        'embedding_requests': stack.embedder.requests, 'embedded_texts': stack.embedder.texts
+    }
+
+    copies = [{**doc, 'title': f"{doc['title']} (copy)"} for doc in documents[:int(len(documents) * reingest_fraction)]]
+    if copies:
+        hits, lookups = _cache_counts(stack)
+        embedded = stack.embedder.texts
+        start = time.perf_counter()
+        summary = await stack.ingestion.ingest_documents_batch(copies)
+        seconds = time.perf_counter() - start
+        new_hits, new_lookups = _cache_counts(stack)
+        result['reingest'] = {
+            'documents': len(copies), 'seconds': seconds,
+            'chunks_per_sec': rate(summary['total_chunks'], seconds),
+            'embedded_texts': stack.embedder.texts - embedded,
+            'cache_hit_rate': rate(new_hits - hits, new_lookups - lookups)
+        }
+    result['cache_hit_rate'] = stack.embedding_service.cache.stats()['hit_rate']
+    return result
+
+
+def _query_stream(count: int, distinct: int, skew: float, seed: int) -> np.ndarray:
+    """Query indices with Zipf-like popularity (rank r has weight 1/r^skew)."""
+    weights = 1 / np.arange(1, distinct + 1) ** skew
+    return np.random.default_rng(seed).choice(distinct, count, p=weights / weights.sum())
+
+
+async def bench_rag(stack: ServiceStack, queries: List[str], count: int, k: int = 10,
+                    skew: float = 1.1, seed: int = 0) -> Dict:
+    """Query latency, cache hit rates and recall@k of end-to-end retrieval."""
+    rag_cache = RAGResultCache(ttl_seconds=3600, max_entries=len(queries))
+    rag = RAGService(
+        stack.supabase, stack.embedding_service, similarity_threshold=0.0, max_results=k,
+        vector_backend=stack.index, result_cache=rag_cache
+    )
+    builder = ContextBuilder(max_tokens=2000)
+    hits, lookups = _cache_counts(stack)
+    query_seconds, context_seconds = [], []
+    try:
+        for i in _query_stream(count, len(queries), skew, seed).tolist():
+            start = time.perf_counter()
+            results = await rag.query(queries[i], USER_ID)
+            query_seconds.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            builder.build_context(queries[i], results)
+            context_seconds.append(time.perf_counter() - start)
+        recall = await _rag_recall(stack, rag, queries[:min(len(queries), 100)], k)
+    finally:
+        await rag.close()
+    new_hits, new_lookups = _cache_counts(stack)
+    return {
+        'queries': count, 'distinct_queries': len(queries),
+        'query': latency_summary(query_seconds), 'context': latency_summary(context_seconds),
+        'result_cache_hit_rate': rag_cache.stats()['hit_rate'],
+        'embedding_cache_hit_rate': rate(new_hits - hits, new_lookups - lookups),
+        f"recall_at_{k}": recall, 'index_trained': stack.index.trained
+    }
+
+
+async def _rag_recall(stack: ServiceStack, rag: RAGService, queries: List[str], k: int) -> float:
+    """Mean overlap of RAG results with exact (match_documents) top-k."""
+    rag.result_cache = None
+    overlaps = []
+    for query in queries:
+        vector = await stack.embedding_service.generate_embedding(query)
+        exact = {row['id'] for row in stack.supabase.rpc(
+            'match_documents', {'query_embedding': vector, 'match_threshold': -1.0, 'match_count': k}
+        ).execute().data}
+        found = {result.id for result in await rag.query(query, USER_ID)}
+        overlaps.append(len(exact & found) / len(exact) if exact else 1.0)
+    return float(np.mean(overlaps)) if overlaps else 0.0
@@ -0,0 +1,106 @@
+"""
+Phase 3: Benchmark Reports
+
+Latency summaries, the JSON results file, and regression checks against
+a baseline results file:
+- metrics are compared by name: *_per_sec, recall*, *hit_rate are higher
+  is better; *_ms and *_seconds are lower is better; anything else
+  (counts, settings) is context and never flagged
+- a metric regresses when it is worse than the baseline by more than
+  the tolerance (relative), so noisy machines can widen the band
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+import json
+import os
+import platform
+import subprocess
+
+import numpy as np
+
+RESULTS_VERSION = 1
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50 / p99 / mean in milliseconds."""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    if not len(ms):
+        return {'p50_ms': 0.0, 'p99_ms': 0.0, 'mean_ms': 0.0}
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean())
+    }
+
+
+def rate(count: float, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def environment() -> Dict:
+    """Machine and code version the results were measured on."""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def write_results(path: str, config: Dict, tiers: List[Dict]):
+    """Write {version, environment, config, tiers} as JSON."""
+    document = {'version': RESULTS_VERSION, 'environment': environment(), 'config': config, 'tiers': tiers}
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def _direction(name: str) -> int:
+    """+1 higher is better, -1 lower is better, 0 not a performance metric."""
+    if name.endswith('_per_sec') or name.startswith('recall') or name.endswith('hit_rate'):
+        return 1
+    if name.endswith('_ms') or name.endswith('_seconds'):
+        return -1
+    return 0
+
+
+def _metrics(node, prefix: str = '') -> Iterator[Tuple[str, float]]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _metrics(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+
+def compare_results(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Regressions of current against baseline, matched by tier size.
+
+    Returns:
+        One message per regressed metric (empty if none)
+    """
+    base_tiers = {tier['chunks']: tier for tier in baseline['tiers']}
+    regressions = []
+    for tier in current['tiers']:
+        base = dict(_metrics(base_tiers.get(tier['chunks'], {})))
+        for name, value in _metrics(tier):
+            direction = _direction(name.rsplit('.', 1)[-1])
+            old = base.get(name)
+            if not direction or old is None or old == 0:
+                continue
+            change = (value - old) / abs(old) * direction
+            if change < -tolerance:
+                regressions.append(f"{tier['chunks']} chunks: {name} {old:.4g} -> {value:.4g} ({change:+.0%})")
+    return regressions
@@ -0,0 +1,101 @@
+"""
+Phase 3: Retrieval Benchmarks
+
+Vector search at corpus sizes too large for the text path (up to 1M+
+chunks), on synthetic clustered vectors:
+- exact: brute-force top-k, the latency baseline and ground truth
+- ivf: LocalVectorIndex build time, then latency and recall@k per nprobe
+- quantized: QuantizedSegmentBackend (binary / int8 codes with exact
+  rescoring) over an on-disk segment store, latency and recall@k
+
+Vectors are loaded in blocks so the only full-size copies are the
+corpus matrix and each backend's own storage.
+"""
+
+from typing import Dict, List, Sequence
+import tempfile
+import time
+
+import numpy as np
+
+from services.benchmark.report import latency_summary
+from services.embedding_store import EmbeddingSegmentStore
+from services.local_vector_index import LocalVectorIndex
+from services.quantized_vector_backend import QuantizedSegmentBackend
+from utils.vector_utils import top_k
+
+
+def _rows(vectors: np.ndarray, start: int, end: int) -> List[Dict]:
+    return [
+        {'id': str(i), 'document_id': f"doc-{i // 8}", 'document_title': None,
+         'chunk_text': '', 'chunk_index': i % 8, 'embedding': vectors[i]}
+        for i in range(start, end)
+    ]
+
+
+def _search(backend, queries: np.ndarray, truth: List[set], k: int) -> Dict:
+    """Latency summary and recall@k of backend.search_sync over queries."""
+    seconds, recalls = [], []
+    for query, exact in zip(queries, truth):
+        start = time.perf_counter()
+        rows = backend.search_sync(query, -1.0, k)
+        seconds.append(time.perf_counter() - start)
+        recalls.append(len(exact & {row['id'] for row in rows}) / len(exact))
+    return {f"recall_at_{k}": float(np.mean(recalls)), **latency_summary(seconds)}
+
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int):
+    """Brute-force top-k ids per query and the latency of computing them."""
+    truth, seconds = [], []
+    for query in queries:
+        start = time.perf_counter()
+        idx, _ = top_k(vectors @ query, k)
+        seconds.append(time.perf_counter() - start)
+        truth.append({str(i) for i in idx.tolist()})
+    return truth, latency_summary(seconds)
+
+
+def bench_ivf(vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int,
+              nprobes: Sequence[int] = (8, 32), block: int = 50_000) -> Dict:
+    """LocalVectorIndex with default settings; nprobe swept after one build."""
+    index = LocalVectorIndex()
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), block):
+        index.add_chunks(_rows(vectors, offset, min(offset + block, len(vectors))))
+    result = {'build_seconds': time.perf_counter() - start, 'trained': index.trained, 'nlist': index.nlist}
+    for nprobe in nprobes:
+        index.nprobe = nprobe
+        result[f"nprobe_{nprobe}"] = _search(index, queries, truth, k)
+        if not index.trained:
+            break  # exact search: nprobe has no effect
+    return result
+
+
+def bench_quantized(vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int,
+                    modes: Sequence[str] = ('binary', 'int8'), rescore_factor: int = 10,
+                    block: int = 50_000) -> Dict:
+    """Quantized first pass + exact rescoring over an on-disk store."""
+    result = {}
+    with tempfile.TemporaryDirectory(prefix='rag-bench-') as path:
+        store = EmbeddingSegmentStore(path, max_segments=len(vectors) // block + 2)
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), block):
+            store.append(_rows(vectors, offset, min(offset + block, len(vectors))))
+        result['store_seconds'] = time.perf_counter() - start
+        for mode in modes:
+            backend = QuantizedSegmentBackend(store, mode=mode, rescore_factor=rescore_factor)
+            start = time.perf_counter()
+            backend.build_codes()
+            result[mode] = {'build_seconds': time.perf_counter() - start, **_search(backend, queries, truth, k)}
+    return result
+
+
+def bench_retrieval(vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+                    nprobes: Sequence[int] = (8, 32), quantized: bool = True) -> Dict:
+    """Every retrieval benchmark for one corpus."""
+    truth, exact = exact_search(vectors, queries, k)
+    result = {'vectors': len(vectors), 'dimensions': vectors.shape[1], 'queries': len(queries), 'exact': exact}
+    result['ivf'] = bench_ivf(vectors, queries, truth, k, nprobes)
+    if quantized:
+        result['quantized'] = bench_quantized(vectors, queries, truth, k)
+    return result
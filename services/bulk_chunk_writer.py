@@ -0,0 +1,152 @@
+"""
+Phase 3: Bulk Chunk Writer
+
+Writes document_chunks rows in pages bounded by request size instead of
+one insert per document:
+- rows are packed into pages of at most max_page_bytes of JSON, so large
+  documents no longer produce multi-megabyte bodies and small documents
+  share a request when written together
+- every row gets a client-generated UUID and pages are upserted on id,
+  so retrying a page that timed out after the server committed it is a
+  no-op rather than a duplicate
+- embeddings are sent as compact float32 pgvector text
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+import logging
+import time
+import uuid
+
+from services.embedding_cache import text_hash
+from utils.vector_utils import vector_to_string
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_records(
+    document_id: str,
+    chunks: Sequence,
+    embeddings: Sequence,
+    ids: Optional[Sequence[Optional[str]]] = None
+) -> List[Dict]:
+    """document_chunks rows for a document's chunks (ids: preassigned, optional)."""
+    records = []
+    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+        record = {
+            'document_id': document_id,
+            'chunk_text': chunk.text,
+            'chunk_index': chunk.chunk_index,
+            'embedding': embedding,
+            'token_count': chunk.token_count,
+            'content_hash': text_hash(chunk.text),
+            'metadata': chunk.metadata
+        }
+        if ids and ids[i]:
+            record['id'] = ids[i]
+        records.append(record)
+    return records
+
+
+class BulkChunkWriter:
+    """Size-bounded, idempotent, retrying writer for chunk rows."""
+
+    def __init__(
+        self,
+        supabase_client,
+        table: str = 'document_chunks',
+        max_page_bytes: int = 1_000_000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        """
+        Args:
+            supabase_client: Supabase client
+            table: Target table
+            max_page_bytes: JSON body budget per request
+            max_retries: Retries per page before giving up
+            retry_backoff: Initial retry delay in seconds (doubles per retry)
+        """
+        self.supabase = supabase_client
+        self.table = table
+        self.max_page_bytes = max_page_bytes
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.pages_written = 0
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.retries = 0
+
+    @staticmethod
+    def prepare(records: List[Dict]) -> List[Dict]:
+        """Copy records, assigning client ids and compact embeddings."""
+        rows = []
+        for record in records:
+            row = dict(record)
+            row.setdefault('id', str(uuid.uuid4()))
+            if row.get('embedding') is not None and not isinstance(row['embedding'], str):
+                row['embedding'] = vector_to_string(row['embedding'], compact=True)
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def row_bytes(row: Dict) -> int:
+        """Serialized size of a row (ASCII JSON, so chars == bytes)."""
+        return len(json.dumps(row, separators=(',', ':'), default=str))
+
+    def pages(self, rows: List[Dict]) -> Iterator[Tuple[List[Dict], int]]:
+        """
+        Split rows into (page, body bytes) under max_page_bytes.
+
+        A single row larger than the budget gets a page of its own.
+        """
+        page, size = [], 2
+        for row in rows:
+            row_size = self.row_bytes(row) + 1
+            if page and size + row_size > self.max_page_bytes:
+                yield page, size
+                page, size = [], 2
+            page.append(row)
+            size += row_size
+        if page:
+            yield page, size
+
+    def write(self, records: List[Dict]) -> List[Dict]:
+        """
+        Write records page by page (blocking; run in a thread from async code).
+
+        Returns:
+            Written rows, including their ids
+        """
+        rows = self.prepare(records)
+        for page, size in self.pages(rows):
+            self._write_page(page, size)
+        return rows
+
+    def _write_page(self, page: List[Dict], size: int):
+        """Upsert one page, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.supabase.table(self.table)\
+                    .upsert(page, on_conflict='id', returning='minimal')\
+                    .execute()
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"{self.table} page of {len(page)} rows failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        self.pages_written += 1
+        self.rows_written += len(page)
+        self.bytes_written += size
+
+    def stats(self) -> dict:
+        return {
+            'pages_written': self.pages_written,
+            'rows_written': self.rows_written,
+            'bytes_written': self.bytes_written,
+            'retries': self.retries
+        }
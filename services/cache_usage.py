@@ -0,0 +1,106 @@
+"""
+Phase 3: Embedding Cache Usage Accounting
+
+Accumulates embedding_cache use counts in memory and flushes them
+in one increment_cache_use_batch RPC instead of one RPC per cache hit.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheUsageRecorder:
+    """Deferred, batched use_count/last_used updates for embedding_cache."""
+
+    def __init__(
+        self,
+        supabase_client,
+        flush_interval: float = 30.0,
+        max_pending: int = 10000
+    ):
+        """
+        Initialize recorder.
+
+        Args:
+            supabase_client: Supabase client
+            flush_interval: Seconds between background flushes
+            max_pending: Flush early once this many hashes are pending
+        """
+        self.supabase = supabase_client
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flushed_hits = 0
+        self._pending: Dict[str, Tuple[int, datetime]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, text_hash: str):
+        """Count one cache hit (no I/O)."""
+        count, _ = self._pending.get(text_hash, (0, None))
+        self._pending[text_hash] = (count + 1, datetime.now(timezone.utc))
+        self._ensure_flush_task()
+
+        if len(self._pending) >= self.max_pending:
+            asyncio.get_running_loop().create_task(self.flush())
+
+    @property
+    def pending(self) -> int:
+        """Number of hashes awaiting flush."""
+        return len(self._pending)
+
+    async def flush(self):
+        """Write all pending counts with a single RPC."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, {}
+            hashes = list(batch)
+            rpc = self.supabase.rpc('increment_cache_use_batch', {
+                'hashes': hashes,
+                'counts': [batch[h][0] for h in hashes],
+                'last_used_at': [batch[h][1].isoformat() for h in hashes]
+            })
+
+            try:
+                await asyncio.to_thread(rpc.execute)
+                self.flushed_hits += sum(count for count, _ in batch.values())
+            except Exception as e:
+                logger.warning(f"Cache usage flush failed: {e}")
+                self._requeue(batch)
+
+    def _requeue(self, batch: Dict[str, Tuple[int, datetime]]):
+        """Merge a failed batch back, dropping it if the buffer is full."""
+        if len(self._pending) + len(batch) > self.max_pending:
+            logger.warning(f"Dropping usage stats for {len(batch)} hashes")
+            return
+        for h, (count, last_used) in batch.items():
+            pending_count, pending_last = self._pending.get(h, (0, last_used))
+            self._pending[h] = (pending_count + count, max(pending_last, last_used))
+
+    def _ensure_flush_task(self):
+        """Start the periodic flush loop on first use."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_loop()
+            )
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """Stop the background loop and flush pending counts."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
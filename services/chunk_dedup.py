@@ -0,0 +1,206 @@
+"""
+Phase 3: Chunk Deduplication
+
+Finds near-duplicate chunks at ingest time, before any embedding call,
+using MinHash LSH (services/near_duplicate_index.py). Only matches in
+documents with the same owner, visibility and team are acted on, so
+content is never dropped or removed in favour of a copy that other
+readers cannot see. What happens to a chunk that matches depends on the
+policy:
+- skip: the chunk is not embedded or stored
+- link: the chunk is stored with the existing chunk's embedding (no API
+  call) and metadata['duplicate_of'] pointing at it
+- replace: the chunk is embedded and stored, and the existing chunk is
+  deleted (newest copy wins)
+
+Chunks of documents still in flight (planned but not yet written) are
+matched too, so copies inside one batch are caught; link and replace
+only act on written chunks and store in-flight matches normally.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Set
+import asyncio
+import logging
+import uuid
+
+import numpy as np
+
+from services.bulk_chunk_writer import chunk_records
+from services.near_duplicate_index import NearDuplicateIndex
+from utils.supabase_batch import delete_in, select_in
+from utils.vector_cache import to_float32
+
+logger = logging.getLogger(__name__)
+
+DEDUP_POLICIES = ('skip', 'link', 'replace')
+DEDUP_STATS = ('checked', 'duplicates', 'skipped', 'linked', 'replaced')
+
+
+@dataclass
+class DedupPlan:
+    """A document's chunks after near-duplicate resolution."""
+    document_id: str
+    chunks: List = field(default_factory=list)
+    embeddings: List = field(default_factory=list)          # None = still to embed
+    ids: List[Optional[str]] = field(default_factory=list)  # client chunk ids
+    signatures: List[Optional[np.ndarray]] = field(default_factory=list)
+    replaced: Dict[str, str] = field(default_factory=dict)  # superseded chunk id -> its document
+    stats: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(DEDUP_STATS, 0))
+    owner: Optional['ChunkDeduplicator'] = None
+
+    @classmethod
+    def of(cls, document_id: str, chunks: Sequence) -> 'DedupPlan':
+        """Plan that keeps every chunk (deduplication off)."""
+        n = len(chunks)
+        return cls(document_id, list(chunks), [None] * n, [None] * n, [None] * n)
+
+    @property
+    def to_embed(self) -> List:
+        return [c for c, e in zip(self.chunks, self.embeddings) if e is None]
+
+    def fill(self, vectors: Sequence) -> List:
+        """Put new vectors (to_embed order) in place; returns all embeddings."""
+        new = iter(vectors)
+        self.embeddings = [e if e is not None else next(new) for e in self.embeddings]
+        return self.embeddings
+
+    def records(self) -> List[Dict]:
+        """document_chunks rows for the kept chunks (once all are embedded)."""
+        return chunk_records(self.document_id, self.chunks, self.embeddings, self.ids)
+
+    async def commit(self, local_indexes: Sequence = (), rag_cache=None):
+        """Register the written chunks with the deduplicator (if any)."""
+        if self.owner:
+            await self.owner.commit(self, local_indexes, rag_cache)
+
+    def abort(self):
+        """Release in-flight reservations after a failed write."""
+        if self.owner:
+            self.owner.abort(self)
+
+
+async def plan_chunks(deduplicator: Optional['ChunkDeduplicator'], document_id: str, chunks: Sequence) -> DedupPlan:
+    """deduplicator.plan(), or a plan keeping every chunk if it is None."""
+    return await deduplicator.plan(document_id, chunks) if deduplicator else DedupPlan.of(document_id, chunks)
+
+
+class ChunkDeduplicator:
+    """Applies a duplicate policy against a NearDuplicateIndex."""
+
+    def __init__(self, supabase_client, index: Optional[NearDuplicateIndex] = None, policy: str = 'skip'):
+        """
+        Args:
+            supabase_client: Supabase client (linked embeddings, replacements)
+            index: Index of written chunks (in-memory if None; pass one
+                with a path to share it between workers)
+            policy: 'skip', 'link' or 'replace'
+        """
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{policy}'; expected one of {DEDUP_POLICIES}")
+        self.supabase = supabase_client
+        self.index = index or NearDuplicateIndex()
+        self.policy = policy
+        self._pending = NearDuplicateIndex(threshold=self.index.threshold, **self.index.params)
+        self.totals = dict.fromkeys(DEDUP_STATS, 0)
+
+    def _signatures(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        self.index.refresh()
+        return self.index.hasher.signatures(texts)
+
+    async def plan(self, document_id: str, chunks: Sequence) -> DedupPlan:
+        """Resolve a document's chunks; kept ones are reserved as in flight."""
+        signatures = await asyncio.to_thread(self._signatures, [c.text for c in chunks])
+        written = [self.index.query_all(sig) if sig is not None else [] for sig in signatures]
+        matched = {doc for hits in written for _, doc, _ in hits}
+        matched.update(doc for sig in signatures if sig is not None for _, doc, _ in self._pending.query_all(sig))
+        matched.discard(document_id)
+        same_scope = await self._same_scope(document_id, matched) if matched else set()
+        same_scope.add(document_id)
+
+        plan, links = DedupPlan(document_id, owner=self), {}
+        for chunk, sig, hits in zip(chunks, signatures, written):
+            plan.stats['checked'] += 1
+            queued = self._pending.query_all(sig) if sig is not None else []
+            if hits or queued:
+                plan.stats['duplicates'] += 1
+            hit = next((h for h in hits if h[1] in same_scope), None)
+            if self.policy == 'skip' and (hit or any(h[1] in same_scope for h in queued)):
+                plan.stats['skipped'] += 1
+                continue
+            if hit and self.policy == 'link':
+                links[len(plan.chunks)] = hit[0]
+            elif hit and self.policy == 'replace':
+                plan.replaced[hit[0]] = hit[1]
+            chunk_id = str(uuid.uuid4())
+            plan.chunks.append(chunk)
+            plan.embeddings.append(None)
+            plan.ids.append(chunk_id)
+            plan.signatures.append(sig)
+            if sig is not None:
+                self._pending.add([(chunk_id, document_id, sig)])
+        plan.stats['replaced'] = len(plan.replaced)
+        if links:
+            await self._link(plan, links)
+        return plan
+
+    async def _same_scope(self, document_id: str, documents: Set[str]) -> Set[str]:
+        """Documents with the same owner, visibility and team as document_id."""
+        try:
+            rows = await select_in(
+                self.supabase, 'documents', 'id, created_by, visibility, team_id', 'id', sorted({document_id, *documents})
+            )
+        except Exception as e:
+            logger.warning(f"Scope lookup failed, keeping near-duplicates: {e}")
+            return set()
+        scopes = {row['id']: (row.get('created_by'), row.get('visibility'), row.get('team_id')) for row in rows}
+        own = scopes.get(document_id)
+        return {doc for doc, scope in scopes.items() if own is not None and scope == own}
+
+    async def _link(self, plan: DedupPlan, links: Dict[int, str]):
+        """Reuse the embeddings of linked chunks that still exist."""
+        try:
+            rows = await select_in(self.supabase, 'document_chunks', 'id, embedding', 'id', sorted(set(links.values())))
+            vectors = {row['id']: row['embedding'] for row in rows}
+        except Exception as e:
+            logger.warning(f"Linked embedding lookup failed, embedding instead: {e}")
+            return
+        for pos, target in links.items():
+            if target in vectors:
+                chunk = plan.chunks[pos]
+                plan.chunks[pos] = replace(chunk, metadata={**chunk.metadata, 'duplicate_of': target})
+                plan.embeddings[pos] = to_float32(vectors[target]).tolist()
+                plan.stats['linked'] += 1
+
+    async def commit(self, plan: DedupPlan, local_indexes: Sequence = (), rag_cache=None):
+        """Register a written document's chunks and apply its replacements."""
+        entries = [(i, plan.document_id, s) for i, s in zip(plan.ids, plan.signatures) if s is not None]
+        await asyncio.to_thread(self.index.add, entries)
+        self._pending.remove_chunks(plan.ids)
+        if plan.replaced:
+            await self._replace(plan.replaced, local_indexes, rag_cache)
+        for key, value in plan.stats.items():
+            self.totals[key] += value
+
+    def abort(self, plan: DedupPlan):
+        """Release the in-flight reservation of a document that failed."""
+        self._pending.remove_chunks(plan.ids)
+
+    async def _replace(self, replaced: Dict[str, str], local_indexes: Sequence, rag_cache):
+        """Delete superseded chunks, in Supabase and the local indexes."""
+        chunk_ids = sorted(replaced)
+        await delete_in(self.supabase, 'document_chunks', 'id', chunk_ids)
+        await asyncio.to_thread(self.index.remove_chunks, chunk_ids)
+        for index in local_indexes:
+            index.remove_chunks(chunk_ids)
+        if rag_cache is not None:
+            rag_cache.invalidate_all()
+        logger.info(f"Replaced {len(chunk_ids)} near-duplicate chunks in {len(set(replaced.values()))} documents")
+
+    async def sync(self, document_id: str, deleted: List[str], rows: List[Dict]):
+        """Track chunks changed outside plan/commit (DocumentSync)."""
+        if deleted:
+            await asyncio.to_thread(self.index.remove_chunks, deleted)
+        signatures = await asyncio.to_thread(self._signatures, [row['chunk_text'] for row in rows])
+        entries = [(row['id'], document_id, s) for row, s in zip(rows, signatures) if s is not None]
+        await asyncio.to_thread(self.index.add, entries)
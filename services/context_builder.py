@@ -3,11 +3,14 @@ Phase 3: Context Builder Service
 
 Assembles LLM-ready context from RAG results with citations.
 Supports multiple LLM providers (Claude, OpenAI, Gemini).
+Optionally diversifies results first (services/context_selection.py).
 """
 
 from dataclasses import dataclass
 from typing import List, Dict, Literal, Optional
+from services.context_selection import collapse_adjacent, select_diverse
 from services.rag_service import RAGResult
+from utils.tokenizer import Tokenizer, get_shared_token_counter
 
 
 @dataclass
@@ -22,14 +25,31 @@ class LLMContext:
 class ContextBuilder:
     """Build LLM-ready context from RAG results."""
     
-    def __init__(self, max_tokens: int = 4000):
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        token_counter: Optional[Tokenizer] = None,
+        diversify: bool = False,
+        mmr_lambda: float = 0.7,
+        duplicate_threshold: float = 0.95
+    ):
         """
         Initialize context builder.
         
         Args:
             max_tokens: Maximum tokens for context (default 4000)
+            token_counter: Token counter (default: shared cached counter)
+            diversify: Merge adjacent chunks and select results by MMR
+                per token instead of taking them in similarity order
+            mmr_lambda: Relevance vs. diversity trade-off (1 = relevance only)
+            duplicate_threshold: Similarity at which a result is dropped as
+                a near-duplicate of one already selected
         """
         self.max_tokens = max_tokens
+        self.token_counter = token_counter or get_shared_token_counter()
+        self.diversify = diversify
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
     
     def build_context(
         self,
@@ -62,30 +82,25 @@ class ContextBuilder:
         total_tokens = 0
         truncated = False
         
-        for i, result in enumerate(rag_results, 1):
-            chunk_tokens = self._estimate_tokens(result.chunk_text)
+        if self.diversify:
+            rag_results = collapse_adjacent(rag_results)
+        
+        # One batched (cached) count for all chunk texts
+        text_tokens = self.token_counter.count_many(r.chunk_text for r in rag_results)
+        
+        if self.diversify:
+            rag_results, text_tokens, truncated = self._select(rag_results, text_tokens, format)
+        
+        for result, result_tokens in zip(rag_results, text_tokens):
+            header = self._format_header(len(sources) + 1, result.document_title, format)
+            chunk_tokens = result_tokens + self.token_counter.count(header)
             
-            # Check token budget
+            # Check token budget; a later, shorter result may still fit
             if total_tokens + chunk_tokens > self.max_tokens:
                 truncated = True
-                break
+                continue
             
-            # Format based on provider
-            if format == "claude":
-                context_parts.append(
-                    f"[Source {i}: {result.document_title}]\n"
-                    f"{result.chunk_text}\n"
-                )
-            elif format == "openai":
-                context_parts.append(
-                    f"### Source {i}: {result.document_title}\n"
-                    f"{result.chunk_text}\n"
-                )
-            else:  # gemini
-                context_parts.append(
-                    f"**Source {i}**: {result.document_title}\n"
-                    f"{result.chunk_text}\n"
-                )
+            context_parts.append(f"{header}\n{result.chunk_text}\n")
             
             # Track sources for citations
             sources.append({
@@ -140,10 +155,25 @@ class ContextBuilder:
         
         return "\n".join(parts)
     
+    def _select(self, results: List[RAGResult], text_tokens: List[int], format: str):
+        """MMR selection under the budget (headers costed at the widest number)."""
+        header_tokens = self.token_counter.count_many(
+            self._format_header(len(results), r.document_title, format) for r in results
+        )
+        costs = [text + header for text, header in zip(text_tokens, header_tokens)]
+        keep, truncated = select_diverse(
+            results, costs, self.max_tokens, self.mmr_lambda, self.duplicate_threshold
+        )
+        return [results[i] for i in keep], [text_tokens[i] for i in keep], truncated
+    
     @staticmethod
-    def _estimate_tokens(text: str) -> int:
-        """Estimate token count (chars / 4 heuristic)."""
-        return max(1, len(text) // 4)
+    def _format_header(number: int, title: str, format: str) -> str:
+        """Source header line for the LLM provider format."""
+        if format == "claude":
+            return f"[Source {number}: {title}]"
+        if format == "openai":
+            return f"### Source {number}: {title}"
+        return f"**Source {number}**: {title}"  # gemini
     
     def get_sources_summary(self, context: LLMContext) -> str:
         """Generate human-readable sources summary."""
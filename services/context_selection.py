@@ -0,0 +1,145 @@
+"""
+Phase 3: Context Selection
+
+Chooses which RAG results go into an LLM context when the token budget
+is tight, instead of taking them in similarity order:
+1. collapse_adjacent: consecutive chunks of one document (chunk_index
+   n, n+1, ...) are merged into one passage with the chunker overlap
+   removed, so the shared text is paid for once
+2. select_diverse: maximal marginal relevance over the candidates'
+   pairwise similarity matrix (one NumPy product); near-duplicates are
+   dropped and the rest are packed greedily by marginal gain per token
+
+Similarity uses the results' embeddings when every result has one (the
+local vector backends return their stored vectors), and hashed
+term-frequency vectors of the chunk text otherwise (no API call).
+"""
+
+from dataclasses import replace
+from typing import List, Sequence, Tuple
+import re
+import zlib
+
+import numpy as np
+
+from services.rag_results import RAGResult
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix
+
+_WORD = re.compile(r"\w+")
+_TEXT_DIMENSIONS = 2048
+_OVERLAP_PROBE = 32
+
+
+def merge_overlap(first: str, second: str, max_overlap: int = 8000) -> str:
+    """
+    Join two consecutive chunks, dropping the longest suffix of first
+    that second starts with (overlaps shorter than 32 chars are kept).
+    """
+    probe = second[:_OVERLAP_PROBE]
+    if len(probe) == _OVERLAP_PROBE:
+        pos = first.find(probe, max(0, len(first) - max_overlap))
+        while pos != -1:
+            if second.startswith(first[pos:]):
+                return first[:pos] + second
+            pos = first.find(probe, pos + 1)
+    return f"{first}\n{second}"
+
+
+def collapse_adjacent(results: List[RAGResult]) -> List[RAGResult]:
+    """
+    Merge runs of consecutive chunks from the same document.
+
+    A merged passage keeps the best member's score and rank position
+    and its lowest chunk_index; metadata['chunk_indexes'] lists members.
+    """
+    by_position = {(r.document_id, r.chunk_index): r for r in results}
+    merged, absorbed = {}, set()
+    for result in sorted(results, key=lambda r: (r.document_id, r.chunk_index)):
+        key = (result.document_id, result.chunk_index)
+        if key in absorbed:
+            continue
+        run = [result]
+        while (result.document_id, run[-1].chunk_index + 1) in by_position:
+            run.append(by_position[(result.document_id, run[-1].chunk_index + 1)])
+            absorbed.add((result.document_id, run[-1].chunk_index))
+        if len(run) == 1:
+            merged[id(result)] = result
+            continue
+        best = max(run, key=lambda r: r.similarity_score)
+        text = run[0].chunk_text
+        for part in run[1:]:
+            text = merge_overlap(text, part.chunk_text)
+        merged[id(best)] = replace(
+            best, chunk_text=text, chunk_index=run[0].chunk_index,
+            metadata={**best.metadata, 'chunk_indexes': [r.chunk_index for r in run]}
+        )
+    return [merged[id(r)] for r in results if id(r) in merged]
+
+
+def result_vectors(results: Sequence[RAGResult]) -> np.ndarray:
+    """Unit vectors for similarity: embeddings, or hashed word counts."""
+    if results and all(r.embedding is not None for r in results):
+        return normalize_matrix(np.stack([to_float32(r.embedding) for r in results]))
+    matrix = np.zeros((len(results), _TEXT_DIMENSIONS), dtype=np.float32)
+    for row, result in enumerate(results):
+        buckets = [zlib.crc32(w.encode()) % _TEXT_DIMENSIONS for w in _WORD.findall(result.chunk_text.lower())]
+        np.add.at(matrix[row], buckets, 1.0)
+    return normalize_matrix(matrix)
+
+
+def select_diverse(
+    results: Sequence[RAGResult],
+    token_costs: Sequence[int],
+    budget: int,
+    mmr_lambda: float = 0.7,
+    duplicate_threshold: float = 0.95
+) -> Tuple[List[int], bool]:
+    """
+    Pick results by maximal marginal relevance under a token budget.
+
+    Each step takes the candidate with the highest MMR gain per token,
+    gain = lambda * relevance - (1 - lambda) * max similarity to the
+    already selected results, among candidates that still fit. A
+    negative gain is multiplied by the cost instead, so among redundant
+    candidates the cheapest is preferred.
+
+    Args:
+        results: Candidates (relevance = similarity_score)
+        token_costs: Tokens each candidate adds to the context
+        budget: Token budget
+        mmr_lambda: 1 = relevance only, 0 = diversity only
+        duplicate_threshold: Similarity at which a candidate is a duplicate
+
+    Returns:
+        (selected indexes in original order, whether any non-duplicate
+        candidate was left out for lack of budget)
+    """
+    n = len(results)
+    if n == 0:
+        return [], False
+    vectors = result_vectors(results)
+    similarity = vectors @ vectors.T
+    relevance = np.array([r.similarity_score for r in results], dtype=np.float32)
+    costs = np.maximum(np.asarray(token_costs, dtype=np.float32), 1.0)
+
+    redundancy = np.zeros(n, dtype=np.float32)
+    open_ = np.ones(n, dtype=bool)
+    selected, remaining = [], budget
+    while True:
+        open_ &= (costs <= remaining) & (redundancy < duplicate_threshold)
+        if not open_.any():
+            break
+        gain = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        per_token = np.where(gain > 0, gain / costs, gain * costs)
+        per_token = np.where(open_, per_token, -np.inf)
+        pick = int(np.argmax(per_token))
+        selected.append(pick)
+        remaining -= costs[pick]
+        open_[pick] = False
+        redundancy = np.maximum(redundancy, similarity[pick])
+
+    chosen = np.zeros(n, dtype=bool)
+    chosen[selected] = True
+    left_out = ~chosen & (redundancy < duplicate_threshold)
+    return sorted(selected), bool(left_out.any())
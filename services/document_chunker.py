@@ -4,12 +4,24 @@ Phase 3: Document Chunker Service
 Splits documents into optimal chunks for embedding.
 Strategy: Recursive character-based splitting with paragraph boundaries.
 Target: 500 tokens (~2000 chars), 50 token overlap (~200 chars)
+
+With a token_counter, sizes are real token counts: the whole-text check
+counts a bounded prefix first, and the last-resort hard split cuts on
+token boundaries (binary search over prefix counts) so text without
+separators (CJK, minified code) stays within the token budget.
 """
 
+from collections import deque
+from itertools import chain
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
 import re
 
+from utils.tokenizer import Tokenizer
+
+# Upper bound on characters per token when probing token counts
+_MAX_CHARS_PER_TOKEN = 8
+
 
 @dataclass
 class DocumentChunk:
@@ -27,7 +39,8 @@ class DocumentChunker:
         self,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
-        separators: Optional[List[str]] = None
+        separators: Optional[List[str]] = None,
+        token_counter: Optional[Tokenizer] = None
     ):
         """
         Initialize chunker with size and overlap settings.
@@ -36,10 +49,12 @@ class DocumentChunker:
             chunk_size: Target tokens per chunk (default 500)
             chunk_overlap: Overlap tokens between chunks (default 50)
             separators: Text separators to split on (paragraphs, sentences)
+            token_counter: Size chunks in real tokens (None: ~4 chars per token)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators or ["\n\n", "\n", ". ", " "]
+        self.token_counter = token_counter
     
     def chunk_text(self, text: str, document_id: str) -> List[DocumentChunk]:
         """
@@ -59,21 +74,23 @@ class DocumentChunker:
         chunks_text = self._recursive_split(text)
         
         # Create DocumentChunk objects with metadata
-        chunks = []
-        for i, chunk_text in enumerate(chunks_text):
-            chunk = DocumentChunk(
-                text=chunk_text,
-                chunk_index=i,
-                token_count=self.estimate_tokens(chunk_text),
-                metadata={
-                    'document_id': document_id,
-                    'char_count': len(chunk_text),
-                    'separator_used': self._detect_separator(chunk_text)
-                }
-            )
-            chunks.append(chunk)
-        
-        return chunks
+        return [
+            self._make_chunk(chunk_text, i, document_id)
+            for i, chunk_text in enumerate(chunks_text)
+        ]
+    
+    def _make_chunk(self, chunk_text: str, index: int, document_id: str) -> DocumentChunk:
+        """Wrap chunk text with token count and metadata."""
+        return DocumentChunk(
+            text=chunk_text,
+            chunk_index=index,
+            token_count=self.token_counter.count(chunk_text) if self.token_counter else self.estimate_tokens(chunk_text),
+            metadata={
+                'document_id': document_id,
+                'char_count': len(chunk_text),
+                'separator_used': self._detect_separator(chunk_text)
+            }
+        )
     
     def _recursive_split(self, text: str) -> List[str]:
         """
@@ -82,11 +99,8 @@ class DocumentChunker:
         Tries separators in order (paragraphs → sentences → words)
         until chunks are small enough.
         """
-        target_chars = self.chunk_size * 4  # Rough char estimate
-        overlap_chars = self.chunk_overlap * 4
-        
         # Base case: text is small enough
-        if len(text) <= target_chars:
+        if self._fits(text):
             return [text] if text.strip() else []
         
         # Try each separator
@@ -95,60 +109,121 @@ class DocumentChunker:
             
             # Check if separator produces useful splits
             if len(splits) > 1:
-                chunks = self._merge_splits(
-                    splits, 
-                    separator, 
-                    target_chars, 
-                    overlap_chars
-                )
-                return chunks
-        
-        # Fallback: hard split by characters
-        return self._hard_split(text, target_chars, overlap_chars)
+                return list(self._merge_splits(splits, separator))
+        
+        # Fallback: hard split by tokens (or characters)
+        if self.token_counter is not None:
+            return list(self._iter_token_split([text]))
+        return self._hard_split(text, self.chunk_size * 4, self.chunk_overlap * 4)
     
-    def _merge_splits(
-        self, 
-        splits: List[str], 
-        separator: str,
-        target_size: int,
-        overlap: int
-    ) -> List[str]:
-        """Merge splits into chunks of target size with overlap."""
-        chunks = []
-        current_chunk = []
+    def _fits(self, text: str) -> bool:
+        """
+        Whether text fits one chunk.
+        
+        In token mode a prefix of chunk_size * _MAX_CHARS_PER_TOKEN chars
+        is counted first, so large documents are not tokenized in full
+        just to learn they need splitting.
+        """
+        size, target, _ = self._sizing()
+        if self.token_counter is None:
+            return size(text) <= target
+        window = target * _MAX_CHARS_PER_TOKEN
+        if len(text) > window and size(text[:window]) > target:
+            return False
+        return size(text) <= target
+    
+    def _iter_token_split(self, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Hard split into chunks of at most chunk_size tokens (last resort).
+        
+        Each chunk is the longest prefix within the budget, found by
+        binary search over prefix counts (assumed monotone); the next
+        chunk starts chunk_overlap tokens before its end. A chunk is cut
+        only once a full probe window is buffered, so any split of the
+        input into pieces yields the same chunks.
+        """
+        window = self.chunk_size * _MAX_CHARS_PER_TOKEN
+        buffer = ''
+        for piece in chain(pieces, [None]):
+            if piece is not None:
+                buffer += piece
+            while buffer and (piece is None or len(buffer) >= window):
+                end = self._longest_within(buffer, self.chunk_size, from_end=False)
+                if buffer[:end].strip():
+                    yield buffer[:end]
+                if end == len(buffer):
+                    buffer = ''
+                    break
+                keep = self._longest_within(buffer[:end], self.chunk_overlap, from_end=True)
+                buffer = buffer[end - keep if keep < end else end:]  # always advance
+    
+    def _longest_within(self, text: str, budget: int, from_end: bool) -> int:
+        """
+        Longest prefix (or suffix) length of text, at most budget tokens.
+        
+        Always at least one character for prefixes, so splitting advances.
+        """
+        lo = 1 if not from_end else 0
+        hi = min(len(text), max(budget, 1) * _MAX_CHARS_PER_TOKEN)
+        count = self.token_counter.count
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            part = text[len(text) - mid:] if from_end else text[:mid]
+            if count(part) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+    
+    def _sizing(self) -> Tuple[Callable[[str], int], int, int]:
+        """(size function, target size, overlap) in real tokens or chars."""
+        if self.token_counter is not None:
+            return self.token_counter.count, self.chunk_size, self.chunk_overlap
+        return len, self.chunk_size * 4, self.chunk_overlap * 4  # Rough char estimate
+    
+    def _merge_splits(self, splits: Iterable[str], separator: str) -> Iterator[str]:
+        """
+        Lazily merge splits into chunks of target size with overlap.
+        
+        Linear time (running size + deques, no rescans or reinserts).
+        In token mode each split also pays for its separator.
+        """
+        size, target_size, overlap = self._sizing()
+        join_cost = size(separator) if self.token_counter is not None else 0
+        current_chunk: Deque[str] = deque()
+        sizes: Deque[int] = deque()
         current_size = 0
         
         for split in splits:
-            split_size = len(split)
-            
+            split_size = size(split) + join_cost
             if current_size + split_size > target_size and current_chunk:
                 # Save current chunk
-                chunks.append(separator.join(current_chunk))
+                yield separator.join(current_chunk)
                 
                 # Start new chunk with overlap (keep last splits)
-                current_chunk = self._get_overlap_splits(current_chunk, overlap)
-                current_size = sum(len(s) for s in current_chunk)
+                keep = self._overlap_count(sizes, overlap)
+                while len(current_chunk) > keep:
+                    current_chunk.popleft()
+                    current_size -= sizes.popleft()
             
             current_chunk.append(split)
+            sizes.append(split_size)
             current_size += split_size
         
         # Add remaining chunk
         if current_chunk:
-            chunks.append(separator.join(current_chunk))
-        
-        return chunks
+            yield separator.join(current_chunk)
     
-    def _get_overlap_splits(self, splits: List[str], overlap: int) -> List[str]:
-        """Get splits for overlap window."""
-        overlap_splits = []
-        overlap_size = 0
-        for s in reversed(splits):
-            if overlap_size + len(s) <= overlap:
-                overlap_splits.insert(0, s)
-                overlap_size += len(s)
-            else:
+    @staticmethod
+    def _overlap_count(sizes: Deque[int], overlap: int) -> int:
+        """Number of trailing splits that fit in the overlap window."""
+        count = overlap_size = 0
+        for split_size in reversed(sizes):
+            if overlap_size + split_size > overlap:
                 break
-        return overlap_splits
+            overlap_size += split_size
+            count += 1
+        return count
     
     def _hard_split(self, text: str, target_size: int, overlap: int) -> List[str]:
         """Hard split by characters (last resort)."""
@@ -175,7 +250,7 @@ class DocumentChunker:
         """
         Estimate token count (chars / 4 heuristic).
         
-        This is approximate. For exact counts, use tiktoken.
+        This is approximate. For exact counts, pass a token_counter.
         """
         return max(1, len(text) // 4)
     
@@ -183,7 +258,6 @@ class DocumentChunker:
         """Get statistics about chunked document."""
         if not chunks:
             return {'total_chunks': 0, 'total_tokens': 0, 'avg_tokens_per_chunk': 0, 'min_tokens': 0, 'max_tokens': 0}
-        
         token_counts = [c.token_count for c in chunks]
         return {
             'total_chunks': len(chunks),
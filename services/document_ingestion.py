@@ -3,12 +3,22 @@ Phase 3: Document Ingestion Service
 
 End-to-end pipeline: Document → Chunks → Embeddings → Supabase
 Orchestrates chunker and embedding services.
+Incremental re-ingestion by external key: services/document_sync.py
+Near-duplicate chunks (skip/link/replace): services/chunk_dedup.py
 """
 
-from typing import Optional, Dict
+from typing import Dict, List, Optional
+import asyncio
 import logging
+from services.bulk_chunk_writer import BulkChunkWriter
+from services.chunk_dedup import ChunkDeduplicator, DedupPlan, plan_chunks
 from services.document_chunker import DocumentChunker
 from services.embedding_service import EmbeddingService
+from services.ingestion_pipeline import IngestionPipeline
+from services.lexical_index import BM25Index
+from services.rag_cache import RAGResultCache, get_shared_rag_cache
+from services.vector_search import VectorSearchBackend
+from utils.tokenizer import get_shared_token_counter
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +30,12 @@ class DocumentIngestionService:
         self,
         supabase_client,
         chunker: Optional[DocumentChunker] = None,
-        embedding_service: Optional[EmbeddingService] = None
+        embedding_service: Optional[EmbeddingService] = None,
+        vector_index: Optional[VectorSearchBackend] = None,
+        rag_cache: Optional[RAGResultCache] = None,
+        bulk_writer: Optional[BulkChunkWriter] = None,
+        lexical_index: Optional[BM25Index] = None,
+        deduplicator: Optional[ChunkDeduplicator] = None
     ):
         """
         Initialize ingestion service.
@@ -29,15 +44,24 @@ class DocumentIngestionService:
             supabase_client: Supabase client
             chunker: DocumentChunker (default if None)
             embedding_service: EmbeddingService (default if None)
+            vector_index: Local backend kept current on ingest
+                (LocalVectorIndex or SegmentVectorBackend)
+            rag_cache: RAG result cache to invalidate (shared if None)
+            bulk_writer: Paged chunk writer (default if None)
+            lexical_index: In-process BM25 index kept current on ingest
+            deduplicator: Near-duplicate chunk policy applied before
+                embedding (every chunk is embedded if None)
         """
         self.supabase = supabase_client
-        self.chunker = chunker or DocumentChunker()
+        self.chunker = chunker or DocumentChunker(token_counter=get_shared_token_counter())
         self.embedding_service = embedding_service or EmbeddingService(
-            supabase_client,
-            primary_model="openai",
-            use_cache=True,
-            fallback_to_local=True
+            supabase_client, primary_model="openai", use_cache=True, fallback_to_local=True
         )
+        self.vector_index = vector_index
+        self.rag_cache = rag_cache or get_shared_rag_cache()
+        self.bulk_writer = bulk_writer or BulkChunkWriter(supabase_client)
+        self.lexical_index = lexical_index
+        self.deduplicator = deduplicator
     
     async def ingest_document(
         self,
@@ -55,7 +79,8 @@ class DocumentIngestionService:
         Steps:
         1. Insert document record
         2. Chunk document text
-        3. Generate embeddings for chunks
+        3. Resolve near-duplicate chunks (if a deduplicator is set)
+           and generate embeddings for the rest
         4. Insert chunks with embeddings
         5. Return statistics
         
@@ -70,10 +95,44 @@ class DocumentIngestionService:
             
         Returns:
             Statistics dict with document_id, chunk count, etc.
+            (plus 'dedup' counts when deduplicating)
         """
         logger.info(f"Ingesting document: {title}")
         
         # 1. Insert document
+        document_id = self._insert_document(title, content, created_by, document_type, team_id, visibility, metadata)
+        
+        # 2. Chunk document
+        chunks = self.chunker.chunk_text(content, document_id)
+        logger.info(f"Created {len(chunks)} chunks")
+        
+        if not chunks:
+            logger.warning("No chunks created (empty document?)")
+            return self._stats(document_id, chunks, [])
+        
+        # 3. Resolve near-duplicates, then generate embeddings (batch)
+        plan = await plan_chunks(self.deduplicator, document_id, chunks)
+        try:
+            generated = await self.embedding_service.generate_embeddings_batch([c.text for c in plan.to_embed])
+            logger.info(f"Generated {len(generated)} embeddings")
+            
+            # 4. Insert chunks with embeddings
+            plan.fill(generated)
+            rows = await asyncio.to_thread(self.bulk_writer.write, plan.records())
+        except Exception:
+            plan.abort()
+            raise
+        logger.info(f"Inserted {len(rows)} chunks")
+        await self._publish(rows, title, visibility, created_by, plan)
+        
+        # 5. Return statistics
+        return self._stats(document_id, chunks, generated, plan)
+    
+    def _insert_document(
+        self, title, content, created_by, document_type='guide',
+        team_id=None, visibility='private', metadata=None, external_key=None
+    ) -> str:
+        """Insert the documents row (blocking) and return its id."""
         doc_result = self.supabase.table('documents').insert({
             'title': title,
             'content': content,
@@ -81,96 +140,61 @@ class DocumentIngestionService:
             'created_by': created_by,
             'team_id': team_id,
             'visibility': visibility,
-            'metadata': metadata or {}
+            'metadata': metadata or {},
+            'external_key': external_key
         }).execute()
-        
         document_id = doc_result.data[0]['id']
         logger.info(f"Document created: {document_id}")
+        return document_id
+    
+    @property
+    def local_indexes(self) -> List:
+        """Configured in-process indexes (vector and/or lexical)."""
+        return [index for index in (self.vector_index, self.lexical_index) if index is not None]
+    
+    async def _publish(self, rows: List[Dict], title: str, visibility: str, created_by: str, plan: DedupPlan):
+        """Make inserted chunks searchable locally and drop stale RAG results."""
+        for index in self.local_indexes:
+            index.add_chunks([{**row, 'document_title': title} for row in rows])
+        await plan.commit(self.local_indexes, self.rag_cache)
         
-        # 2. Chunk document
-        chunks = self.chunker.chunk_text(content, document_id)
-        logger.info(f"Created {len(chunks)} chunks")
-        
+        # New content is visible: drop cached RAG results for its scope
+        if rows:
+            self.rag_cache.invalidate_for_document(visibility, created_by)
+    
+    def _stats(self, document_id: str, chunks: List, embeddings: List, plan: Optional[DedupPlan] = None) -> dict:
         if not chunks:
-            logger.warning("No chunks created (empty document?)")
-            return {
-                'document_id': document_id,
-                'chunks_created': 0,
-                'embeddings_generated': 0,
-                'total_tokens': 0
-            }
-        
-        # 3. Generate embeddings (batch)
-        chunk_texts = [chunk.text for chunk in chunks]
-        embeddings = await self.embedding_service.generate_embeddings_batch(
-            chunk_texts
-        )
-        logger.info(f"Generated {len(embeddings)} embeddings")
-        
-        # 4. Insert chunks with embeddings
-        chunk_records = []
-        for chunk, embedding in zip(chunks, embeddings):
-            chunk_records.append({
-                'document_id': document_id,
-                'chunk_text': chunk.text,
-                'chunk_index': chunk.chunk_index,
-                'embedding': embedding,
-                'token_count': chunk.token_count,
-                'metadata': chunk.metadata
-            })
-        
-        self.supabase.table('document_chunks').insert(chunk_records).execute()
-        logger.info(f"Inserted {len(chunk_records)} chunks")
-        
-        # 5. Return statistics
+            return {'document_id': document_id, 'chunks_created': 0, 'embeddings_generated': 0, 'total_tokens': 0}
         stats = self.chunker.get_chunk_stats(chunks)
-        
-        return {
+        result = {
             'document_id': document_id,
             'chunks_created': len(chunks),
             'embeddings_generated': len(embeddings),
             'total_tokens': stats['total_tokens'],
             'avg_tokens_per_chunk': stats['avg_tokens_per_chunk']
         }
+        if self.deduplicator and plan:
+            result['dedup'] = plan.stats
+        return result
     
     async def ingest_documents_batch(
         self,
         documents: list[dict],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        pipeline: Optional[IngestionPipeline] = None,
+        parallel_chunker=None
     ) -> dict:
         """
-        Ingest multiple documents.
+        Ingest multiple documents through a staged, concurrent pipeline.
         
         Args:
-            documents: List of document dicts (title, content, created_by, ...)
+            documents: Document dicts (title, content, created_by, external_key, ...)
             progress_callback: Optional function called after each document
+            pipeline: IngestionPipeline with custom stage concurrency
+            parallel_chunker: ParallelChunker for the default pipeline
             
         Returns:
-            Summary statistics
+            Summary statistics (document_ids in input order)
         """
-        total_docs = len(documents)
-        total_chunks = 0
-        total_embeddings = 0
-        errors = []
-        
-        for i, doc in enumerate(documents):
-            try:
-                stats = await self.ingest_document(**doc)
-                total_chunks += stats['chunks_created']
-                total_embeddings += stats['embeddings_generated']
-                
-                if progress_callback:
-                    progress_callback(i + 1, total_docs, doc['title'])
-                
-            except Exception as e:
-                logger.error(f"Failed to ingest '{doc.get('title')}': {e}")
-                errors.append({'title': doc.get('title'), 'error': str(e)})
-        
-        return {
-            'total_documents': total_docs,
-            'successful': total_docs - len(errors),
-            'failed': len(errors),
-            'total_chunks': total_chunks,
-            'total_embeddings': total_embeddings,
-            'errors': errors
-        }
+        pipeline = pipeline or IngestionPipeline(self, parallel_chunker=parallel_chunker)
+        return await pipeline.run(documents, progress_callback)
@@ -0,0 +1,216 @@
+"""
+Phase 3: Incremental Document Sync
+
+Re-ingests a document identified by a stable external key (file path,
+wiki page id, ...) so the cost is proportional to the edit size:
+- each chunk is hashed (SHA-256 of its text) and diffed against the
+  content_hash of the document's existing chunks
+- only new or changed chunks are embedded and inserted
+- chunks that merely moved get their chunk_index updated in place
+- chunks no longer present are deleted; unchanged rows are not touched
+  (in Supabase or in the local indexes, which are updated by chunk id)
+- the ingestion deduplicator's index follows deleted and added chunks
+  (synced documents are tracked for near-duplicates, never deduplicated)
+
+Keys are scoped to their owner (created_by): a sync only ever updates the
+caller's own document, and never changes its owner, visibility or team.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from services.bulk_chunk_writer import chunk_records
+from services.document_chunker import DocumentChunk
+from services.embedding_cache import text_hash
+from utils.supabase_batch import delete_in, select_in
+
+logger = logging.getLogger(__name__)
+
+# Ownership and sharing columns a sync never rewrites
+_SCOPE_FIELDS = ('created_by', 'visibility', 'team_id')
+
+
+@dataclass
+class ChunkDiff:
+    """How new chunks relate to a document's stored chunks."""
+    unchanged: List[str] = field(default_factory=list)          # chunk ids
+    moved: List[Tuple[str, int]] = field(default_factory=list)  # (id, new index)
+    added: List[DocumentChunk] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+def diff_chunks(chunks: List[DocumentChunk], existing: List[Dict]) -> ChunkDiff:
+    """
+    Match chunks to stored rows by content hash.
+
+    A row at the same position is preferred; otherwise any row with the
+    same hash is reused (and moved). Leftover rows are deleted.
+
+    Args:
+        chunks: Freshly chunked document
+        existing: Stored rows (id, chunk_index, content_hash)
+    """
+    diff = ChunkDiff()
+    pool: Dict[str, Dict[int, str]] = defaultdict(dict)
+    for row in existing:
+        pool[row.get('content_hash')][row['chunk_index']] = row['id']
+
+    unmatched = []
+    for chunk in chunks:
+        rows = pool.get(text_hash(chunk.text))
+        if rows and chunk.chunk_index in rows:
+            diff.unchanged.append(rows.pop(chunk.chunk_index))
+        else:
+            unmatched.append(chunk)
+
+    for chunk in unmatched:
+        rows = pool.get(text_hash(chunk.text))
+        if rows:
+            diff.moved.append((rows.pop(next(iter(rows))), chunk.chunk_index))
+        else:
+            diff.added.append(chunk)
+
+    diff.deleted = [chunk_id for rows in pool.values() for chunk_id in rows.values()]
+    return diff
+
+
+class DocumentSync:
+    """Incremental ingestion on top of a DocumentIngestionService."""
+
+    def __init__(self, ingestion):
+        """
+        Args:
+            ingestion: DocumentIngestionService (supplies the Supabase
+                client, chunker, embedding service, index and RAG cache)
+        """
+        self.ingestion = ingestion
+        self.supabase = ingestion.supabase
+
+    async def _execute(self, query):
+        return (await asyncio.to_thread(query.execute)).data
+
+    async def sync(
+        self,
+        external_key: str,
+        title: str,
+        content: str,
+        created_by: str,
+        document_type: str = 'guide',
+        team_id: Optional[str] = None,
+        visibility: str = 'private',
+        metadata: Optional[Dict] = None
+    ) -> dict:
+        """
+        Create or update created_by's document stored under external_key.
+
+        An existing document keeps its visibility and team; only title,
+        content, type and metadata are updated.
+
+        Returns:
+            Statistics dict with document_id and per-chunk outcome counts
+        """
+        fields = {
+            'title': title, 'content': content, 'document_type': document_type,
+            'created_by': created_by, 'team_id': team_id,
+            'visibility': visibility, 'metadata': metadata or {}
+        }
+        found = await self._execute(
+            self.supabase.table('documents')
+            .select('id, title, visibility, team_id, created_by')
+            .eq('external_key', external_key).eq('created_by', created_by).limit(1)
+        )
+        if found:
+            document_id = found[0]['id']
+            if (found[0]['visibility'], found[0]['team_id']) != (visibility, team_id):
+                logger.warning(f"Sync of '{external_key}' keeps the document's existing visibility and team")
+            fields.update({k: found[0][k] for k in _SCOPE_FIELDS})
+            content_fields = {k: v for k, v in fields.items() if k not in _SCOPE_FIELDS}
+            await self._execute(
+                self.supabase.table('documents').update(content_fields)
+                .eq('id', document_id).eq('created_by', created_by)
+            )
+            existing = await self._execute(
+                self.supabase.table('document_chunks')
+                .select('id, chunk_index, content_hash')
+                .eq('document_id', document_id)
+            )
+        else:
+            inserted = await self._execute(
+                self.supabase.table('documents').insert({**fields, 'external_key': external_key})
+            )
+            document_id, existing = inserted[0]['id'], []
+
+        chunks = self.ingestion.chunker.chunk_text(content, document_id)
+        diff = diff_chunks(chunks, existing)
+
+        # Embed before writing so a provider failure leaves the document intact
+        embeddings = await self.ingestion.embedding_service.generate_embeddings_batch(
+            [chunk.text for chunk in diff.added]
+        ) if diff.added else []
+        new_rows = await self._apply(document_id, diff, embeddings)
+
+        changed = bool(diff.added or diff.moved or diff.deleted)
+        retitled = bool(found) and found[0]['title'] != title
+        if (changed or retitled) and self.ingestion.local_indexes:
+            await self._refresh_index(title, retitled, diff, new_rows)
+        self._invalidate(found[0] if found else None, fields, changed)
+
+        logger.info(
+            f"Synced '{external_key}': {len(diff.unchanged)} unchanged, "
+            f"{len(diff.moved)} moved, {len(diff.added)} added, {len(diff.deleted)} deleted"
+        )
+        return {
+            'document_id': document_id,
+            'created': not found,
+            'chunks_total': len(chunks),
+            'chunks_unchanged': len(diff.unchanged),
+            'chunks_moved': len(diff.moved),
+            'chunks_added': len(diff.added),
+            'chunks_deleted': len(diff.deleted),
+            'embeddings_generated': len(embeddings),
+            'total_tokens': sum(chunk.token_count for chunk in chunks)
+        }
+
+    async def _apply(self, document_id: str, diff: ChunkDiff, embeddings: List) -> List[Dict]:
+        """Delete, reindex, then insert (keeps (document_id, chunk_index) unique)."""
+        if diff.deleted:
+            await delete_in(self.supabase, 'document_chunks', 'id', diff.deleted)
+        if diff.moved:
+            ids, indexes = zip(*diff.moved)
+            await self._execute(self.supabase.rpc(
+                'reindex_document_chunks',
+                {'doc_id': document_id, 'chunk_ids': list(ids), 'chunk_indexes': list(indexes)}
+            ))
+        records = chunk_records(document_id, diff.added, embeddings)
+        rows = await asyncio.to_thread(self.ingestion.bulk_writer.write, records) if records else []
+        if self.ingestion.deduplicator:
+            await self.ingestion.deduplicator.sync(document_id, diff.deleted, rows)
+        return rows
+
+    async def _refresh_index(self, title: str, retitled: bool, diff: ChunkDiff, new_rows: List[Dict]):
+        """
+        Apply the diff to the local vector / lexical indexes by chunk id.
+
+        Unchanged chunks stay as they are (unless the title changed);
+        moved chunks are re-read for their new chunk_index.
+        """
+        stale = [chunk_id for chunk_id, _ in diff.moved] + (diff.unchanged if retitled else [])
+        stale_rows = await select_in(
+            self.supabase, 'document_chunks', 'id, document_id, chunk_text, chunk_index, embedding', 'id', stale
+        ) if stale else []
+        for index in self.ingestion.local_indexes:
+            index.remove_chunks(diff.deleted + stale)
+            index.add_chunks([{**row, 'document_title': title} for row in stale_rows + new_rows])
+
+    def _invalidate(self, previous: Optional[Dict], fields: Dict, chunks_changed: bool):
+        """Drop cached RAG results that may now be stale (old and new scope)."""
+        cache = self.ingestion.rag_cache
+        scope_keys = ('title', 'visibility', 'team_id', 'created_by')
+        if previous and any(previous[k] != fields[k] for k in scope_keys):
+            cache.invalidate_for_document(previous['visibility'], previous['created_by'])
+        elif previous and not chunks_changed:
+            return
+        cache.invalidate_for_document(fields['visibility'], fields['created_by'])
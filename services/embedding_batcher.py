@@ -0,0 +1,132 @@
+"""
+Phase 3: Embedding Batcher
+
+Packs texts submitted by many owners (e.g. documents in a batch ingest)
+into full embedding requests and runs them on concurrent workers:
+- submit() applies backpressure through a bounded queue
+- a packer fills batches up to batch_size, waiting at most linger_seconds
+  for a partial batch to fill
+- results and failures are reported per owner through callbacks; when a
+  shared batch fails it is retried per owner, so only the owners whose
+  texts really fail are reported as failed (and their later texts skipped)
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class EmbeddingBatcher:
+    """Cross-owner batching in front of EmbeddingService."""
+
+    def __init__(
+        self,
+        embedding_service,
+        on_embedded: Callable[[Any, int, List[float]], None],
+        on_failed: Callable[[Any, Exception], None],
+        workers: int = 4,
+        batch_size: int = 100,
+        linger_seconds: float = 0.05,
+        max_pending: int = 2000
+    ):
+        """
+        Args:
+            embedding_service: Object with generate_embeddings_batch()
+            on_embedded: Called as (owner, index, vector) per text
+            on_failed: Called once as (owner, error) per failed owner
+            workers: Concurrent embedding requests
+            batch_size: Texts per request
+            linger_seconds: Max wait to fill a partial batch
+            max_pending: Bound on submitted texts not yet batched
+        """
+        self.embedding_service = embedding_service
+        self.on_embedded = on_embedded
+        self.on_failed = on_failed
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._items: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._batches: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        self._tasks: List[asyncio.Task] = []
+        self._failed: Set[int] = set()
+        self.requests = 0
+
+    async def submit(self, owner: Any, index: int, text: str):
+        """Queue one text (waits while the queue is full)."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._pack())] + [
+                asyncio.create_task(self._work()) for _ in range(self.workers)
+            ]
+        await self._items.put((owner, index, text))
+
+    def fail(self, owner: Any, error: Exception):
+        """Mark an owner failed (reported once; its queued texts are skipped)."""
+        if id(owner) not in self._failed:
+            self._failed.add(id(owner))
+            self.on_failed(owner, error)
+
+    async def close(self):
+        """Embed everything submitted, then stop the workers."""
+        if not self._tasks:
+            return
+        packer, workers = self._tasks[0], self._tasks[1:]
+        await self._items.put(_DONE)
+        await packer
+        for _ in workers:
+            await self._batches.put(_DONE)
+        await asyncio.gather(*workers)
+        self._tasks = []
+
+    async def _pack(self):
+        batch = []
+        while True:
+            try:
+                timeout = self.linger_seconds if batch else None
+                item = await asyncio.wait_for(self._items.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+            if item is not None and item is not _DONE:
+                batch.append(item)
+            if batch and (item is None or item is _DONE or len(batch) >= self.batch_size):
+                await self._batches.put(batch)
+                batch = []
+            if item is _DONE:
+                return
+
+    async def _embed(self, texts: List[str]) -> List:
+        self.requests += 1
+        return await self.embedding_service.generate_embeddings_batch(
+            texts, batch_size=self.batch_size
+        )
+
+    async def _work(self):
+        while (batch := await self._batches.get()) is not _DONE:
+            live = [item for item in batch if id(item[0]) not in self._failed]
+            if not live:
+                continue
+            try:
+                vectors = await self._embed([text for _, _, text in live])
+            except Exception as e:
+                logger.warning(f"Embedding batch of {len(live)} failed, retrying per owner: {e}")
+                vectors = await self._embed_per_owner(live)
+
+            for (owner, index, _), vector in zip(live, vectors):
+                if id(owner) not in self._failed:
+                    self.on_embedded(owner, index, vector)
+
+    async def _embed_per_owner(self, items: List) -> List[Optional[List[float]]]:
+        """Isolate a failed batch: embed each owner's texts separately."""
+        vectors: Dict = {}
+        for owner in {id(owner): owner for owner, _, _ in items}.values():
+            mine = [(index, text) for other, index, text in items if other is owner]
+            try:
+                result = await self._embed([text for _, text in mine])
+            except Exception as e:
+                self.fail(owner, e)
+                continue
+            vectors.update(((id(owner), index), v) for (index, _), v in zip(mine, result))
+        return [vectors.get((id(owner), index)) for owner, index, _ in items]
@@ -0,0 +1,170 @@
+"""
+Phase 3: Embedding Cache
+
+Two-tier embedding cache:
+- L1: in-process float32 LRU (utils/vector_cache.py)
+- L2: shared Supabase embedding_cache table
+
+Lookups and inserts are batched so N texts cost one round-trip each way.
+Blocking Supabase calls run in a worker thread to keep the event loop free.
+Keys include the embedding size (utils/embedding_dimensions.py), so
+reduced-dimension vectors never collide with full-size ones.
+"""
+
+import asyncio
+import hashlib
+from typing import Dict, List, Optional
+import logging
+from services.cache_usage import CacheUsageRecorder
+from utils.embedding_dimensions import DEFAULT_EMBEDDING_DIMENSIONS, cache_key
+from utils.vector_cache import VectorLRUCache, get_shared_vector_cache, to_float32
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """Generate SHA-256 hash for cache key."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Read-through L1 cache in front of the embedding_cache table."""
+
+    def __init__(
+        self,
+        supabase_client,
+        model: str,
+        l1_cache: Optional[VectorLRUCache] = None,
+        usage_recorder: Optional[CacheUsageRecorder] = None,
+        dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            supabase_client: Supabase client
+            model: Model name recorded with new cache rows
+            l1_cache: In-process tier (process-wide shared cache if None)
+            usage_recorder: Deferred use_count accounting (new if None)
+            dimensions: Embedding size cached by this instance
+        """
+        self.supabase = supabase_client
+        self.model = model
+        self.dimensions = dimensions
+        self.l1 = l1_cache if l1_cache is not None else get_shared_vector_cache()
+        self.usage = usage_recorder or CacheUsageRecorder(supabase_client)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.lookups = 0  # distinct hashes per get_many(), both tiers
+        self.hits = 0
+
+    def _key(self, text_hash: str) -> str:
+        """embedding_cache row key (text hash, plus size if reduced)."""
+        return cache_key(text_hash, self.dimensions)
+
+    def _l1_key(self, text_hash: str) -> str:
+        """L1 is shared across models, so the key includes the model."""
+        return f"{self.model}:{self._key(text_hash)}"
+
+    async def get_many(self, text_hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up embeddings for many hashes with a single query.
+
+        Args:
+            text_hashes: SHA-256 text hashes (duplicates allowed)
+
+        Returns:
+            Dict of hash → embedding for the hashes found
+        """
+        found = {}
+        remaining = []
+        for h in dict.fromkeys(text_hashes):
+            vec = self.l1.get(self._l1_key(h))
+            if vec is not None:
+                found[h] = vec.tolist()
+                self.usage.record(self._key(h))
+            else:
+                remaining.append(h)
+
+        self.lookups += len(found) + len(remaining)
+        if remaining:
+            found.update(await self._get_many_l2(remaining))
+
+        self.hits += len(found)
+        return found
+
+    async def _get_many_l2(self, text_hashes: List[str]) -> Dict[str, List[float]]:
+        """Single Supabase lookup; hits are promoted to L1."""
+        keys = {self._key(h): h for h in text_hashes}
+        try:
+            query = self.supabase.table('embedding_cache')\
+                .select('text_hash, embedding, dimensions')\
+                .in_('text_hash', list(keys))
+            result = await asyncio.to_thread(query.execute)
+        except Exception as e:
+            logger.warning(f"Cache check failed: {e}")
+            return {}
+
+        found = {}
+        for row in result.data:
+            h = keys[row['text_hash']]
+            vec = to_float32(row['embedding'])
+            self.l1.put(self._l1_key(h), vec)
+            found[h] = vec.tolist()
+            # Update last_used and use_count (flushed in bulk later)
+            self.usage.record(row['text_hash'])
+
+        self.l2_hits += len(found)
+        self.l2_misses += len(text_hashes) - len(found)
+        return found
+
+    async def put_many(self, embeddings: Dict[str, List[float]]):
+        """
+        Save embeddings with one bulk insert.
+
+        Existing hashes are left untouched (another worker may have
+        written the same text concurrently).
+
+        Args:
+            embeddings: Dict of hash → embedding
+        """
+        if not embeddings:
+            return
+
+        for h, embedding in embeddings.items():
+            self.l1.put(self._l1_key(h), embedding)
+
+        records = [
+            {
+                'text_hash': self._key(h),
+                'embedding': embedding,
+                'model': self.model,
+                'dimensions': len(embedding),
+                'use_count': 1
+            }
+            for h, embedding in embeddings.items()
+        ]
+
+        try:
+            query = self.supabase.table('embedding_cache').upsert(
+                records,
+                on_conflict='text_hash',
+                ignore_duplicates=True
+            )
+            await asyncio.to_thread(query.execute)
+        except Exception as e:
+            logger.warning(f"Cache save failed: {e}")
+
+    async def close(self):
+        """Flush pending usage statistics."""
+        await self.usage.close()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for both tiers."""
+        return {
+            'l1': self.l1.stats(),
+            'l2_hits': self.l2_hits,
+            'l2_misses': self.l2_misses,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+            'usage_pending': self.usage.pending
+        }
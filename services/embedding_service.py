@@ -2,15 +2,19 @@
 Phase 3: Embedding Service
 
 Generates vector embeddings for text chunks.
-Primary: OpenAI text-embedding-3-small (ADR-011)
+Primary: OpenAI text-embedding-3-small (ADR-011), at the configured
+size (EMBEDDING_DIMENSIONS: 256/512/1024/1536, see utils/embedding_dimensions.py)
 Fallback: Local sentence-transformers (all-MiniLM-L6-v2)
 """
 
 import os
-import hashlib
 import asyncio
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 import logging
+from services.embedding_cache import EmbeddingCache, text_hash
+from services.local_embedder import LocalEmbedder, get_local_embedder
+from utils.embedding_dimensions import DEFAULT_EMBEDDING_DIMENSIONS, check_dimensions, get_embedding_dimensions
+from utils.vector_cache import VectorLRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +27,11 @@ class EmbeddingService:
         supabase_client,
         primary_model: Literal["openai", "local"] = "openai",
         use_cache: bool = True,
-        fallback_to_local: bool = True
+        fallback_to_local: bool = True,
+        max_concurrency: int = 4,
+        l1_cache: Optional[VectorLRUCache] = None,
+        local_embedder: Optional[LocalEmbedder] = None,
+        dimensions: Optional[int] = None
     ):
         """
         Initialize embedding service.
@@ -33,15 +41,25 @@ class EmbeddingService:
             primary_model: 'openai' or 'local'
             use_cache: Whether to cache embeddings
             fallback_to_local: Fall back to local if API fails
+            max_concurrency: Max embedding API requests in flight
+            l1_cache: In-process cache tier (process-wide shared if None)
+            local_embedder: Local model pool (process-wide shared if None)
+            dimensions: OpenAI embedding size (EMBEDDING_DIMENSIONS if None)
         """
         self.supabase = supabase_client
         self.primary_model = primary_model
         self.use_cache = use_cache
         self.fallback_to_local = fallback_to_local
+        self.dimensions = check_dimensions(dimensions) if dimensions else get_embedding_dimensions()
+        self.cache = EmbeddingCache(
+            supabase_client, model=primary_model, l1_cache=l1_cache, dimensions=self.dimensions
+        )
+        self._api_semaphore = asyncio.Semaphore(max_concurrency)
+        
+        self.local_embedder = local_embedder or get_local_embedder()
         
-        # Lazy load models
+        # Lazy load API client
         self._openai_client = None
-        self._local_model = None
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -51,7 +69,7 @@ class EmbeddingService:
             text: Text to embed
             
         Returns:
-            1536d vector (OpenAI) or 384d (local)
+            Vector of the configured size (OpenAI) or 384d (local)
         """
         # Check cache first
         if self.use_cache:
@@ -61,19 +79,7 @@ class EmbeddingService:
                 return cached
         
         # Generate embedding
-        try:
-            if self.primary_model == "openai":
-                embedding = await self._generate_openai(text)
-            else:
-                embedding = self._generate_local(text)
-        except Exception as e:
-            logger.warning(f"Primary model failed: {e}")
-            
-            if self.fallback_to_local and self.primary_model == "openai":
-                logger.info("Falling back to local model")
-                embedding = self._generate_local(text)
-            else:
-                raise
+        embedding = (await self._generate_with_fallback([text]))[0]
         
         # Save to cache
         if self.use_cache:
@@ -89,6 +95,10 @@ class EmbeddingService:
         """
         Generate embeddings in batches for cost efficiency.
         
+        Each batch costs one cache lookup, one multi-input API request
+        for the misses, and one bulk cache insert. Batches run
+        concurrently, bounded by max_concurrency API requests.
+        
         Args:
             texts: List of texts to embed
             batch_size: Batch size for API calls (default 100)
@@ -96,100 +106,95 @@ class EmbeddingService:
         Returns:
             List of embeddings (same order as input)
         """
-        all_embeddings = []
+        batches = [
+            texts[i:i + batch_size] for i in range(0, len(texts), batch_size)
+        ]
+        logger.info(f"Processing {len(texts)} texts in {len(batches)} batches")
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1} ({len(batch)} texts)")
-            
-            # Check cache for batch
-            batch_embeddings = []
-            
-            for text in batch:
-                if self.use_cache:
-                    cached = await self._check_cache(text)
-                    if cached:
-                        batch_embeddings.append(cached)
-                        continue
-                
-                # Generate uncached embeddings
-                embedding = await self.generate_embedding(text)
-                batch_embeddings.append(embedding)
-            
-            all_embeddings.extend(batch_embeddings)
+        results = await asyncio.gather(*(self._embed_batch(b) for b in batches))
+        
+        return [embedding for batch in results for embedding in batch]
+    
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch: bulk cache lookup, embed misses, bulk save."""
+        hashes = [text_hash(text) for text in batch]
+        
+        found: Dict[str, List[float]] = {}
+        if self.use_cache:
+            found = await self.cache.get_many(hashes)
+        
+        # Deduplicate misses (first occurrence wins)
+        misses: Dict[str, str] = {}
+        for text, h in zip(batch, hashes):
+            if h not in found and h not in misses:
+                misses[h] = text
+        
+        if misses:
+            vectors = await self._generate_with_fallback(list(misses.values()))
+            fresh = dict(zip(misses.keys(), vectors))
+            if self.use_cache:
+                await self.cache.put_many(fresh)
+            found.update(fresh)
         
-        return all_embeddings
+        logger.debug(f"Batch cache hits: {len(batch) - len(misses)}/{len(batch)}")
+        return [found[h] for h in hashes]
     
-    async def _generate_openai(self, text: str) -> List[float]:
-        """Generate embedding with OpenAI API."""
+    async def _generate_with_fallback(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the primary model, falling back to local."""
+        try:
+            if self.primary_model == "openai":
+                return await self._generate_openai(texts)
+            return await self._generate_local(texts)
+        except Exception as e:
+            logger.warning(f"Primary model failed: {e}")
+            
+            if self.fallback_to_local and self.primary_model == "openai":
+                logger.info("Falling back to local model")
+                return await self._generate_local(texts)
+            raise
+    
+    async def _generate_openai(self, texts: List[str]) -> List[List[float]]:
+        """One multi-input OpenAI request (dimensions is sent only when reduced)."""
         if self._openai_client is None:
             import openai
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not set in environment")
-            self._openai_client = openai.OpenAI(api_key=api_key)
+            self._openai_client = openai.AsyncOpenAI(api_key=api_key)
         
-        response = self._openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
+        options = {} if self.dimensions == DEFAULT_EMBEDDING_DIMENSIONS else {'dimensions': self.dimensions}
+        async with self._api_semaphore:
+            response = await self._openai_client.embeddings.create(
+                model="text-embedding-3-small",
+                input=texts,
+                **options
+            )
         
-        return response.data[0].embedding
+        data = sorted(response.data, key=lambda d: d.index)
+        return [d.embedding for d in data]
     
-    def _generate_local(self, text: str) -> List[float]:
-        """Generate embedding with local model."""
-        if self._local_model is None:
-            from sentence_transformers import SentenceTransformer
-            logger.info("Loading local model: all-MiniLM-L6-v2")
-            self._local_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        embedding = self._local_model.encode(text)
-        return embedding.tolist()
+    async def _generate_local(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings with local model (off the event loop)."""
+        return await self.local_embedder.embed(texts)
     
     async def _check_cache(self, text: str) -> Optional[List[float]]:
         """Check if embedding exists in cache."""
-        text_hash = self._text_hash(text)
-        
-        try:
-            result = self.supabase.table('embedding_cache')\
-                .select('embedding, dimensions')\
-                .eq('text_hash', text_hash)\
-                .execute()
-            
-            if result.data:
-                # Update last_used and use_count
-                await self._update_cache_stats(text_hash)
-                return result.data[0]['embedding']
-        except Exception as e:
-            logger.warning(f"Cache check failed: {e}")
-        
-        return None
+        h = text_hash(text)
+        found = await self.cache.get_many([h])
+        return found.get(h)
     
     async def _save_to_cache(self, text: str, embedding: List[float]):
         """Save embedding to cache."""
-        text_hash = self._text_hash(text)
-        
-        try:
-            self.supabase.table('embedding_cache').insert({
-                'text_hash': text_hash,
-                'embedding': embedding,
-                'model': self.primary_model,
-                'dimensions': len(embedding),
-                'use_count': 1
-            }).execute()
-        except Exception as e:
-            logger.warning(f"Cache save failed: {e}")
+        await self.cache.put_many({text_hash(text): embedding})
     
-    async def _update_cache_stats(self, text_hash: str):
-        """Update cache usage statistics."""
-        try:
-            self.supabase.rpc('increment_cache_use', {
-                'hash': text_hash
-            }).execute()
-        except Exception:
-            pass  # Non-critical operation
+    async def aclose(self):
+        """Flush pending cache statistics and release the API client."""
+        await self.cache.close()
+        if self._openai_client is not None:
+            await self._openai_client.close()
+            self._openai_client = None
     
     @staticmethod
     def _text_hash(text: str) -> str:
         """Generate SHA-256 hash for cache key."""
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return text_hash(text)
@@ -0,0 +1,292 @@
+"""
+Phase 3: On-Disk Embedding Store
+
+Append-only segment files that worker processes memory-map, so the
+corpus matrix is shared through the OS page cache instead of being
+deserialized from Supabase JSON on every start.
+
+Layout of a store directory:
+- manifest.json          dimensions, live segments, tombstones ("doc:<id>" /
+                         "chunk:<id>" -> first segment number they spare,
+                         so re-added rows survive)
+- seg-NNNNNN.f32         contiguous N×D float32 matrix (unit-normalized)
+- seg-NNNNNN.rows.jsonl  side table, one JSON row per line: chunk id,
+                         document id, title, index, text
+- seg-NNNNNN.keys.json   chunk ids, document ids and line offsets; only
+                         these stay resident, rows are read on demand
+                         (older stores keep seg-NNNNNN.rows.json, loaded
+                         whole until the next compaction)
+- seg-NNNNNN.*           optional derived files (e.g. quantized codes),
+                         removed together with the segment
+
+Writers serialize on an flock'd lock file; the manifest is replaced
+atomically so readers always see a consistent set of segments. Live
+masks are cached per segment and rebuilt only when the tombstones change.
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import fcntl
+import json
+import logging
+import os
+
+import numpy as np
+
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix
+
+logger = logging.getLogger(__name__)
+
+ROW_FIELDS = ('id', 'document_id', 'document_title', 'chunk_index', 'chunk_text')
+KEY_FIELDS = ('id', 'document_id')  # resident; the rest is read on demand
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SegmentRows:
+    """A segment's side table: ids resident, full rows read from disk."""
+
+    def __init__(self, path: str, keys: Dict, rows: Optional[List[Dict]] = None):
+        """
+        Args:
+            path: seg-NNNNNN.rows.jsonl
+            keys: KEY_FIELDS columns plus 'offsets' (line starts and end)
+            rows: Full rows already in memory (legacy rows.json segments)
+        """
+        self.path = path
+        self.columns = {field: keys[field] for field in KEY_FIELDS}
+        self._offsets = keys.get('offsets')
+        self._rows = rows
+        self._positions: Optional[Dict[str, Dict[str, List[int]]]] = None
+
+    @classmethod
+    def loaded(cls, rows: List[Dict]) -> 'SegmentRows':
+        return cls('', {field: [r[field] for r in rows] for field in KEY_FIELDS}, rows)
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def __getitem__(self, position: int) -> Dict:
+        return self.fetch([position])[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._rows is not None:
+            return iter(self._rows)
+        with open(self.path, 'rb') as f:
+            return iter([json.loads(line) for line in f])
+
+    def fetch(self, positions: Sequence[int]) -> List[Dict]:
+        """Full rows at the given positions (one file open)."""
+        if self._rows is not None:
+            return [self._rows[p] for p in positions]
+        rows = []
+        with open(self.path, 'rb') as f:
+            for p in positions:
+                f.seek(self._offsets[p])
+                rows.append(json.loads(f.read(self._offsets[p + 1] - self._offsets[p])))
+        return rows
+
+    def positions(self, kind: str, value: str) -> List[int]:
+        """Positions of a tombstone target ('doc' or 'chunk')."""
+        if self._positions is None:
+            self._positions = {'doc': {}, 'chunk': {}}
+            for p, (chunk_id, doc_id) in enumerate(zip(self.columns['id'], self.columns['document_id'])):
+                self._positions['chunk'].setdefault(chunk_id, []).append(p)
+                self._positions['doc'].setdefault(doc_id, []).append(p)
+        return self._positions[kind].get(value, [])
+
+
+class EmbeddingSegmentStore:
+    """Append-only, memory-mapped float32 segments with compaction."""
+
+    def __init__(self, path: str, max_segments: int = 16):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: Store directory
+            max_segments: Compact automatically beyond this many segments
+        """
+        self.path = path
+        self.max_segments = max_segments
+        os.makedirs(path, exist_ok=True)
+        self._manifest_path = os.path.join(path, 'manifest.json')
+        self._manifest_mtime: Optional[float] = None
+        self._manifest = {'dimensions': None, 'segments': [], 'next_id': 1, 'tombstones': {}}
+        self._mapped: Dict[str, Tuple[np.ndarray, SegmentRows]] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+        self.refresh()
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        return self._manifest['dimensions']
+
+    def refresh(self) -> bool:
+        """Reload the manifest if another process changed it."""
+        try:
+            mtime = os.stat(self._manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._manifest_mtime:
+            return False
+        previous = self._manifest['tombstones']
+        with open(self._manifest_path) as f:
+            self._manifest = json.load(f)
+        if isinstance(self._manifest['tombstones'], list):  # pre-sequence format: document ids
+            self._manifest['tombstones'] = {f"doc:{d}": self._manifest['next_id'] for d in self._manifest['tombstones']}
+        self._manifest_mtime = mtime
+        if self._manifest['tombstones'] != previous:
+            self._masks.clear()
+        live = {seg['name'] for seg in self._manifest['segments']}
+        self._mapped = {k: v for k, v in self._mapped.items() if k in live}
+        self._masks = {k: v for k, v in self._masks.items() if k in live}
+        return True
+
+    @contextmanager
+    def _write_lock(self):
+        with open(os.path.join(self.path, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save_manifest(self):
+        _write_atomic(self._manifest_path, json.dumps(self._manifest).encode())
+        self._manifest_mtime = os.stat(self._manifest_path).st_mtime_ns
+
+    def _write_segment(self, vectors: np.ndarray, rows: List[Dict]) -> Dict:
+        """Write one segment's files (caller holds the lock)."""
+        name = f"seg-{self._manifest['next_id']:06d}"
+        self._manifest['next_id'] += 1
+        base = os.path.join(self.path, name)
+        lines = [json.dumps(row).encode() + b'\n' for row in rows]
+        keys = {field: [row[field] for row in rows] for field in KEY_FIELDS}
+        keys['offsets'] = np.cumsum([0] + [len(line) for line in lines]).tolist()
+        _write_atomic(f"{base}.f32", np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        _write_atomic(f"{base}.rows.jsonl", b''.join(lines))
+        _write_atomic(f"{base}.keys.json", json.dumps(keys).encode())
+        return {'name': name, 'count': len(rows)}
+
+    def append(self, rows: List[Dict]) -> Optional[str]:
+        """
+        Append chunk rows (ROW_FIELDS plus 'embedding') as a new segment.
+
+        Returns:
+            Segment name, or None if rows is empty
+        """
+        if not rows:
+            return None
+        vectors = normalize_matrix(np.stack([to_float32(r['embedding']) for r in rows]))
+        side = [{f: r.get(f) for f in ROW_FIELDS} for r in rows]
+
+        with self._write_lock():
+            dims = self._manifest['dimensions'] or vectors.shape[1]
+            if vectors.shape[1] != dims:
+                raise ValueError(f"Vector dimension mismatch: {vectors.shape[1]} vs {dims}")
+            self._manifest['dimensions'] = dims
+            segment = self._write_segment(vectors, side)
+            self._manifest['segments'].append(segment)
+            self._save_manifest()
+
+        if len(self._manifest['segments']) > self.max_segments:
+            self.compact()
+        return segment['name']
+
+    def _tombstone(self, keys: List[str]):
+        """Hide rows of segments written so far (later appends stay live)."""
+        with self._write_lock():
+            self._manifest['tombstones'].update(dict.fromkeys(keys, self._manifest['next_id']))
+            self._save_manifest()
+            self._masks.clear()
+
+    def delete_documents(self, document_ids: List[str]):
+        """Tombstone documents; their rows disappear at next compaction."""
+        self._tombstone([f"doc:{d}" for d in document_ids])
+
+    def delete_chunks(self, chunk_ids: List[str]):
+        """Tombstone individual chunks by id."""
+        self._tombstone([f"chunk:{c}" for c in chunk_ids])
+
+    def _live(self, seg: Dict, rows: SegmentRows) -> np.ndarray:
+        """Rows not tombstoned after their segment was written (cached)."""
+        name = seg['name']
+        mask = self._masks.get(name)
+        if mask is None:
+            seq = int(name[4:])
+            mask = np.ones(len(rows), dtype=bool)
+            for key, after in self._manifest['tombstones'].items():
+                if after > seq:
+                    kind, _, value = key.partition(':')
+                    mask[rows.positions(kind, value)] = False
+            mask.flags.writeable = False
+            self._masks[name] = mask
+        return mask
+
+    def segments(self) -> Iterator[Tuple[np.ndarray, SegmentRows, np.ndarray]]:
+        """Yield (memmapped vectors, side table, live mask) per segment."""
+        for _, vectors, rows, live in self.named_segments():
+            yield vectors, rows, live
+
+    def named_segments(self) -> Iterator[Tuple[str, np.ndarray, SegmentRows, np.ndarray]]:
+        """Like segments(), prefixed with the segment name."""
+        self.refresh()
+        for seg in self._manifest['segments']:
+            vectors, rows = self._map(seg)
+            yield seg['name'], vectors, rows, self._live(seg, rows)
+
+    def _map(self, seg: Dict) -> Tuple[np.ndarray, SegmentRows]:
+        name = seg['name']
+        if name not in self._mapped:
+            base = os.path.join(self.path, name)
+            vectors = np.memmap(
+                f"{base}.f32", dtype=np.float32, mode='r',
+                shape=(seg['count'], self._manifest['dimensions'])
+            )
+            if os.path.exists(f"{base}.keys.json"):
+                with open(f"{base}.keys.json") as f:
+                    rows = SegmentRows(f"{base}.rows.jsonl", json.load(f))
+            else:
+                with open(f"{base}.rows.json") as f:
+                    rows = SegmentRows.loaded(json.load(f))
+            self._mapped[name] = (vectors, rows)
+        return self._mapped[name]
+
+    def __len__(self) -> int:
+        return sum(int(live.sum()) for _, _, live in self.segments())
+
+    def compact(self):
+        """Merge all segments into one, dropping tombstoned rows."""
+        with self._write_lock():
+            old = list(self._manifest['segments'])
+            if len(old) <= 1 and not self._manifest['tombstones']:
+                return
+            parts, rows = [], []
+            for seg in old:
+                vectors, seg_rows = self._map(seg)
+                keep = np.flatnonzero(self._live(seg, seg_rows)).tolist()
+                parts.append(np.asarray(vectors[keep]))
+                rows.extend(seg_rows.fetch(keep))
+
+            dims = self._manifest['dimensions']
+            merged = np.concatenate(parts) if parts else np.zeros((0, dims), np.float32)
+            self._manifest['segments'] = [self._write_segment(merged, rows)] if rows else []
+            self._manifest['tombstones'] = {}
+            self._save_manifest()
+
+        self._mapped.clear()
+        self._masks.clear()
+        prefixes = tuple(f"{seg['name']}." for seg in old)
+        for filename in os.listdir(self.path):
+            if filename.startswith(prefixes):
+                os.remove(os.path.join(self.path, filename))
+        logger.info(f"Compacted {len(old)} segments into {len(self._manifest['segments'])}")
@@ -0,0 +1,121 @@
+"""
+Phase 3: Batched Event Writer
+
+Bounded background queue that batches row inserts into a Supabase table
+(e.g. process_events), keeping audit writes off the request path.
+
+- enqueue() never awaits I/O; when the queue is full the row is dropped
+  and counted (backpressure when Supabase is slow)
+- a flusher task inserts up to flush_size rows per request, at least
+  every flush_interval seconds, and exits once the queue is empty
+- close() drains everything still queued
+"""
+
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedEventWriter:
+    """Queue rows and insert them in batches from a background task."""
+
+    def __init__(
+        self,
+        supabase_client,
+        table: str = 'process_events',
+        flush_size: int = 50,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000
+    ):
+        """
+        Args:
+            supabase_client: Supabase client
+            table: Target table
+            flush_size: Rows per insert request
+            flush_interval: Max seconds a row waits before being flushed
+            max_queue: Queue bound; rows beyond it are dropped
+        """
+        self.supabase = supabase_client
+        self.table = table
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._batch_ready = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def enqueue(self, row: Dict) -> bool:
+        """
+        Queue a row for insertion (non-blocking).
+
+        Returns:
+            False if the row was dropped because the queue is full
+        """
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"{self.table} queue full: {self.dropped} rows dropped")
+            return False
+
+        if self._queue.qsize() >= self.flush_size:
+            self._batch_ready.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return True
+
+    async def _run(self):
+        """Flush batches until the queue is empty."""
+        while not self._queue.empty():
+            if self._queue.qsize() < self.flush_size and not self._closing:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_batch()
+
+    async def _flush_batch(self):
+        """Insert up to flush_size queued rows in one request."""
+        rows: List[Dict] = []
+        while len(rows) < self.flush_size and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        if not rows:
+            return
+
+        try:
+            insert = self.supabase.table(self.table).insert(rows)
+            await asyncio.to_thread(insert.execute)
+            self.written += len(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logger.warning(f"Failed to write {len(rows)} {self.table} rows: {e}")
+
+    async def close(self):
+        """Write everything still queued, then stop the flusher."""
+        self._closing = True
+        self._batch_ready.set()
+        if self._worker is not None:
+            await self._worker
+            self._worker = None
+        while not self._queue.empty():
+            await self._flush_batch()
+        self._closing = False
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
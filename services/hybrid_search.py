@@ -0,0 +1,82 @@
+"""
+Phase 3: Hybrid Retrieval
+
+Lexical + vector ranking for RAGService. Vector search finds paraphrases;
+the in-process BM25 index (services/lexical_index.py) finds exact
+identifiers such as API names, error codes and config keys. The two
+rankings are merged with reciprocal rank fusion (RRF), which needs no
+score calibration between BM25 and cosine similarity.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services.lexical_index import BM25Index
+from services.rag_results import RAGResult, rows_to_results
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], k: int = RRF_K) -> List[Dict]:
+    """
+    Fuse ranked row lists by reciprocal rank.
+
+    Each row scores sum(1 / (k + rank)) over the lists it appears in.
+    The fused score, scaled to 0-1 by the best possible score, replaces
+    'similarity' so fused rows convert to RAGResults like vector rows.
+    """
+    scores: Dict[str, float] = {}
+    rows: Dict[str, Dict] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            scores[row['id']] = scores.get(row['id'], 0.0) + 1.0 / (k + rank)
+            rows.setdefault(row['id'], row)
+    best_possible = len(rankings) / (k + 1)
+    return [
+        {**rows[chunk_id], 'similarity': score / best_possible}
+        for chunk_id, score in sorted(scores.items(), key=lambda item: -item[1])
+    ]
+
+
+def resolve_hybrid(hybrid: Optional[bool], lexical_index: Optional[BM25Index]) -> bool:
+    """Hybrid by default when a lexical index is configured."""
+    if hybrid and lexical_index is None:
+        raise ValueError("Hybrid retrieval requires a lexical_index")
+    return lexical_index is not None if hybrid is None else hybrid
+
+
+def cache_scope(filters: Optional[Dict], hybrid: bool) -> Optional[Dict]:
+    """Result-cache filters: hybrid and vector-only results are cached apart."""
+    return {**(filters or {}), '_retrieval': 'hybrid'} if hybrid else filters
+
+
+async def rank_hybrid(
+    queries: List[str],
+    vector_rows: List[List[Dict]],
+    lexical_index: BM25Index,
+    filters: Optional[Dict],
+    permission_filter: Callable[[List[List[Dict]]], Awaitable[List[List[Dict]]]],
+    max_results: int
+) -> List[List[RAGResult]]:
+    """
+    Fuse each query's vector rows with its BM25 rows.
+
+    BM25 runs in-process (no round-trip). Both sides go through one
+    permission check, since the lexical index does not enforce RLS.
+    The vector side was already thresholded by the backend, so fused
+    results are not thresholded again.
+
+    Args:
+        queries: Query texts (same order as vector_rows)
+        vector_rows: Vector search rows per query
+        lexical_index: BM25 index
+        filters: Row filters (applied to stored row fields)
+        permission_filter: Drops rows the user cannot read
+        max_results: Results per query
+    """
+    lexical = [lexical_index.search_sync(q, max_results * 2, filters) for q in queries]
+    allowed = await permission_filter(vector_rows + lexical)
+    vector_allowed, lexical_allowed = allowed[:len(queries)], allowed[len(queries):]
+    return [
+        rows_to_results(reciprocal_rank_fusion([vector, bm25]), 0.0, max_results)
+        for vector, bm25 in zip(vector_allowed, lexical_allowed)
+    ]
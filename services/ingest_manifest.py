@@ -0,0 +1,111 @@
+"""
+Phase 3: Ingest Manifest
+
+Local checkpoint for directory ingestion: one JSON line per ingested
+file (path, mtime, size, content hash, document_id).
+- entries are appended and flushed as documents are published, so an
+  interrupted run resumes after the last checkpointed file
+- the latest line for a path wins; a torn last line (crash mid-write)
+  is ignored; compact() rewrites one line per path atomically
+- a file is unchanged when its mtime and size match (no read needed) or,
+  after a read, when its content hash matches (touched, not edited)
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Optional
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """Checkpoint of one ingested file."""
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    document_id: str
+
+
+class IngestManifest:
+    """Append-only JSON-lines manifest of ingested files."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Manifest file (created on first record)
+        """
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._file = None
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        torn = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = ManifestEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    torn += 1
+                    continue
+                self.entries[entry.path] = entry
+        if torn:
+            logger.warning(f"Ignored {torn} unreadable manifest lines in {self.path}")
+        logger.info(f"Loaded manifest with {len(self.entries)} files")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(path)
+
+    def is_current(self, path: str, mtime_ns: int, size: int) -> bool:
+        """True if path was ingested with this mtime and size."""
+        entry = self.entries.get(path)
+        return entry is not None and entry.mtime_ns == mtime_ns and entry.size == size
+
+    def record(self, entries: Iterable[ManifestEntry]):
+        """Checkpoint entries (one write and flush)."""
+        entries = list(entries)
+        if not entries:
+            return
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._file.tell() and not self._ends_with_newline():
+                self._file.write('\n')  # isolate a torn last line
+        self._file.write(''.join(json.dumps(asdict(e)) + '\n' for e in entries))
+        self._file.flush()
+        for entry in entries:
+            self.entries[entry.path] = entry
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def compact(self):
+        """Rewrite the manifest with the latest entry per path."""
+        self.close()
+        with open(f"{self.path}.tmp", 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(asdict(e)) + '\n' for e in self.entries.values()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def close(self):
+        """Flush the manifest to disk."""
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
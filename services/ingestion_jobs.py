@@ -0,0 +1,77 @@
+"""
+Phase 3: Ingestion Jobs
+
+Per-document state and per-run accounting for IngestionPipeline
+(services/ingestion_pipeline.py).
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+
+from services.chunk_dedup import DedupPlan
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DocumentJob:
+    """One document moving through the pipeline."""
+    doc: Dict
+    position: int = 0  # index in the run's input
+    document_id: Optional[str] = None
+    chunks: Optional[List] = None  # set ahead of prepare by a ParallelChunker
+    plan: Optional[DedupPlan] = None
+    pending: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class IngestionRun:
+    """Queues and counters for one IngestionPipeline.run() call."""
+    total: int
+    progress_callback: Optional[Callable]
+    write_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    completed: int = 0
+    chunks: int = 0
+    embeddings: int = 0
+    dedup: Counter = field(default_factory=Counter)
+    errors: List[Dict] = field(default_factory=list)
+    document_ids: List[Optional[str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.document_ids = [None] * self.total
+
+    def succeeded(self, job: DocumentJob):
+        """Count a published document and report progress."""
+        self.dedup.update(job.plan.stats)
+        self.chunks += len(job.plan.chunks) + job.plan.stats['skipped']
+        self.embeddings += len(job.plan.embeddings) - job.plan.stats['linked']
+        self.document_ids[job.position] = job.document_id
+        self.completed += 1
+        if self.progress_callback:
+            self.progress_callback(self.completed, self.total, job.doc['title'])
+
+    def failed(self, job: DocumentJob, error: Exception):
+        """Record a document failure (called once per document)."""
+        if job.plan:
+            job.plan.abort()
+        job.error = str(error)
+        self.completed += 1
+        logger.error(f"Failed to ingest '{job.doc.get('title')}': {error}")
+        self.errors.append({'title': job.doc.get('title'), 'error': job.error})
+
+    def summary(self) -> dict:
+        """Summary statistics (same shape as ingest_documents_batch)."""
+        return {
+            'total_documents': self.total,
+            'successful': self.total - len(self.errors),
+            'failed': len(self.errors),
+            'total_chunks': self.chunks,
+            'total_embeddings': self.embeddings,
+            'dedup': dict(self.dedup),
+            'errors': self.errors,
+            'document_ids': self.document_ids  # input order, None if failed
+        }
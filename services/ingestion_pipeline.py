@@ -0,0 +1,202 @@
+"""
+Phase 3: Ingestion Pipeline
+
+Staged batch ingestion that keeps the embedding API busy while other
+documents are inserted, chunked and written:
+
+  documents → [chunk] → [prepare] → EmbeddingBatcher → write queue → [write]
+
+- with a ParallelChunker, windows of documents are chunked on a process
+  pool ahead of prepare (otherwise prepare chunks each document)
+- prepare workers insert the documents row, chunk it and drop near-duplicates
+- the batcher packs chunks across documents into full embedding requests
+- write workers insert fully embedded documents through BulkChunkWriter,
+  several documents per size-bounded page when they are ready together
+
+Documents fail independently; the progress callback fires per success.
+Job state and run accounting: services/ingestion_jobs.py
+"""
+
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+
+from services.chunk_dedup import plan_chunks
+from services.embedding_batcher import EmbeddingBatcher
+from services.ingestion_jobs import DocumentJob, IngestionRun
+from services.parallel_chunker import ParallelChunker
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class IngestionPipeline:
+    """Bounded-stage pipeline over a DocumentIngestionService."""
+
+    def __init__(
+        self,
+        service,
+        prepare_workers: int = 2,
+        embed_workers: int = 4,
+        write_workers: int = 2,
+        embed_batch_size: int = 100,
+        max_queued_chunks: int = 2000,
+        write_batch_rows: int = 500,
+        parallel_chunker: Optional[ParallelChunker] = None,
+        chunk_window: int = 256
+    ):
+        """
+        Args:
+            service: DocumentIngestionService (supabase, chunker, embeddings)
+            prepare_workers: Concurrent document inserts + chunking
+            embed_workers: Concurrent embedding requests
+            write_workers: Concurrent chunk inserts
+            embed_batch_size: Texts per embedding request
+            max_queued_chunks: Bound on chunks waiting for embedding
+            write_batch_rows: Max chunk rows per cross-document write
+            parallel_chunker: Process pool chunking windows of documents
+                (same settings as service.chunker)
+            chunk_window: Documents per parallel chunking call
+        """
+        self.service = service
+        self.prepare_workers = prepare_workers
+        self.embed_workers = embed_workers
+        self.write_workers = write_workers
+        self.embed_batch_size = embed_batch_size
+        self.max_queued_chunks = max_queued_chunks
+        self.write_batch_rows = write_batch_rows
+        self.parallel_chunker = parallel_chunker
+        self.chunk_window = chunk_window
+
+    async def run(self, documents: List[Dict], progress_callback: Optional[Callable] = None) -> dict:
+        """
+        Ingest documents concurrently.
+
+        Args:
+            documents: Document dicts (title, content, created_by, ...)
+            progress_callback: Called as (completed, total, title) per success
+
+        Returns:
+            Summary statistics (same shape as ingest_documents_batch)
+        """
+        run = IngestionRun(total=len(documents), progress_callback=progress_callback)
+        batcher = EmbeddingBatcher(
+            self.service.embedding_service,
+            on_embedded=partial(self._embedded, run),
+            on_failed=run.failed,
+            workers=self.embed_workers,
+            batch_size=self.embed_batch_size,
+            max_pending=self.max_queued_chunks
+        )
+        jobs = iter([DocumentJob(doc, position=i) for i, doc in enumerate(documents)])
+        ready = asyncio.Queue(maxsize=self.chunk_window)
+        writers = [asyncio.create_task(self._write(run, batcher)) for _ in range(self.write_workers)]
+
+        # Shut stages down in order once their producers are finished
+        await asyncio.gather(
+            self._chunk(jobs, ready, batcher),
+            *[self._prepare(run, ready, batcher) for _ in range(self.prepare_workers)]
+        )
+        await batcher.close()
+        for _ in writers:
+            run.write_queue.put_nowait(_DONE)
+        await asyncio.gather(*writers)
+        return run.summary()
+
+    async def _chunk(self, jobs, ready: asyncio.Queue, batcher: EmbeddingBatcher):
+        """Feed jobs to prepare, pre-chunked a window at a time if parallel."""
+        window = self.chunk_window if self.parallel_chunker else 1
+        for batch in iter(lambda: list(islice(jobs, window)), []):
+            if self.parallel_chunker:
+                try:
+                    results = await self.parallel_chunker.chunk_many_async([job.doc['content'] for job in batch])
+                except Exception as e:
+                    for job in batch:
+                        batcher.fail(job, e)
+                    continue
+                for job, chunks in zip(batch, results):
+                    job.chunks = chunks
+            for job in batch:
+                await ready.put(job)
+        for _ in range(self.prepare_workers):
+            await ready.put(_DONE)
+
+    async def _prepare(self, run: IngestionRun, ready: asyncio.Queue, batcher: EmbeddingBatcher):
+        """Insert the document row, chunk it, and submit chunks still to embed."""
+        while (job := await ready.get()) is not _DONE:
+            try:
+                doc = job.doc
+                job.document_id = await asyncio.to_thread(
+                    self.service._insert_document,
+                    doc['title'], doc['content'], doc['created_by'],
+                    document_type=doc.get('document_type', 'guide'),
+                    team_id=doc.get('team_id'),
+                    visibility=doc.get('visibility', 'private'),
+                    metadata=doc.get('metadata'),
+                    external_key=doc.get('external_key')
+                )
+                chunks = job.chunks
+                if chunks is None:
+                    chunks = await asyncio.to_thread(
+                        self.service.chunker.chunk_text, job.doc['content'], job.document_id
+                    )
+                for chunk in chunks:  # pre-chunked before the row existed
+                    chunk.metadata['document_id'] = job.document_id
+                job.plan = await plan_chunks(self.service.deduplicator, job.document_id, chunks)
+            except Exception as e:
+                batcher.fail(job, e)
+                continue
+            todo = [i for i, vector in enumerate(job.plan.embeddings) if vector is None]
+            job.pending = len(todo)
+            if not todo:
+                run.write_queue.put_nowait(job)
+            for i in todo:
+                await batcher.submit(job, i, job.plan.chunks[i].text)
+
+    @staticmethod
+    def _embedded(run: IngestionRun, job: DocumentJob, index: int, vector: List[float]):
+        """Store a vector; queue the document for writing once complete."""
+        job.plan.embeddings[index] = vector
+        job.pending -= 1
+        if job.pending == 0:
+            run.write_queue.put_nowait(job)
+
+    async def _write(self, run: IngestionRun, batcher: EmbeddingBatcher):
+        """Write every document ready at once, so small ones share pages."""
+        done = False
+        while not done:
+            jobs, done = [], True
+            item = await run.write_queue.get()
+            while item is not _DONE:
+                jobs.append(item)
+                if run.write_queue.empty() or sum(len(j.plan.chunks) for j in jobs) >= self.write_batch_rows:
+                    done = False
+                    break
+                item = run.write_queue.get_nowait()
+            if jobs:
+                rows = self.service.bulk_writer.prepare([record for job in jobs for record in job.plan.records()])
+                await self._write_jobs(run, batcher, jobs, rows)
+
+    async def _write_jobs(self, run: IngestionRun, batcher: EmbeddingBatcher, jobs: List, rows: List[Dict]):
+        """Write rows (client ids make retries idempotent) and publish each document."""
+        try:
+            await asyncio.to_thread(self.service.bulk_writer.write, rows)
+        except Exception as e:
+            if len(jobs) == 1:
+                batcher.fail(jobs[0], e)
+                return
+            for job in jobs:  # isolate the failing document
+                mine = [row for row in rows if row['document_id'] == job.document_id]
+                await self._write_jobs(run, batcher, [job], mine)
+            return
+
+        for job in jobs:
+            doc = job.doc
+            await self.service._publish(
+                [row for row in rows if row['document_id'] == job.document_id],
+                doc['title'], doc.get('visibility', 'private'), doc['created_by'], job.plan
+            )
+            run.succeeded(job)
@@ -0,0 +1,212 @@
+"""
+Phase 3: Lexical (BM25) Index
+
+In-process inverted index over document chunks, for the exact tokens
+that embeddings blur: API names, error codes, config keys.
+
+- compound identifiers are indexed whole and by their parts
+  ("ERR_CONN_RESET" → err_conn_reset, err, conn, reset;
+  "getUserById" → getuserbyid, get, user, by, id)
+- each term's postings are two flat arrays (chunk slot uint32, term
+  frequency uint16), so memory is ~6 bytes per posting
+- chunks are added and tombstoned incrementally; postings of removed
+  chunks are dropped once they outnumber the live ones
+
+Does not enforce RLS: RAGService post-filters results by permission.
+"""
+
+from array import array
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import re
+
+import numpy as np
+
+from utils.vector_utils import top_k
+
+logger = logging.getLogger(__name__)
+
+ROW_FIELDS = ('id', 'document_id', 'document_title', 'chunk_text', 'chunk_index')
+
+_WORD = re.compile(r"[A-Za-z0-9_]+(?:[.\-:/][A-Za-z0-9_]+)*")
+_SEPARATORS = re.compile(r"[._\-:/]+")
+_CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms: every word, plus the parts of compound identifiers."""
+    terms = []
+    for match in _WORD.finditer(text):
+        word = match.group()
+        terms.append(word.lower())
+        parts = [p.lower() for piece in _SEPARATORS.split(word) for p in _CAMEL.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """Incremental BM25 inverted index over document chunks."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: Term-frequency saturation
+            b: Length normalization strength (0 = none, 1 = full)
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._df: Counter = Counter()
+        self._lengths = array('I')
+        self._alive = bytearray()
+        self._rows: List[Optional[Dict]] = []
+        self._doc_positions: Dict[str, List[int]] = {}
+        self._id_slots: Dict[str, int] = {}
+        self._live = 0
+        self._live_length = 0
+        self._live_postings = 0
+        self._dead_postings = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def add_chunks(self, rows: List[Dict]):
+        """Index chunk rows (match_documents fields; embeddings are ignored)."""
+        with self._lock:
+            for row in rows:
+                slot = len(self._rows)
+                counts = Counter(tokenize(row.get('chunk_text') or ''))
+                for term, tf in counts.items():
+                    slots, tfs = self._postings.setdefault(term, (array('I'), array('H')))
+                    slots.append(slot)
+                    tfs.append(min(tf, 0xFFFF))
+                self._df.update(counts.keys())
+                self._live_postings += len(counts)
+                length = sum(counts.values())
+                self._lengths.append(length)
+                self._alive.append(1)
+                self._rows.append({f: row.get(f) for f in ROW_FIELDS})
+                self._doc_positions.setdefault(row['document_id'], []).append(slot)
+                self._id_slots[row['id']] = slot
+                self._live += 1
+                self._live_length += length
+
+    def remove_documents(self, document_ids: List[str]):
+        """Tombstone all chunks of the given documents."""
+        with self._lock:
+            for doc_id in document_ids:
+                for slot in self._doc_positions.pop(doc_id, []):
+                    self._drop(slot)
+            self._maybe_compact()
+
+    def remove_chunks(self, chunk_ids: List[str]):
+        """Tombstone individual chunks by id."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                slot = self._id_slots.get(chunk_id)
+                if slot is not None:
+                    self._drop(slot)
+            self._maybe_compact()
+
+    def _drop(self, slot: int):
+        """Tombstone one slot (caller holds the lock)."""
+        if not self._alive[slot]:
+            return
+        row = self._rows[slot]
+        if self._id_slots.get(row['id']) == slot:
+            del self._id_slots[row['id']]
+        terms = set(tokenize(row['chunk_text'] or ''))
+        self._df.subtract(terms)
+        self._live_postings -= len(terms)
+        self._dead_postings += len(terms)
+        self._live -= 1
+        self._live_length -= self._lengths[slot]
+        self._alive[slot] = 0
+        self._rows[slot] = None
+
+    def _maybe_compact(self):
+        if self._dead_postings > self._live_postings:
+            self._compact()
+
+    def _compact(self):
+        """Drop postings of removed chunks (caller holds the lock)."""
+        alive = np.frombuffer(bytes(self._alive), dtype=bool)
+        for term in list(self._postings):
+            slots, tfs = self._postings[term]
+            keep = alive[np.frombuffer(slots, dtype=np.uint32)]
+            if not keep.any():
+                del self._postings[term]
+                del self._df[term]
+            elif not keep.all():
+                self._postings[term] = (
+                    array('I', np.frombuffer(slots, dtype=np.uint32)[keep].tobytes()),
+                    array('H', np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes())
+                )
+        self._dead_postings = 0
+        logger.info(f"Compacted lexical index: {len(self._postings)} terms")
+
+    def search_sync(self, query_text: str, match_count: int, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Top-k chunks by BM25 score (filters match stored row fields).
+
+        Rows carry the score as 'bm25'.
+        """
+        terms = set(tokenize(query_text))
+        with self._lock:
+            if not terms or not self._live:
+                return []
+            live = self._live
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / max(self._live_length / live, 1.0))
+            scores = np.zeros(len(self._rows), dtype=np.float32)
+            for term in terms:
+                if term not in self._postings or self._df[term] <= 0:
+                    continue
+                slots, tfs = self._postings[term]
+                slots = np.frombuffer(slots, dtype=np.uint32)
+                tf = np.frombuffer(tfs, dtype=np.uint16).astype(np.float32)
+                df = self._df[term]
+                idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+                scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm[slots])
+            scores *= np.frombuffer(bytes(self._alive), dtype=bool)
+            candidates = np.flatnonzero(scores > 0)
+            for key, value in (filters or {}).items():
+                if key in ROW_FIELDS:
+                    keep = np.array([self._rows[p][key] == value for p in candidates], dtype=bool)
+                    candidates = candidates[keep]
+            idx, best = top_k(scores[candidates], match_count)
+            return [
+                {**self._rows[pos], 'bm25': float(score)}
+                for pos, score in zip(candidates[idx].tolist(), best.tolist())
+            ]
+
+    async def search(self, query_text: str, match_count: int, filters: Optional[Dict] = None) -> List[Dict]:
+        return self.search_sync(query_text, match_count, filters)
+
+    async def load_from_supabase(self, supabase_client, page_size: int = 1000) -> int:
+        """
+        Bulk-load all visible document_chunks (paged in id order, text only).
+
+        Returns:
+            Number of chunks loaded
+        """
+        loaded = 0
+        while True:
+            query = supabase_client.table('document_chunks')\
+                .select('id, document_id, chunk_text, chunk_index, documents(title)')\
+                .order('id')\
+                .range(loaded, loaded + page_size - 1)
+            page = (await asyncio.to_thread(query.execute)).data
+            self.add_chunks([
+                {**row, 'document_title': (row.get('documents') or {}).get('title')}
+                for row in page
+            ])
+            loaded += len(page)
+            if len(page) < page_size:
+                return loaded
@@ -0,0 +1,119 @@
+"""
+Phase 3: Local Embedder
+
+CPU fallback for EmbeddingService (sentence-transformers all-MiniLM-L6-v2).
+Inference runs on a dedicated thread pool in batched encode() calls so it
+never blocks the event loop. PyTorch releases the GIL during inference,
+so work units spread across the pool scale with available cores.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import List, Optional
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class LocalEmbedder:
+    """Batched sentence-transformers inference on a dedicated pool."""
+
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        batch_size: int = 64,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize local embedder (model loads on warmup or first use).
+
+        Args:
+            model_name: sentence-transformers model name
+            batch_size: Texts per encode() call
+            max_workers: Inference threads (default: CPU count)
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='local-embedder'
+        )
+        self._model = None
+        self._load_lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model is in memory."""
+        return self._model is not None
+
+    def _load(self):
+        """Load the model once (thread-safe)."""
+        with self._load_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                logger.info(f"Loading local model: {self.model_name}")
+                self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    async def warmup(self):
+        """Load the model on the pool ahead of the first fallback."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._load)
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Encode one work unit (runs on the pool)."""
+        model = self._load()
+        embeddings = model.encode(texts, batch_size=self.batch_size)
+        return embeddings.tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts on the pool.
+
+        Texts are split into batch_size work units that run in parallel.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings in input order
+        """
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        units = [
+            texts[i:i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._encode, unit)
+            for unit in units
+        ))
+        return [embedding for unit in results for embedding in unit]
+
+    def shutdown(self):
+        """Stop the inference pool."""
+        self._executor.shutdown(wait=False)
+
+
+_shared_embedder: Optional[LocalEmbedder] = None
+
+
+def get_local_embedder() -> LocalEmbedder:
+    """
+    Process-wide embedder, so a model warmed at worker start is reused
+    by every EmbeddingService.
+
+    Pool size comes from LOCAL_EMBEDDING_WORKERS (default: CPU count).
+    """
+    global _shared_embedder
+    if _shared_embedder is None:
+        workers = os.getenv('LOCAL_EMBEDDING_WORKERS')
+        _shared_embedder = LocalEmbedder(
+            max_workers=int(workers) if workers else None
+        )
+    return _shared_embedder
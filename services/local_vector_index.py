@@ -0,0 +1,212 @@
+"""
+Phase 3: Local Vector Index
+
+In-memory IVF (inverted file) index held in the worker process.
+Vectors live in one normalized float32 matrix. Once trained, spherical
+k-means centroids partition them into nlist lists and a query scans only
+the nprobe closest lists. Below train_threshold vectors, or with
+nprobe >= nlist, search is exact brute force.
+
+Does not enforce RLS: RAGService post-filters results by permission.
+"""
+
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+import numpy as np
+
+from services.vector_search import VectorSearchBackend
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix, top_k
+
+logger = logging.getLogger(__name__)
+
+ROW_FIELDS = ('id', 'document_id', 'document_title', 'chunk_text', 'chunk_index')
+
+
+class LocalVectorIndex(VectorSearchBackend):
+    """IVF index over document chunks with configurable recall (nprobe)."""
+
+    def __init__(
+        self,
+        nlist: int = 256,
+        nprobe: int = 8,
+        train_threshold: int = 20000,
+        kmeans_iterations: int = 10
+    ):
+        """
+        Initialize empty index.
+
+        Args:
+            nlist: Number of IVF lists (k-means centroids)
+            nprobe: Lists scanned per query (higher = better recall)
+            train_threshold: Vector count that triggers IVF training
+            kmeans_iterations: Lloyd iterations when training
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.kmeans_iterations = kmeans_iterations
+        self.dimensions: Optional[int] = None
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._count = 0
+        self._rows: List[Dict] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._doc_positions: Dict[str, List[int]] = {}
+        self._id_positions: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+
+    def __len__(self) -> int:
+        return int(self._alive[:self._count].sum())
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def add_chunks(self, rows: List[Dict]):
+        """Add chunk rows (match_documents fields plus 'embedding')."""
+        if not rows:
+            return
+        vectors = normalize_matrix(np.stack([to_float32(r['embedding']) for r in rows]))
+        if self.dimensions is None:
+            self.dimensions = vectors.shape[1]
+            self._vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Vector dimension mismatch: {vectors.shape[1]} vs {self.dimensions}")
+
+        start = self._count
+        self._reserve(start + len(rows))
+        self._vectors[start:start + len(rows)] = vectors
+        self._alive[start:start + len(rows)] = True
+        self._count += len(rows)
+
+        for offset, row in enumerate(rows):
+            self._rows.append({f: row.get(f) for f in ROW_FIELDS})
+            self._doc_positions.setdefault(row['document_id'], []).append(start + offset)
+            self._id_positions[row['id']] = start + offset
+
+        if self.trained:
+            self._assign(np.arange(start, self._count))
+        elif self._count >= self.train_threshold:
+            self.train()
+
+    def remove_documents(self, document_ids: List[str]):
+        """Tombstone all chunks of the given documents."""
+        for doc_id in document_ids:
+            for pos in self._doc_positions.pop(doc_id, []):
+                self._alive[pos] = False
+                if self._id_positions.get(self._rows[pos]['id']) == pos:
+                    del self._id_positions[self._rows[pos]['id']]
+
+    def remove_chunks(self, chunk_ids: List[str]):
+        """Tombstone individual chunks by id."""
+        for chunk_id in chunk_ids:
+            pos = self._id_positions.pop(chunk_id, None)
+            if pos is not None:
+                self._alive[pos] = False
+
+    def _reserve(self, size: int):
+        """Grow storage geometrically so appends are amortized O(1)."""
+        if size <= self._vectors.shape[0]:
+            return
+        capacity = max(size, 2 * self._vectors.shape[0], 1024)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:self._count] = self._vectors[:self._count]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._count] = self._alive[:self._count]
+        self._vectors, self._alive = vectors, alive
+
+    def train(self):
+        """Run spherical k-means on a sample and rebuild the IVF lists."""
+        live = np.flatnonzero(self._alive[:self._count])
+        nlist = min(self.nlist, len(live))
+        if nlist == 0:
+            return
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(live, min(len(live), nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize_matrix(sums)
+
+        self._centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        self._assign(live)
+        logger.info(f"Trained IVF index: {len(live)} vectors, {nlist} lists")
+
+    def _assign(self, positions: np.ndarray):
+        """Append positions to their nearest centroid's list."""
+        labels = np.argmax(self._vectors[positions] @ self._centroids.T, axis=1)
+        for pos, label in zip(positions.tolist(), labels.tolist()):
+            self._lists[label].append(pos)
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        """Row positions to score for this query."""
+        if not self.trained or self.nprobe >= len(self._lists):
+            return np.arange(self._count)
+        probe, _ = top_k(self._centroids @ query, self.nprobe)
+        return np.concatenate([np.asarray(self._lists[i], dtype=np.int64) for i in probe])
+
+    def search_sync(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Top-k rows by cosine similarity (filters match stored row fields).
+
+        Rows carry their stored unit vector as 'embedding'.
+        """
+        if self._count == 0:
+            return []
+        query = normalize_matrix(to_float32(query_vector))[0]
+        candidates = self._candidates(query)
+        candidates = candidates[self._alive[candidates]]
+        scores = self._vectors[candidates] @ query
+
+        keep = scores >= match_threshold
+        for key, value in (filters or {}).items():
+            if key in ROW_FIELDS:
+                keep &= np.array([self._rows[p][key] == value for p in candidates], dtype=bool)
+        candidates, scores = candidates[keep], scores[keep]
+
+        idx, best = top_k(scores, match_count)
+        return [
+            {**self._rows[pos], 'similarity': float(score), 'embedding': self._vectors[pos].copy()}
+            for pos, score in zip(candidates[idx].tolist(), best.tolist())
+        ]
+
+    async def search(self, query_vector, match_threshold, match_count, filters=None):
+        return self.search_sync(query_vector, match_threshold, match_count, filters)
+
+    async def load_from_supabase(self, supabase_client, page_size: int = 1000) -> int:
+        """
+        Bulk-load all visible document_chunks (paged in id order, so pages
+        neither skip nor repeat rows).
+
+        Returns:
+            Number of chunks loaded
+        """
+        loaded = 0
+        while True:
+            query = supabase_client.table('document_chunks')\
+                .select('id, document_id, chunk_text, chunk_index, embedding, documents(title)')\
+                .order('id')\
+                .range(loaded, loaded + page_size - 1)
+            page = (await asyncio.to_thread(query.execute)).data
+            self.add_chunks([
+                {**row, 'document_title': (row.get('documents') or {}).get('title')}
+                for row in page
+            ])
+            loaded += len(page)
+            if len(page) < page_size:
+                return loaded
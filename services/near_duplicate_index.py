@@ -0,0 +1,205 @@
+"""
+Phase 3: Near-Duplicate Index
+
+MinHash LSH index over stored chunks (utils/minhash.py), queried at
+ingest time to find chunks that already exist in near-identical form.
+
+With a path, the index is an append-only JSON-lines log shared by every
+worker on the host:
+- each record adds a chunk ({"id", "doc", "sig"}: base64 signature) or
+  drops chunk ids ({"drop": [...]})
+- writers append under an flock'd lock file and first replay what other
+  workers appended; readers replay new complete lines on refresh()
+- compact() rewrites the log with live entries only and replaces it
+  atomically; other workers notice the new inode and reload
+"""
+
+from contextlib import contextmanager
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+import base64
+import fcntl
+import json
+import logging
+import os
+
+import numpy as np
+
+from utils.minhash import MinHasher, band_keys, estimate_similarity
+
+logger = logging.getLogger(__name__)
+
+
+def _entry(chunk_id: str, document_id: str, signature: np.ndarray) -> Dict:
+    return {'id': chunk_id, 'doc': document_id, 'sig': base64.b64encode(signature.tobytes()).decode()}
+
+
+def _encode(records: List[Dict]) -> bytes:
+    return b''.join(json.dumps(r).encode() + b'\n' for r in records)
+
+
+class NearDuplicateIndex:
+    """LSH index of chunk MinHash signatures, optionally persisted."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        seed: int = 1
+    ):
+        """
+        Args:
+            path: Log file shared by workers (in memory only if None)
+            threshold: Estimated Jaccard similarity that counts as duplicate
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            seed: MinHash permutation seed
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.params = {'num_perm': num_perm, 'bands': bands, 'seed': seed}
+        self._lock = RLock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        """Empty tables: slot → chunk id / document id / signature."""
+        self._ids: List[Optional[str]] = []
+        self._docs, self._sigs = [], []
+        self._slots: Dict[str, int] = {}
+        self._buckets: Dict[int, List[int]] = {}
+        self._offset, self._inode = 0, None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _apply(self, record: Dict):
+        """Apply one log record to the in-memory tables."""
+        if 'params' in record:
+            if record['params'] != self.params:
+                raise ValueError(f"{self.path} was built with {record['params']}, not {self.params}")
+        elif 'drop' in record:
+            for chunk_id in record['drop']:
+                slot = self._slots.pop(chunk_id, None)
+                if slot is not None:
+                    self._ids[slot] = None
+        elif record['id'] not in self._slots:
+            sig = np.frombuffer(base64.b64decode(record['sig']), dtype=np.uint32)
+            slot = len(self._ids)
+            self._ids.append(record['id'])
+            self._docs.append(record['doc'])
+            self._sigs.append(sig)
+            self._slots[record['id']] = slot
+            for key in band_keys(sig, self.bands):
+                self._buckets.setdefault(key, []).append(slot)
+
+    def refresh(self) -> int:
+        """Replay records other workers appended; returns how many."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with self._lock:
+            stat = os.stat(self.path)
+            if stat.st_ino != self._inode:
+                self._reset()
+                self._inode = stat.st_ino
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+            complete = data[:data.rfind(b'\n') + 1]
+            self._offset += len(complete)
+            for line in complete.splitlines():
+                self._apply(json.loads(line))
+            return complete.count(b'\n')
+
+    @contextmanager
+    def _writing(self):
+        """Hold the cross-process write lock, caught up with the log."""
+        with self._lock:
+            if not self.path:
+                yield None
+                return
+            with open(f"{self.path}.lock", 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    self.refresh()
+                    with open(self.path, 'ab') as log:
+                        yield log
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write(self, records: List[Dict]):
+        with self._writing() as log:
+            if log is not None:
+                if self._offset == 0:
+                    records = [{'params': self.params}] + records
+                data = _encode(records)
+                log.write(data)
+                self._offset += len(data)
+                self._inode = os.fstat(log.fileno()).st_ino
+            for record in records:
+                self._apply(record)
+
+    def add(self, entries: Iterable[Tuple[str, str, np.ndarray]]):
+        """Register (chunk id, document id, signature) entries."""
+        records = [_entry(chunk_id, doc_id, sig) for chunk_id, doc_id, sig in entries]
+        if records:
+            self._write(records)
+
+    def remove_chunks(self, chunk_ids: Iterable[str]):
+        """Forget chunks (deleted or superseded)."""
+        drop = [chunk_id for chunk_id in chunk_ids if chunk_id in self._slots]
+        if drop:
+            self._write([{'drop': drop}])
+
+    def remove_documents(self, document_ids: Iterable[str]):
+        """Forget every chunk of the given documents."""
+        docs = set(document_ids)
+        self.remove_chunks([cid for cid, slot in self._slots.items() if self._docs[slot] in docs])
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[str, str, float]]:
+        """
+        Most similar indexed chunk at or above the threshold.
+
+        Returns:
+            (chunk id, document id, estimated similarity), or None
+        """
+        matches = self.query_all(signature)
+        return matches[0] if matches else None
+
+    def query_all(self, signature: np.ndarray) -> List[Tuple[str, str, float]]:
+        """Every indexed chunk at or above the threshold, most similar first."""
+        with self._lock:
+            candidates = {
+                slot for key in band_keys(signature, self.bands)
+                for slot in self._buckets.get(key, ()) if self._ids[slot] is not None
+            }
+            if not candidates:
+                return []
+            slots = list(candidates)
+            similarity = estimate_similarity(signature, np.stack([self._sigs[s] for s in slots]))
+            order = np.argsort(-similarity, kind='stable')
+            return [
+                (self._ids[slots[i]], self._docs[slots[i]], float(similarity[i]))
+                for i in order.tolist() if similarity[i] >= self.threshold
+            ]
+
+    def compact(self):
+        """Rewrite the log (and tables) without dropped chunks."""
+        with self._writing():
+            live = [_entry(self._ids[s], self._docs[s], self._sigs[s]) for s in sorted(self._slots.values())]
+            self._reset()
+            if self.path:
+                with open(f"{self.path}.tmp", 'wb') as f:
+                    f.write(_encode([{'params': self.params}] + live))
+                os.replace(f"{self.path}.tmp", self.path)
+                self.refresh()
+            else:
+                for record in live:
+                    self._apply(record)
+        logger.info(f"Compacted near-duplicate index: {len(self)} chunks")
@@ -0,0 +1,200 @@
+"""
+Phase 3: Parallel Chunker
+
+Runs DocumentChunker on a process pool so bulk loads use every core
+(chunking is pure-Python string work and holds the GIL):
+- documents are grouped into contiguous work units of similar size,
+  several per worker, amortizing task overhead and balancing stragglers
+- above shm_min_bytes the texts are written once into a shared memory
+  block that workers attach to, instead of being pickled to each worker
+- workers return chunk offsets into the text, not chunk text; the parent
+  slices its own copy, so results cost a few integers per chunk
+
+Results are DocumentChunk lists in input order, identical to chunk_text().
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import os
+
+from services.document_chunker import DocumentChunk, DocumentChunker
+from utils.tokenizer import get_shared_token_counter
+
+logger = logging.getLogger(__name__)
+
+# (start, end, token_count, metadata); start is None if end is the chunk text
+_ChunkSpec = Tuple[Optional[int], object, int, Dict]
+
+_worker_chunker: Optional[DocumentChunker] = None
+
+
+def _init_worker(config: Dict):
+    """Build the worker's chunker (token counters are not picklable)."""
+    global _worker_chunker
+    counter = get_shared_token_counter() if config.pop('token_counted') else None
+    _worker_chunker = DocumentChunker(token_counter=counter, **config)
+
+
+def _read_shared(name: str, spans: List[Tuple[int, int]]) -> List[str]:
+    shm = SharedMemory(name=name)  # owned (and unlinked) by the parent
+    try:
+        return [bytes(shm.buf[start:end]).decode('utf-8') for start, end in spans]
+    finally:
+        shm.close()
+
+
+def _chunk_unit(payload, document_ids: List[Optional[str]]) -> List[List[_ChunkSpec]]:
+    """Chunk one work unit: texts, or (shared memory name, byte spans)."""
+    texts = _read_shared(*payload) if isinstance(payload, tuple) else payload
+    results = []
+    for text, document_id in zip(texts, document_ids):
+        specs, cursor = [], 0
+        for chunk in _worker_chunker.chunk_text(text, document_id):
+            start = text.find(chunk.text, cursor)
+            span = (start, start + len(chunk.text)) if start >= 0 else (None, chunk.text)
+            specs.append((*span, chunk.token_count, chunk.metadata))
+            cursor = max(cursor, start + 1)
+        results.append(specs)
+    return results
+
+
+class ParallelChunker:
+    """Process-pool front end for DocumentChunker."""
+
+    def __init__(
+        self,
+        chunker: DocumentChunker,
+        workers: Optional[int] = None,
+        units_per_worker: int = 4,
+        min_unit_chars: int = 256_000,
+        shm_min_bytes: int = 4_000_000,
+        start_method: str = 'spawn'
+    ):
+        """
+        Args:
+            chunker: Settings to replicate in the workers (a token counter
+                means workers size in tokens with their shared counter)
+            workers: Worker processes (CPU count if None)
+            units_per_worker: Work units per worker per call
+            min_unit_chars: Smallest work unit worth a task
+            shm_min_bytes: Payload size from which texts go through
+                shared memory instead of pickling
+            start_method: multiprocessing start method ('spawn' is thread safe)
+        """
+        self.chunker = chunker
+        self.workers = workers or os.cpu_count() or 1
+        self.units_per_worker = units_per_worker
+        self.min_unit_chars = min_unit_chars
+        self.shm_min_bytes = shm_min_bytes
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            config = {
+                'chunk_size': self.chunker.chunk_size,
+                'chunk_overlap': self.chunker.chunk_overlap,
+                'separators': self.chunker.separators,
+                'token_counted': self.chunker.token_counter is not None
+            }
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=get_context(self.start_method),
+                initializer=_init_worker, initargs=(config,)
+            )
+        return self._pool
+
+    def units(self, texts: Sequence[str]) -> List[Tuple[int, int]]:
+        """Split documents into contiguous (start, end) index ranges of similar size."""
+        total = sum(len(text) for text in texts)
+        target = max(total // (self.workers * self.units_per_worker), self.min_unit_chars)
+        ranges, start, size = [], 0, 0
+        for i, text in enumerate(texts):
+            size += len(text)
+            if size >= target:
+                ranges.append((start, i + 1))
+                start, size = i + 1, 0
+        if start < len(texts):
+            ranges.append((start, len(texts)))
+        return ranges
+
+    def _submit(self, texts: List[str], ids: List) -> Tuple[List, List[Future], Optional[SharedMemory]]:
+        """Submit every unit; texts go through shared memory when large."""
+        ranges, shm = self.units(texts), None
+        encoded = [text.encode('utf-8') for text in texts]
+        size = sum(len(data) for data in encoded)
+        if size >= self.shm_min_bytes:
+            shm = SharedMemory(create=True, size=size)
+            spans, offset = [], 0
+            for data in encoded:
+                shm.buf[offset:offset + len(data)] = data
+                spans.append((offset, offset + len(data)))
+                offset += len(data)
+        pool = self._executor()
+        futures = [
+            pool.submit(_chunk_unit, (shm.name, spans[a:b]) if shm else texts[a:b], ids[a:b])
+            for a, b in ranges
+        ]
+        return ranges, futures, shm
+
+    def _collect(self, texts: List[str], ranges, unit_results) -> List[List[DocumentChunk]]:
+        """Rebuild DocumentChunks from worker offsets, in input order."""
+        output = []
+        for (a, b), unit in zip(ranges, unit_results):
+            for text, specs in zip(texts[a:b], unit):
+                output.append([
+                    DocumentChunk(text[start:end] if start is not None else end, i, tokens, metadata)
+                    for i, (start, end, tokens, metadata) in enumerate(specs)
+                ])
+        return output
+
+    @staticmethod
+    def _release(shm: Optional[SharedMemory]):
+        if shm is not None:
+            shm.close(), shm.unlink()
+
+    def chunk_many(self, texts: Sequence[str], document_ids: Optional[Sequence] = None) -> List[List[DocumentChunk]]:
+        """
+        Chunk documents in parallel (blocking).
+
+        Args:
+            texts: Document texts
+            document_ids: Ids for chunk metadata (None each if omitted)
+
+        Returns:
+            One DocumentChunk list per text, in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        ranges, futures, shm = self._submit(texts, list(document_ids or [None] * len(texts)))
+        try:
+            return self._collect(texts, ranges, [future.result() for future in futures])
+        finally:
+            self._release(shm)
+
+    async def chunk_many_async(self, texts: Sequence[str], document_ids: Optional[Sequence] = None) -> List:
+        """chunk_many() without blocking the event loop."""
+        texts = list(texts)
+        if not texts:
+            return []
+        ranges, futures, shm = await asyncio.to_thread(self._submit, texts, list(document_ids or [None] * len(texts)))
+        try:
+            results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+            return self._collect(texts, ranges, results)
+        finally:
+            self._release(shm)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,150 @@
+"""
+Phase 3: Quantized Segment Vector Backend
+
+Two-pass search over an EmbeddingSegmentStore for large tenants:
+1. score every live row on compact codes (int8 or packed sign bits)
+   kept beside each segment as seg-NNNNNN.i8 / .i8s / .b1
+2. rescore the best match_count × rescore_factor candidates with exact
+   float32 dot products, reading only those rows from the .f32 memmap
+
+Only the codes need to stay resident (4× smaller for int8, 32× for
+binary); the float matrix is touched for a few candidate rows per query.
+Returned similarities are exact. Codes are written when chunks are
+ingested and rebuilt lazily for segments that lack them (e.g. after
+compaction or for stores created before quantization was enabled).
+"""
+
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+
+import numpy as np
+
+from services.embedding_store import EmbeddingSegmentStore
+from services.segment_vector_backend import SegmentVectorBackend
+from utils.quantization import (
+    QUANTIZATION_MODES, binary_scores, int8_scores, quantize_binary, quantize_int8
+)
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix, top_k
+
+logger = logging.getLogger(__name__)
+
+_CODE_FILES = {'int8': ('i8', 'i8s'), 'binary': ('b1',)}
+
+
+class QuantizedSegmentBackend(SegmentVectorBackend):
+    """Segment store search on quantized codes with exact rescoring."""
+
+    def __init__(
+        self,
+        store: EmbeddingSegmentStore,
+        mode: str = 'binary',
+        rescore_factor: int = 10,
+        block_rows: int = 65536
+    ):
+        """
+        Args:
+            store: Segment store (also written by DocumentIngestionService)
+            mode: 'int8' or 'binary'
+            rescore_factor: Candidates rescored per requested result
+            block_rows: Rows encoded / scored per step (bounds temp memory)
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        super().__init__(store, block_rows=block_rows)
+        self.mode = mode
+        self.rescore_factor = rescore_factor
+        self._codes: Dict[str, Tuple[np.ndarray, ...]] = {}
+
+    def add_chunks(self, rows: List[Dict]):
+        """Persist chunks as a new segment and encode it right away."""
+        self.store.append(rows)
+        self.build_codes()
+
+    def build_codes(self):
+        """Ensure every live segment has codes on disk and mapped."""
+        live = set()
+        for name, vectors, _, _ in self.store.named_segments():
+            live.add(name)
+            self._segment_codes(name, vectors)
+        self._codes = {name: codes for name, codes in self._codes.items() if name in live}
+
+    def _segment_codes(self, name: str, vectors: np.ndarray) -> Tuple[np.ndarray, ...]:
+        if name in self._codes:
+            return self._codes[name]
+        base = os.path.join(self.store.path, name)
+        paths = [f"{base}.{ext}" for ext in _CODE_FILES[self.mode]]
+        if not all(os.path.exists(path) for path in paths):
+            self._write_codes(vectors, paths)
+
+        count, dims = vectors.shape
+        if self.mode == 'int8':
+            codes = (
+                np.memmap(paths[0], dtype=np.int8, mode='r', shape=(count, dims)),
+                np.memmap(paths[1], dtype=np.float32, mode='r', shape=(count,))
+            )
+        else:
+            codes = (np.memmap(paths[0], dtype=np.uint8, mode='r', shape=(count, (dims + 7) // 8)),)
+        self._codes[name] = codes
+        return codes
+
+    def _write_codes(self, vectors: np.ndarray, paths: List[str]):
+        """Encode a segment block by block; files appear atomically."""
+        files = [open(f"{path}.tmp", 'wb') for path in paths]
+        try:
+            for start in range(0, len(vectors), self.block_rows):
+                block = np.asarray(vectors[start:start + self.block_rows])
+                parts = quantize_int8(block) if self.mode == 'int8' else (quantize_binary(block),)
+                for f, part in zip(files, parts):
+                    f.write(np.ascontiguousarray(part).tobytes())
+            for f in files:
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            for f in files:
+                f.close()
+        for path in paths:
+            os.replace(f"{path}.tmp", path)
+        logger.info(f"Wrote {self.mode} codes for {len(vectors)} rows ({os.path.basename(paths[0])})")
+
+    def _approximate(self, codes: Tuple[np.ndarray, ...], query: np.ndarray, query_code) -> np.ndarray:
+        """First-pass scores for every row of a segment."""
+        total = len(codes[0])
+        blocks = []
+        for start in range(0, total, self.block_rows):
+            end = min(start + self.block_rows, total)
+            if self.mode == 'int8':
+                blocks.append(int8_scores(codes[0][start:end], codes[1][start:end], query))
+            else:
+                blocks.append(binary_scores(np.asarray(codes[0][start:end]), query_code, len(query)))
+        return np.concatenate(blocks) if blocks else np.zeros(0, np.float32)
+
+    def search_sync(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Top-k rows: candidates from codes, similarity from float32."""
+        query = normalize_matrix(to_float32(query_vector))[0]
+        query_code = quantize_binary(query) if self.mode == 'binary' else None
+        limit = max(match_count, match_count * self.rescore_factor)
+        best_scores, best_hits, best_vectors = [], [], []
+
+        for name, vectors, rows, live in self.store.named_segments():
+            approx = self._approximate(self._segment_codes(name, vectors), query, query_code)
+            positions = self._filter(rows, np.flatnonzero(live), filters)
+            idx, _ = top_k(approx[positions], limit)
+            candidates = np.sort(positions[idx])  # ascending: sequential memmap reads
+
+            candidate_vectors = np.asarray(vectors[candidates])
+            exact = candidate_vectors @ query
+            passing = np.flatnonzero(exact >= match_threshold)
+            idx, top = top_k(exact[passing], match_count)
+            best_scores.extend(top.tolist())
+            best_hits.extend((rows, p) for p in candidates[passing[idx]].tolist())
+            best_vectors.extend(candidate_vectors[passing[idx]])
+
+        return self._top_rows(best_scores, best_hits, best_vectors, match_count)
@@ -0,0 +1,78 @@
+"""
+Phase 3: RAG Audit Logging
+
+Writes RAG query audit rows to process_events through a batched
+background queue, so audit latency never adds to retrieval latency.
+"""
+
+from typing import List, Optional
+import logging
+from services.event_queue import BatchedEventWriter
+from services.rag_results import RAGResult, summarize_results
+
+logger = logging.getLogger(__name__)
+
+
+class RAGAuditLogger:
+    """Audit trail for RAG retrievals (event_type 'rag_query')."""
+
+    def __init__(
+        self,
+        supabase_client,
+        writer: Optional[BatchedEventWriter] = None
+    ):
+        """
+        Args:
+            supabase_client: Supabase client
+            writer: Batched writer (default: process_events, 50 rows/1s)
+        """
+        self.writer = writer or BatchedEventWriter(supabase_client, 'process_events')
+
+    async def log_query(
+        self,
+        query_text: str,
+        user_id: str,
+        results: List[RAGResult],
+        duration_ms: int
+    ):
+        """Log a single RAG query."""
+        await self._log_event(
+            'semantic_search', user_id, {'query': query_text},
+            summarize_results(results), duration_ms
+        )
+
+    async def log_batch(
+        self,
+        queries: List[str],
+        user_id: str,
+        results: List[List[RAGResult]],
+        duration_ms: int
+    ):
+        """Log a query_many call as one consolidated row."""
+        await self._log_event(
+            'semantic_search_batch', user_id, {'queries': queries},
+            {'results': [summarize_results(r) for r in results]}, duration_ms
+        )
+
+    async def _log_event(
+        self,
+        event_name: str,
+        user_id: str,
+        input_data: dict,
+        output_data: dict,
+        duration_ms: int
+    ):
+        """Queue one rag_query row for process_events."""
+        self.writer.enqueue({
+            'event_type': 'rag_query',
+            'event_name': event_name,
+            'user_id': user_id,
+            'input_data': input_data,
+            'output_data': output_data,
+            'status': 'completed',
+            'duration_ms': duration_ms
+        })
+
+    async def close(self):
+        """Drain queued audit rows."""
+        await self.writer.close()
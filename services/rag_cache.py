@@ -0,0 +1,132 @@
+"""
+Phase 3: RAG Result Cache
+
+TTL cache of RAGService.query results keyed by normalized query text,
+filters, and user. Invalidation uses version counters instead of scans:
+- global version: bumped when team/org/public content changes
+- per-user version: bumped when the user's own private documents or
+  explicit grants change
+
+An entry is served only while both versions match the ones it was
+stored under, so a user never sees results computed before an ACL change.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import json
+import time
+
+
+def normalize_query(query_text: str) -> str:
+    """Case- and whitespace-insensitive query form."""
+    return ' '.join(query_text.lower().split())
+
+
+class RAGResultCache:
+    """Bounded TTL cache with ACL-version invalidation."""
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        """
+        Args:
+            ttl_seconds: Maximum age of a cached result
+            max_entries: LRU bound on cached queries
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._global_version = 0
+        self._user_versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, int, List]]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(query_text: str, user_id: str, filters: Optional[Dict]) -> Tuple:
+        return (
+            normalize_query(query_text),
+            json.dumps(filters or {}, sort_keys=True, default=str),
+            user_id
+        )
+
+    def get(self, query_text: str, user_id: str, filters: Optional[Dict] = None) -> Optional[List]:
+        """Cached results, or None if missing, expired, or invalidated."""
+        key = self._key(query_text, user_id, filters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, global_v, user_v, results = entry
+                if (
+                    expires_at > time.monotonic()
+                    and global_v == self._global_version
+                    and user_v == self._user_versions.get(user_id, 0)
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(results)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query_text: str, user_id: str, filters: Optional[Dict], results: List):
+        """Store results under the current ACL versions."""
+        key = self._key(query_text, user_id, filters)
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl_seconds,
+                self._global_version,
+                self._user_versions.get(user_id, 0),
+                list(results)
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str):
+        """Drop one user's cached results (grant/revoke, private docs)."""
+        with self._lock:
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    def invalidate_all(self):
+        """Drop every cached result (shared-scope content changed)."""
+        with self._lock:
+            self._global_version += 1
+
+    def invalidate_for_document(
+        self,
+        visibility: str,
+        created_by: Optional[str] = None
+    ):
+        """
+        Invalidate the scope that can see a document.
+
+        Private documents are visible to their creator only; team, org
+        and public documents may be visible to anyone.
+        """
+        if visibility == 'private' and created_by:
+            self.invalidate_user(created_by)
+        else:
+            self.invalidate_all()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+_shared_cache: Optional[RAGResultCache] = None
+
+
+def get_shared_rag_cache() -> RAGResultCache:
+    """
+    Process-wide cache. ACLHelper and DocumentIngestionService invalidate
+    it by default, so RAGService instances that opt in stay consistent.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = RAGResultCache()
+    return _shared_cache
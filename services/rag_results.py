@@ -0,0 +1,76 @@
+"""
+Phase 3: RAG Results
+
+RAGResult model and helpers shared by single and batched RAG queries.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from utils.vector_cache import VectorLike
+
+
+@dataclass
+class RAGResult:
+    """Represents a single RAG search result."""
+    id: str
+    document_id: str
+    document_title: str
+    chunk_text: str
+    chunk_index: int
+    similarity_score: float
+    metadata: dict
+    embedding: Optional[VectorLike] = None  # set by the local vector backends
+
+
+def rows_to_results(
+    rows: List[Dict],
+    similarity_threshold: float,
+    max_results: int
+) -> List[RAGResult]:
+    """Convert match_documents rows to RAGResults above the threshold."""
+    results = [
+        RAGResult(
+            id=row['id'],
+            document_id=row['document_id'],
+            document_title=row['document_title'],
+            chunk_text=row['chunk_text'],
+            chunk_index=row['chunk_index'],
+            similarity_score=row['similarity'],
+            metadata={},
+            embedding=row.get('embedding')
+        )
+        for row in rows
+        if row['similarity'] >= similarity_threshold
+    ]
+    return results[:max_results]
+
+
+def dedupe_across_queries(result_lists: List[List[RAGResult]]) -> List[List[RAGResult]]:
+    """
+    Keep each chunk only in the result list where it scored highest
+    (earliest query wins ties), so batched retrievals do not repeat text.
+    """
+    best: Dict[str, tuple] = {}
+    for q, results in enumerate(result_lists):
+        for result in results:
+            current = best.get(result.id)
+            if current is None or result.similarity_score > current[0]:
+                best[result.id] = (result.similarity_score, q)
+
+    return [
+        [r for r in results if best[r.id][1] == q]
+        for q, results in enumerate(result_lists)
+    ]
+
+
+def summarize_results(results: List[RAGResult]) -> dict:
+    """Audit summary written to process_events.output_data."""
+    return {
+        'result_count': len(results),
+        'document_ids': [r.document_id for r in results],
+        'avg_similarity': (
+            sum(r.similarity_score for r in results) / len(results)
+            if results else 0
+        )
+    }
@@ -0,0 +1,81 @@
+"""
+Phase 3: Shared RAG Services
+
+Process-wide instances for the agent nodes, so per-query bookkeeping
+(deferred embedding-cache usage counts, queued audit rows) is batched
+across queries instead of being flushed after every query. The worker drains them
+with close_rag_services() on shutdown.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+_supabase = None
+_embedding_service = None
+_rag_service = None
+
+
+def get_supabase_client():
+    """
+    Process-wide Supabase client from SUPABASE_URL / SUPABASE_ANON_KEY.
+
+    Returns:
+        Client, or None if credentials are not configured
+    """
+    global _supabase
+    if _supabase is None:
+        url, key = os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_ANON_KEY')
+        if not url or not key:
+            return None
+        from supabase import create_client
+        _supabase = create_client(url, key)
+    return _supabase
+
+
+def get_embedding_service():
+    """Process-wide EmbeddingService (None without Supabase credentials)."""
+    global _embedding_service
+    if _embedding_service is None:
+        supabase = get_supabase_client()
+        if supabase is None:
+            return None
+        from services.embedding_service import EmbeddingService
+        _embedding_service = EmbeddingService(supabase, primary_model="openai", fallback_to_local=True)
+    return _embedding_service
+
+
+def get_rag_service():
+    """Process-wide RAGService (None without Supabase credentials)."""
+    global _rag_service
+    if _rag_service is None:
+        embedding_service = get_embedding_service()
+        if embedding_service is None:
+            return None
+        from services.rag_cache import get_shared_rag_cache
+        from services.rag_service import RAGService
+        _rag_service = RAGService(
+            get_supabase_client(),
+            embedding_service,
+            similarity_threshold=0.7,
+            result_cache=get_shared_rag_cache()
+        )
+    return _rag_service
+
+
+async def close_rag_services():
+    """Flush and release the shared services (call on worker shutdown)."""
+    global _embedding_service, _rag_service
+    if _rag_service is not None:
+        try:
+            await _rag_service.close()
+        except Exception as e:
+            logger.warning(f"RAG audit drain failed: {e}")
+        _rag_service = None
+    if _embedding_service is not None:
+        try:
+            await _embedding_service.aclose()
+        except Exception as e:
+            logger.warning(f"Embedding service shutdown failed: {e}")
+        _embedding_service = None
@@ -3,28 +3,27 @@ Phase 3: RAG Service
 
 Permissions-aware Retrieval-Augmented Generation.
 Performs vector similarity search with RLS enforcement.
+Search runs on a pluggable backend (services/vector_search.py); results
+from backends that bypass RLS are post-filtered with ACLHelper.
+Hybrid mode fuses vector results with an in-process BM25 index
+(services/lexical_index.py) by reciprocal rank fusion.
 """
 
-from dataclasses import dataclass
 from typing import List, Dict, Optional
+import asyncio
 import logging
 import time
+from services.rag_audit import RAGAuditLogger
+from services.rag_cache import RAGResultCache
+from services.hybrid_search import cache_scope, rank_hybrid, resolve_hybrid
+from services.lexical_index import BM25Index
+from services.rag_results import RAGResult, dedupe_across_queries, rows_to_results
+from services.vector_search import SupabaseVectorBackend, VectorSearchBackend
+from utils.acl_helper import ACLHelper
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class RAGResult:
-    """Represents a single RAG search result."""
-    id: str
-    document_id: str
-    document_title: str
-    chunk_text: str
-    chunk_index: int
-    similarity_score: float
-    metadata: dict
-
-
 class RAGService:
     """Retrieve relevant context for LLM with permission enforcement."""
     
@@ -33,7 +32,11 @@ class RAGService:
         supabase_client,
         embedding_service,
         similarity_threshold: float = 0.7,
-        max_results: int = 10
+        max_results: int = 10,
+        vector_backend: Optional[VectorSearchBackend] = None,
+        acl_helper: Optional[ACLHelper] = None,
+        result_cache: Optional[RAGResultCache] = None,
+        lexical_index: Optional[BM25Index] = None
     ):
         """
         Initialize RAG service.
@@ -43,17 +46,27 @@ class RAGService:
             embedding_service: EmbeddingService instance
             similarity_threshold: Minimum similarity score (0-1)
             max_results: Maximum results to return
+            vector_backend: Search backend (pgvector match_documents if None)
+            acl_helper: Permission filter for non-RLS backends
+            result_cache: Optional cache (e.g. get_shared_rag_cache())
+            lexical_index: BM25 index; queries are hybrid by default if set
         """
         self.supabase = supabase_client
         self.embedding_service = embedding_service
         self.similarity_threshold = similarity_threshold
         self.max_results = max_results
+        self.vector_backend = vector_backend or SupabaseVectorBackend(supabase_client)
+        self.acl_helper = acl_helper or ACLHelper(supabase_client)
+        self.result_cache = result_cache
+        self.lexical_index = lexical_index
+        self.audit = RAGAuditLogger(supabase_client)
     
     async def query(
         self,
         query_text: str,
         user_id: str,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        hybrid: Optional[bool] = None
     ) -> List[RAGResult]:
         """
         Execute permissions-aware RAG query.
@@ -62,93 +75,121 @@ class RAGService:
             query_text: User's query
             user_id: User ID for audit logging
             filters: Optional filters (document_type, team_id, etc.)
+            hybrid: Fuse BM25 and vector rankings (default: if a lexical index
+                is configured); similarity_score is then the fusion score
             
         Returns:
             List of RAGResult objects (RLS-filtered)
         """
         start_time = time.time()
+        hybrid = resolve_hybrid(hybrid, self.lexical_index)
+        scope = cache_scope(filters, hybrid)
         
-        # 1. Generate query embedding
-        query_vector = await self.embedding_service.generate_embedding(query_text)
-        
-        # 2. Vector search with RLS enforcement
-        results = await self._vector_search(query_vector, filters)
-        
-        # 3. Convert to RAGResult objects
-        rag_results = []
-        for row in results:
-            if row['similarity'] >= self.similarity_threshold:
-                rag_results.append(RAGResult(
-                    id=row['id'],
-                    document_id=row['document_id'],
-                    document_title=row['document_title'],
-                    chunk_text=row['chunk_text'],
-                    chunk_index=row['chunk_index'],
-                    similarity_score=row['similarity'],
-                    metadata={}
-                ))
+        # Repeated questions skip embedding and vector search
+        top_results = None
+        if self.result_cache is not None:
+            top_results = self.result_cache.get(query_text, user_id, scope)
         
-        # 4. Limit results
-        top_results = rag_results[:self.max_results]
+        if top_results is None:
+            query_vector = await self.embedding_service.generate_embedding(query_text)
+            rows = await self._vector_search(query_vector, filters)
+            [top_results] = await self._rank([query_text], [rows], user_id, filters, hybrid)
+            if self.result_cache is not None:
+                self.result_cache.put(query_text, user_id, scope, top_results)
         
-        # 5. Log query for audit
+        # Log query for audit
         duration_ms = int((time.time() - start_time) * 1000)
-        await self._log_rag_query(query_text, user_id, top_results, duration_ms)
+        await self.audit.log_query(query_text, user_id, top_results, duration_ms)
         
-        logger.info(
-            f"RAG query: '{query_text[:50]}...' → {len(top_results)} results "
-            f"({duration_ms}ms)"
-        )
+        logger.info(f"RAG query: '{query_text[:50]}...' → {len(top_results)} results ({duration_ms}ms)")
         
         return top_results
     
-    async def _vector_search(
+    async def query_many(
         self,
-        query_vector: List[float],
-        filters: Optional[Dict] = None
-    ) -> List[Dict]:
+        queries: List[str],
+        user_id: str,
+        filters: Optional[Dict] = None,
+        dedupe: bool = True,
+        hybrid: Optional[bool] = None
+    ) -> List[List[RAGResult]]:
         """
-        Execute vector similarity search.
+        Execute several permissions-aware RAG queries at once.
         
-        Uses match_documents() function (RLS automatically enforced).
-        """
-        try:
-            result = self.supabase.rpc('match_documents', {
-                'query_embedding': query_vector,
-                'match_threshold': self.similarity_threshold,
-                'match_count': self.max_results * 2  # Get more, filter later
-            }).execute()
+        Uncached queries are embedded in one batched request and their
+        vector searches run concurrently. Writes one audit row.
+        
+        Args:
+            queries: Query texts
+            user_id: User ID for audit logging
+            filters: Optional filters applied to every query
+            dedupe: Keep each chunk only in its best-scoring query
+            hybrid: As in query()
             
-            return result.data
+        Returns:
+            One result list per query (same order as queries)
+        """
+        start_time = time.time()
+        hybrid = resolve_hybrid(hybrid, self.lexical_index)
+        scope = cache_scope(filters, hybrid)
+        
+        results: List[Optional[List[RAGResult]]] = [
+            self.result_cache.get(q, user_id, scope) if self.result_cache else None
+            for q in queries
+        ]
+        misses = [i for i, r in enumerate(results) if r is None]
         
+        if misses:
+            missed = [queries[i] for i in misses]
+            vectors = await self.embedding_service.generate_embeddings_batch(missed)
+            row_lists = await asyncio.gather(*(self._vector_search(v, filters) for v in vectors))
+            ranked = await self._rank(missed, row_lists, user_id, filters, hybrid)
+            for i, top in zip(misses, ranked):
+                results[i] = top
+                if self.result_cache is not None:
+                    self.result_cache.put(queries[i], user_id, scope, top)
+        
+        if dedupe:
+            results = dedupe_across_queries(results)
+        
+        duration_ms = int((time.time() - start_time) * 1000)
+        await self.audit.log_batch(queries, user_id, results, duration_ms)
+        return results
+    
+    async def _rank(self, queries: List[str], row_lists: List[List[Dict]], user_id: str,
+                    filters: Optional[Dict], hybrid: bool) -> List[List[RAGResult]]:
+        """Permission-filter search rows and convert them to results."""
+        if hybrid:
+            return await rank_hybrid(
+                queries, row_lists, self.lexical_index, filters,
+                lambda rows: self._filter_by_permission(rows, user_id), self.max_results
+            )
+        if not self.vector_backend.enforces_rls:
+            row_lists = await self._filter_by_permission(row_lists, user_id)
+        return [rows_to_results(rows, self.similarity_threshold, self.max_results) for rows in row_lists]
+    
+    async def _vector_search(self, query_vector: List[float], filters: Optional[Dict] = None) -> List[Dict]:
+        """Execute vector similarity search on the configured backend."""
+        try:
+            return await self.vector_backend.search(
+                query_vector,
+                match_threshold=self.similarity_threshold,
+                match_count=self.max_results * 2,  # Get more, filter later
+                filters=filters
+            )
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
             return []
     
-    async def _log_rag_query(
-        self,
-        query_text: str,
-        user_id: str,
-        results: List[RAGResult],
-        duration_ms: int
-    ):
-        """Log RAG query to process_events for audit."""
-        try:
-            self.supabase.table('process_events').insert({
-                'event_type': 'rag_query',
-                'event_name': 'semantic_search',
-                'user_id': user_id,
-                'input_data': {'query': query_text},
-                'output_data': {
-                    'result_count': len(results),
-                    'document_ids': [r.document_id for r in results],
-                    'avg_similarity': (
-                        sum(r.similarity_score for r in results) / len(results)
-                        if results else 0
-                    )
-                },
-                'status': 'completed',
-                'duration_ms': duration_ms
-            }).execute()
-        except Exception as e:
-            logger.warning(f"Failed to log RAG query: {e}")
+    async def _filter_by_permission(self, row_lists: List[List[Dict]], user_id: str) -> List[List[Dict]]:
+        """Drop rows from documents the user cannot read (one ACL check)."""
+        doc_ids = list({row['document_id'] for rows in row_lists for row in rows})
+        allowed = set(await self.acl_helper.filter_documents_by_permission(user_id, doc_ids))
+        return [
+            [row for row in rows if row['document_id'] in allowed]
+            for rows in row_lists
+        ]
+    
+    async def close(self):
+        """Drain queued audit rows (call on shutdown)."""
+        await self.audit.close()
@@ -0,0 +1,111 @@
+"""
+Phase 3: Segment Vector Backend
+
+Exact vector search directly over memory-mapped EmbeddingSegmentStore
+segments. Scanning the memmap reads pages through the OS cache, so every
+worker process on a host shares one copy of the corpus.
+
+Does not enforce RLS: RAGService post-filters results by permission.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import asyncio
+
+import numpy as np
+
+from services.embedding_store import KEY_FIELDS, ROW_FIELDS, EmbeddingSegmentStore, SegmentRows
+from services.vector_search import VectorSearchBackend
+from utils.vector_cache import to_float32
+from utils.vector_utils import normalize_matrix, top_k
+
+
+class SegmentVectorBackend(VectorSearchBackend):
+    """Vector search backend over an on-disk segment store."""
+
+    def __init__(self, store: EmbeddingSegmentStore, block_rows: int = 65536):
+        """
+        Args:
+            store: Segment store (also written by DocumentIngestionService)
+            block_rows: Rows scored per matrix product (bounds temp memory)
+        """
+        self.store = store
+        self.block_rows = block_rows
+
+    def add_chunks(self, rows: List[Dict]):
+        """Persist newly ingested chunks as a new segment."""
+        self.store.append(rows)
+
+    def remove_documents(self, document_ids: List[str]):
+        self.store.delete_documents(document_ids)
+
+    def remove_chunks(self, chunk_ids: List[str]):
+        self.store.delete_chunks(chunk_ids)
+
+    @staticmethod
+    def _filter(rows: SegmentRows, positions: np.ndarray, filters: Optional[Dict]) -> np.ndarray:
+        """
+        Positions whose side-table fields equal every filter value.
+
+        Id columns are resident; other fields are read only for the
+        positions still left.
+        """
+        for key, value in (filters or {}).items():
+            if key in KEY_FIELDS:
+                column = rows.columns[key]
+                positions = positions[np.array([column[p] == value for p in positions.tolist()], dtype=bool)]
+            elif key in ROW_FIELDS:
+                fetched = rows.fetch(positions.tolist())
+                positions = positions[np.array([r[key] == value for r in fetched], dtype=bool)]
+        return positions
+
+    def search_sync(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Top-k rows across all segments (filters match side-table fields).
+
+        Rows carry their stored unit vector as 'embedding'; only the
+        final hits' side-table rows are read.
+        """
+        query = normalize_matrix(to_float32(query_vector))[0]
+        best_scores, best_hits, best_vectors = [], [], []
+
+        for vectors, rows, live in self.store.segments():
+            for start in range(0, len(rows), self.block_rows):
+                end = min(start + self.block_rows, len(rows))
+                scores = vectors[start:end] @ query
+                positions = np.flatnonzero(live[start:end] & (scores >= match_threshold))
+                positions = self._filter(rows, positions + start, filters) - start
+                idx, top = top_k(scores[positions], match_count)
+                best_scores.extend(top.tolist())
+                best_hits.extend((rows, start + p) for p in positions[idx].tolist())
+                best_vectors.extend(np.array(vectors[start + p]) for p in positions[idx].tolist())
+
+        return self._top_rows(best_scores, best_hits, best_vectors, match_count)
+
+    @staticmethod
+    def _top_rows(
+        scores: List[float], hits: List[Tuple[SegmentRows, int]], vectors: List[np.ndarray], match_count: int
+    ) -> List[Dict]:
+        """Merge per-block winners into the final top-k result rows."""
+        idx, top = top_k(np.asarray(scores, dtype=np.float32), match_count)
+        return [
+            {**hits[i][0][hits[i][1]], 'similarity': float(score), 'embedding': vectors[i]}
+            for i, score in zip(idx.tolist(), top.tolist())
+        ]
+
+    async def search(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Scan in a worker thread (cold pages may hit disk)."""
+        return await asyncio.to_thread(
+            self.search_sync, query_vector, match_threshold, match_count, filters
+        )
@@ -0,0 +1,169 @@
+"""
+Phase 3: Streaming Document Chunker
+
+Chunks very large documents without holding them in memory. Accepts a
+string, a text file object, or any iterable of text pieces and yields
+DocumentChunks lazily, with exactly the boundaries DocumentChunker.chunk_text
+would produce for the concatenated text.
+
+chunk_text picks the first separator (in hierarchy order) present anywhere
+in the document, so the stream is first scanned until the top separator,
+some real text and more than one chunk's worth of characters have been
+seen. That prefix is spooled (in memory, spilling to a temp file past
+spool_bytes) and replayed; in the common case it is a few KB. Documents
+without paragraph breaks are spooled in full before chunking starts.
+"""
+
+from itertools import chain
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterable, Iterator, List, Set, Tuple, Union
+
+from services.document_chunker import DocumentChunk, DocumentChunker
+
+TextSource = Union[str, IO[str], Iterable[str]]
+
+
+def iter_pieces(source: TextSource, read_size: int) -> Iterator[str]:
+    """Normalize a text source into an iterator of string pieces."""
+    if isinstance(source, str):
+        return (source[i:i + read_size] for i in range(0, len(source), read_size))
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(read_size), '')
+    return iter(source)
+
+
+def iter_splits(pieces: Iterable[str], separator: str) -> Iterator[str]:
+    """
+    Incremental equivalent of ''.join(pieces).split(separator).
+
+    Only the tail of the pending split is re-checked for a separator
+    straddling piece boundaries, so each character is joined at most twice.
+    """
+    pending: List[str] = []
+    tail = ''
+    keep = len(separator) - 1
+    for piece in pieces:
+        window = tail + piece
+        if separator in window:
+            parts = ''.join(pending + [piece]).split(separator)
+            yield from parts[:-1]
+            pending = [parts[-1]]
+            window = parts[-1]
+        else:
+            pending.append(piece)
+        tail = window[-keep:] if keep else ''
+    yield ''.join(pending)
+
+
+def iter_hard_split(pieces: Iterable[str], target_size: int, overlap: int) -> Iterator[str]:
+    """Streaming equivalent of DocumentChunker._hard_split."""
+    step = target_size - overlap
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        pos = 0
+        while len(buffer) - pos >= target_size:
+            chunk = buffer[pos:pos + target_size]
+            if chunk.strip():
+                yield chunk
+            pos += step
+        buffer = buffer[pos:]
+    pos = 0
+    while pos < len(buffer):
+        chunk = buffer[pos:pos + target_size]
+        if chunk.strip():
+            yield chunk
+        pos += step
+
+
+class StreamingChunker(DocumentChunker):
+    """DocumentChunker that chunks text streams with bounded memory."""
+
+    def __init__(self, *args, read_size: int = 1 << 20, spool_bytes: int = 8 << 20, **kwargs):
+        """
+        Args:
+            *args, **kwargs: DocumentChunker settings
+            read_size: Characters read per file read
+            spool_bytes: Prefix buffered in memory before spilling to disk
+        """
+        super().__init__(*args, **kwargs)
+        self.read_size = read_size
+        self.spool_bytes = spool_bytes
+
+    def iter_chunks(self, source: TextSource, document_id: str) -> Iterator[DocumentChunk]:
+        """
+        Lazily chunk a document stream.
+
+        Args:
+            source: Text, text file object, or iterable of text pieces
+            document_id: Document UUID for metadata
+
+        Yields:
+            DocumentChunk objects, identical to chunk_text on the full text
+        """
+        pieces = iter_pieces(source, self.read_size)
+        spool, fits, seen, has_text = self._scan_prefix(pieces)
+
+        with spool:
+            if not has_text:
+                return
+            replay = chain(iter(lambda: spool.read(self.read_size), ''), pieces)
+            if fits:
+                texts: Iterable[str] = [''.join(replay)]
+            else:
+                separator = next((s for s in self.separators if s in seen), None)
+                if separator is None and self.token_counter is not None:
+                    texts = self._iter_token_split(replay)
+                elif separator is None:
+                    texts = iter_hard_split(replay, self.chunk_size * 4, self.chunk_overlap * 4)
+                else:
+                    texts = self._merge_splits(iter_splits(replay, separator), separator)
+
+            for i, chunk_text in enumerate(texts):
+                yield self._make_chunk(chunk_text, i, document_id)
+
+    def _scan_prefix(
+        self,
+        pieces: Iterator[str]
+    ) -> Tuple[SpooledTemporaryFile, bool, Set[str], bool]:
+        """
+        Spool pieces until the top separator is known to be present.
+
+        Stops once the first separator, some non-whitespace text and a
+        prefix larger than one chunk have been seen, or at end of stream.
+        Sizes are assumed monotone in prefix length (true for chars and,
+        in practice, for token counts); the prefix is re-measured only
+        each time it doubles, so scanning stays linear.
+
+        Returns:
+            (spool rewound to start, whole text fits one chunk,
+             separators seen, has non-whitespace text)
+        """
+        size, target, _ = self._sizing()
+        spool = SpooledTemporaryFile(max_size=self.spool_bytes, mode='w+', encoding='utf-8')
+        keep = max(len(s) for s in self.separators) - 1
+        seen: Set[str] = set()
+        has_text, oversized, tail = False, False, ''
+        head: List[str] = []
+        head_len, next_check = 0, 1
+
+        for piece in pieces:
+            spool.write(piece)
+            window = tail + piece
+            seen.update(s for s in self.separators if s not in seen and s in window)
+            tail = window[-keep:] if keep else ''
+            has_text = has_text or bool(piece.strip())
+            if not oversized:
+                head.append(piece)
+                head_len += len(piece)
+                if head_len >= next_check:
+                    oversized = size(''.join(head)) > target
+                    next_check = 2 * head_len
+                    if oversized:
+                        head = []
+            if oversized and has_text and self.separators[0] in seen:
+                break
+
+        fits = not oversized and size(''.join(head)) <= target
+        spool.seek(0)
+        return spool, fits, seen, has_text
@@ -0,0 +1,142 @@
+"""
+Shared fixtures for service unit tests.
+
+Provides an in-memory stand-in for the subset of the Supabase client
+used by the Phase 3 services (table queries and RPC calls).
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+import pytest
+
+
+class FakeQuery:
+    """Chainable query builder mirroring supabase-py's fluent API."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload: Any = None
+        self.filters: List[Callable[[dict], bool]] = []
+        self.options: Dict[str, Any] = {}
+        self._limit: Optional[int] = None
+
+    def select(self, columns: str = "*"):
+        self.op = "select"
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, **options):
+        self.op, self.payload, self.options = "upsert", payload, options
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def range(self, start, end):
+        self.options['range'] = (start, end)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def _matches(self, row):
+        return all(f(row) for f in self.filters)
+
+    def execute(self):
+        self.db.calls.append((self.table, self.op))
+        if self.db.fail_tables.get(self.table):
+            self.db.fail_tables[self.table] -= 1
+            raise RuntimeError(f"{self.table} unavailable")
+        rows = self.db.tables.setdefault(self.table, [])
+
+        if self.op in ("insert", "upsert"):
+            records = self.payload if isinstance(self.payload, list) else [self.payload]
+            key = self.options.get('on_conflict')
+            inserted = []
+            for record in records:
+                record = dict(record)
+                if 'id' not in record:
+                    self.db.next_id += 1
+                    record['id'] = f"{self.table}-{self.db.next_id}"
+                existing = [r for r in rows if key and r.get(key) == record.get(key)]
+                if existing:
+                    if not self.options.get('ignore_duplicates'):
+                        existing[0].update(record)
+                    continue
+                rows.append(record)
+                inserted.append(record)
+            return SimpleNamespace(data=inserted)
+
+        matched = [row for row in rows if self._matches(row)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+        elif self.op == "delete":
+            self.db.tables[self.table] = [r for r in rows if not self._matches(r)]
+        elif 'range' in self.options:
+            start, end = self.options['range']
+            matched = matched[start:end + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return SimpleNamespace(data=[dict(row) for row in matched])
+
+
+class FakeSupabase:
+    """In-memory Supabase client: tables are lists of dict rows."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = {}
+        self.calls: List[tuple] = []
+        self.rpc_handlers: Dict[str, Callable[[dict], Any]] = {}
+        self.fail_tables: Dict[str, int] = {}
+        self.next_id = 0
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict):
+        self.calls.append(("rpc", name))
+        handler = self.rpc_handlers.get(name, lambda p: None)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=handler(params)))
+
+    def count(self, table: str, op: Optional[str] = None) -> int:
+        """Number of recorded calls against a table ("rpc" for RPCs)."""
+        return sum(
+            1 for t, o in self.calls
+            if t == table and (op is None or o == op)
+        )
+
+
+@pytest.fixture(autouse=True)
+def fresh_shared_acl_cache(monkeypatch):
+    """Each test starts with an empty process-wide ACL cache."""
+    monkeypatch.setattr('utils.acl_cache._shared_cache', None)
+
+
+@pytest.fixture
+def fake_supabase():
+    """Fresh in-memory Supabase stand-in."""
+    return FakeSupabase()
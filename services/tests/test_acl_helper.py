@@ -0,0 +1,104 @@
+"""
+Tests for cached, chunked ACL checks (ACLHelper, ACLResolver, ACLCache).
+"""
+
+import pytest
+
+from services.rag_cache import RAGResultCache
+from utils.acl_helper import ACLHelper
+
+
+@pytest.fixture
+def acl_db(fake_supabase):
+    fake_supabase.tables['documents'] = [
+        {'id': 'own', 'created_by': 'u1', 'visibility': 'private', 'team_id': None},
+        {'id': 'pub', 'created_by': 'u2', 'visibility': 'public', 'team_id': None},
+        {'id': 'team', 'created_by': 'u2', 'visibility': 'team', 'team_id': 't1'},
+        {'id': 'other-team', 'created_by': 'u2', 'visibility': 'team', 'team_id': 't9'},
+        {'id': 'granted', 'created_by': 'u2', 'visibility': 'private', 'team_id': None},
+        {'id': 'team-granted', 'created_by': 'u2', 'visibility': 'org', 'team_id': None},
+        {'id': 'secret', 'created_by': 'u2', 'visibility': 'private', 'team_id': None},
+    ]
+    fake_supabase.tables['team_members'] = [{'team_id': 't1', 'user_id': 'u1'}]
+    fake_supabase.tables['document_permissions'] = [
+        {'document_id': 'granted', 'user_id': 'u1', 'team_id': None},
+        {'document_id': 'team-granted', 'user_id': None, 'team_id': 't1'},
+    ]
+    return fake_supabase
+
+
+@pytest.fixture
+def acl(acl_db):
+    return ACLHelper(acl_db, rag_cache=RAGResultCache(), in_chunk_size=3)
+
+
+@pytest.mark.asyncio
+async def test_access_rules_and_cache(acl, acl_db):
+    """Owner, public, team, grants allowed; the rest denied, then cached"""
+    ids = ['own', 'pub', 'team', 'other-team', 'granted', 'team-granted', 'secret', 'missing', 'pub']
+    allowed = await acl.filter_documents_by_permission('u1', ids)
+    assert allowed == ['own', 'pub', 'team', 'granted', 'team-granted']
+    assert acl_db.count('documents') == 3  # 8 distinct ids, 3 per in_()
+
+    acl_db.calls.clear()
+    assert await acl.can_access_many('u1', ['secret', 'team']) == {'secret': False, 'team': True}
+    assert await acl.get_user_teams('u1') == ['t1']
+    assert acl_db.calls == []
+    assert acl.acl_cache.stats()['hits'] == 2
+
+
+@pytest.mark.asyncio
+async def test_owned_and_public_skip_principal_queries(acl, acl_db):
+    """Teams and grants are only loaded when a document needs them"""
+    assert await acl.filter_documents_by_permission('u1', ['own', 'pub']) == ['own', 'pub']
+    assert acl_db.count('team_members') == 0 and acl_db.count('document_permissions') == 0
+
+
+@pytest.mark.asyncio
+async def test_grant_and_revoke_invalidate_cached_decisions(acl, acl_db):
+    """Grants made through the helper take effect immediately"""
+    assert not await acl.user_can_access_document('u1', 'secret')
+
+    await acl.grant_permission('secret', 'u1', granted_by='u2')
+    assert await acl.user_can_access_document('u1', 'secret')
+
+    await acl.revoke_permission('secret', 'u1')
+    assert not await acl.user_can_access_document('u1', 'secret')
+
+
+@pytest.mark.asyncio
+async def test_revoke_through_one_helper_reaches_another(acl, acl_db):
+    """Helpers share the process-wide cache (e.g. the one inside RAGService)"""
+    reader = ACLHelper(acl_db, rag_cache=RAGResultCache())
+    await acl.grant_permission('secret', 'u1', granted_by='u2')
+    assert await reader.user_can_access_document('u1', 'secret')
+
+    await acl.revoke_permission('secret', 'u1')
+    assert not await reader.user_can_access_document('u1', 'secret')
+
+
+@pytest.mark.asyncio
+async def test_rls_filtered_rows_are_cached_per_user(fake_supabase):
+    """Answers that depend on the caller's RLS view are not shared"""
+    fake_supabase.tables['documents'] = [{'id': 'd1'}]
+    acl = ACLHelper(fake_supabase, rag_cache=RAGResultCache())
+    assert await acl.can_access_many('u1', ['d1']) == {'d1': True}
+
+    fake_supabase.tables['documents'] = []
+    assert await acl.can_access_many('u2', ['d1']) == {'d1': False}
+
+
+@pytest.mark.asyncio
+async def test_query_failure_denies_without_caching(acl, acl_db):
+    """Errors fail closed and are retried on the next check"""
+    acl_db.fail_tables['documents'] = 1
+    assert await acl.can_access_many('u1', ['own', 'pub']) == {'own': False, 'pub': False}
+    assert await acl.can_access_many('u1', ['own', 'pub']) == {'own': True, 'pub': True}
+
+
+@pytest.mark.asyncio
+async def test_rows_without_acl_columns_trust_rls(fake_supabase):
+    """A client that returns bare ids (RLS already applied) is trusted"""
+    fake_supabase.tables['documents'] = [{'id': 'd1'}]
+    acl = ACLHelper(fake_supabase, rag_cache=RAGResultCache())
+    assert await acl.filter_documents_by_permission('u1', ['d1', 'd2']) == ['d1']
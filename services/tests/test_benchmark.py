@@ -0,0 +1,78 @@
+"""
+Tests for the offline benchmark suite (stand-ins, benchmarks, reports).
+"""
+
+import numpy as np
+import pytest
+
+from services.benchmark import (
+    HashingEmbedder,
+    InMemorySupabase,
+    ServiceStack,
+    SyntheticCorpus,
+    bench_ingest,
+    bench_rag,
+    bench_retrieval,
+    compare_results
+)
+from services.document_chunker import DocumentChunker
+
+
+def test_in_memory_supabase_filters_and_exact_search():
+    db = InMemorySupabase()
+    db.table('documents').insert([{'id': 'a', 'team_id': 't1'}, {'id': 'b', 'team_id': 't2'}]).execute()
+    assert [r['id'] for r in db.table('documents').select('id').eq('team_id', 't2').execute().data] == ['b']
+    assert len(db.table('documents').select('*').in_('id', ['a', 'b', 'c']).execute().data) == 2
+
+    db.table('document_chunks').insert([
+        {'id': 'c1', 'document_id': 'a', 'chunk_text': 'x', 'chunk_index': 0, 'embedding': [1.0, 0.0]},
+        {'id': 'c2', 'document_id': 'b', 'chunk_text': 'y', 'chunk_index': 0, 'embedding': [0.0, 1.0]}
+    ]).execute()
+    rows = db.rpc('match_documents', {
+        'query_embedding': [0.9, 0.1], 'match_threshold': 0.0, 'match_count': 1
+    }).execute().data
+    assert [r['id'] for r in rows] == ['c1']
+
+
+def test_hashing_embedder_is_deterministic():
+    a, b = HashingEmbedder(32), HashingEmbedder(32)
+    first = a.embed_sync(['alpha beta', 'gamma', ''])
+    assert np.allclose(first, b.embed_sync(['alpha beta', 'gamma', '']))
+    assert np.isclose(np.linalg.norm(first[0]), 1.0) and not first[2].any()
+    assert first[0] @ a.embed_sync(['alpha'])[0] > first[1] @ a.embed_sync(['alpha'])[0]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_benchmarks_smoke():
+    chunker = DocumentChunker(chunk_size=64, chunk_overlap=8)
+    corpus = SyntheticCorpus(seed=1, vocabulary=500, topic_words=50)
+    documents = corpus.documents_for_chunks(40, chunker, paragraphs=3)
+    stack = ServiceStack.build(chunker, dimensions=256)
+
+    ingest = await bench_ingest(stack, documents, reingest_fraction=0.5)
+    assert ingest['failed'] == 0 and ingest['chunks'] > 0
+    assert ingest['reingest']['embedded_texts'] == 0
+    assert ingest['reingest']['cache_hit_rate'] == 1.0
+
+    rag = await bench_rag(stack, corpus.queries(documents, 5), count=20, k=5)
+    assert rag['query']['p99_ms'] >= rag['query']['p50_ms'] > 0
+    assert rag['result_cache_hit_rate'] > 0
+    assert rag['recall_at_5'] == 1.0  # untrained index is exact
+
+
+def test_retrieval_benchmark_recall():
+    corpus = SyntheticCorpus(seed=2)
+    vectors = corpus.vectors(3000, 16, clusters=8)
+    result = bench_retrieval(vectors, corpus.vector_queries(vectors, 10), k=5)
+    assert result['ivf']['nprobe_8']['recall_at_5'] == 1.0
+    assert result['quantized']['int8']['recall_at_5'] > 0.8
+
+
+def test_compare_results_flags_only_regressed_metrics():
+    baseline = {'tiers': [{'chunks': 1000, 'ingest': {'chunks_per_sec': 100.0, 'documents': 10},
+                           'rag': {'query': {'p50_ms': 2.0}, 'recall_at_10': 0.9}}]}
+    current = {'tiers': [{'chunks': 1000, 'ingest': {'chunks_per_sec': 70.0, 'documents': 99},
+                          'rag': {'query': {'p50_ms': 2.2}, 'recall_at_10': 0.95}}]}
+    regressions = compare_results(baseline, current, tolerance=0.2)
+    assert len(regressions) == 1 and 'ingest.chunks_per_sec' in regressions[0]
+    assert compare_results(baseline, current, tolerance=0.5) == []
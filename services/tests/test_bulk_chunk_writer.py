@@ -0,0 +1,75 @@
+"""
+Tests for BulkChunkWriter and cross-document writes in the ingestion pipeline.
+"""
+
+import json
+import pytest
+from services.bulk_chunk_writer import BulkChunkWriter
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.ingestion_pipeline import IngestionPipeline
+from services.rag_cache import RAGResultCache
+
+
+def records(count, dims=64, doc='doc-1'):
+    return [
+        {'document_id': doc, 'chunk_index': i, 'chunk_text': f"chunk {i}",
+         'embedding': [0.1 * (i + 1)] * dims}
+        for i in range(count)
+    ]
+
+
+def test_pages_are_bounded_by_bytes(fake_supabase):
+    writer = BulkChunkWriter(fake_supabase, max_page_bytes=2000)
+    rows = writer.prepare(records(20))
+    pages = list(writer.pages(rows))
+
+    assert len(pages) > 1
+    assert all(len(json.dumps(page, separators=(',', ':'))) <= 2000 for page, _ in pages)
+    assert sum(len(page) for page, _ in pages) == 20
+
+
+def test_embeddings_are_serialized_compactly(fake_supabase):
+    row = BulkChunkWriter.prepare([{'embedding': [0.1, 0.2]}])[0]
+    assert row['embedding'] == '[0.1,0.2]'
+    assert row['id']
+
+
+def test_failed_page_is_retried_without_duplicates(fake_supabase):
+    fake_supabase.fail_tables['document_chunks'] = 1
+    writer = BulkChunkWriter(fake_supabase, retry_backoff=0)
+
+    rows = writer.write(records(5))
+    writer.write(rows)  # replaying the same rows is a no-op upsert
+
+    assert writer.retries == 1
+    assert len(fake_supabase.tables['document_chunks']) == 5
+    assert {r['id'] for r in fake_supabase.tables['document_chunks']} == {r['id'] for r in rows}
+
+
+def test_oversized_row_gets_its_own_page(fake_supabase):
+    writer = BulkChunkWriter(fake_supabase, max_page_bytes=100)
+    pages = list(writer.pages(writer.prepare(records(3, dims=64))))
+    assert [len(page) for page, _ in pages] == [1, 1, 1]
+
+
+class Embeddings:
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        return [[1.0, float(len(t))] for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_small_documents_share_write_requests(fake_supabase):
+    service = DocumentIngestionService(
+        fake_supabase,
+        chunker=DocumentChunker(chunk_size=50),
+        embedding_service=Embeddings(),
+        rag_cache=RAGResultCache()
+    )
+    docs = [{'title': f"note {i}", 'content': f"short note {i}", 'created_by': 'u'} for i in range(20)]
+
+    summary = await IngestionPipeline(service, write_workers=1).run(docs)
+
+    assert summary['successful'] == 20
+    assert len(fake_supabase.tables['document_chunks']) == 20
+    assert fake_supabase.count('document_chunks', 'upsert') < 20
@@ -0,0 +1,174 @@
+"""
+Tests for near-duplicate chunk handling at ingest (ChunkDeduplicator,
+NearDuplicateIndex).
+"""
+
+import json
+import numpy as np
+import pytest
+from services.chunk_dedup import ChunkDeduplicator
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.local_vector_index import LocalVectorIndex
+from services.near_duplicate_index import NearDuplicateIndex
+from services.rag_cache import RAGResultCache
+
+
+class EmbeddingRecorder:
+    """Fake embedding service recording every embedded text."""
+
+    def __init__(self):
+        self.texts = []
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        self.texts.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def paragraph(topic, edit=''):
+    return f"{topic} {edit} " + ' '.join(f"{topic}{i}" for i in range(40))
+
+
+def make_service(fake_supabase, policy='skip', index=None, vector_index=None):
+    embeddings = EmbeddingRecorder()
+    service = DocumentIngestionService(
+        fake_supabase,
+        vector_index=vector_index,
+        chunker=DocumentChunker(chunk_size=80, chunk_overlap=0),
+        embedding_service=embeddings,
+        rag_cache=RAGResultCache(),
+        deduplicator=ChunkDeduplicator(fake_supabase, index=index, policy=policy)
+    )
+    return service, embeddings
+
+
+def chunks_of(fake_supabase, document_id):
+    return [r for r in fake_supabase.tables['document_chunks'] if r['document_id'] == document_id]
+
+
+ORIGINAL = '\n\n'.join([paragraph('alpha'), paragraph('beta')])
+COPY = '\n\n'.join([paragraph('alpha', edit='(copy)'), paragraph('beta'), paragraph('gamma')])
+
+
+@pytest.mark.asyncio
+async def test_skip_policy_embeds_only_new_chunks(fake_supabase):
+    service, embeddings = make_service(fake_supabase)
+    await service.ingest_document('wiki', ORIGINAL, 'user-1')
+    embeddings.texts.clear()
+
+    stats = await service.ingest_document('slack export', COPY, 'user-1')
+
+    assert len(embeddings.texts) == 1 and embeddings.texts[0].startswith('gamma')
+    assert stats['dedup'] == {'checked': 3, 'duplicates': 2, 'skipped': 2, 'linked': 0, 'replaced': 0}
+    assert stats['embeddings_generated'] == 1
+    assert len(chunks_of(fake_supabase, stats['document_id'])) == 1
+
+
+@pytest.mark.asyncio
+async def test_link_policy_reuses_existing_embeddings(fake_supabase):
+    service, embeddings = make_service(fake_supabase, policy='link')
+    first = await service.ingest_document('wiki', ORIGINAL, 'user-1')
+    originals = {r['chunk_text'][:5]: r for r in chunks_of(fake_supabase, first['document_id'])}
+    embeddings.texts.clear()
+
+    stats = await service.ingest_document('slack export', COPY, 'user-1')
+
+    assert len(embeddings.texts) == 1
+    assert stats['dedup']['linked'] == 2
+    linked = [r for r in chunks_of(fake_supabase, stats['document_id']) if 'duplicate_of' in r['metadata']]
+    assert len(linked) == 2
+    for row in linked:
+        source = originals[row['chunk_text'][:5]]
+        assert row['metadata']['duplicate_of'] == source['id']
+        assert np.allclose(np.array(json.loads(row['embedding'])), np.array(json.loads(source['embedding'])))
+
+
+@pytest.mark.asyncio
+async def test_replace_policy_deletes_superseded_chunks(fake_supabase):
+    service, embeddings = make_service(fake_supabase, policy='replace', vector_index=LocalVectorIndex())
+    first = await service.ingest_document('wiki', ORIGINAL, 'user-1')
+
+    stats = await service.ingest_document('slack export', COPY, 'user-1')
+
+    assert stats['dedup']['replaced'] == 2
+    assert chunks_of(fake_supabase, first['document_id']) == []
+    assert len(chunks_of(fake_supabase, stats['document_id'])) == 3
+    assert len(service.deduplicator.index) == 3
+    assert len(service.vector_index) == 3
+
+
+@pytest.mark.asyncio
+async def test_replace_policy_keeps_chunks_of_other_scopes(fake_supabase):
+    """A copy in a differently shared document never deletes the original"""
+    service, _ = make_service(fake_supabase, policy='replace')
+    shared = await service.ingest_document('wiki', ORIGINAL, 'user-1', team_id='t1', visibility='team')
+
+    stats = await service.ingest_document('notes', COPY, 'user-2')
+
+    assert stats['dedup']['duplicates'] == 2 and stats['dedup']['replaced'] == 0
+    assert len(chunks_of(fake_supabase, shared['document_id'])) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_copies_in_flight_are_detected(fake_supabase):
+    """Copies inside one pipeline run are caught before either is written"""
+    service, embeddings = make_service(fake_supabase)
+    docs = [{'title': f"copy {i}", 'content': ORIGINAL, 'created_by': 'user-1'} for i in range(3)]
+
+    summary = await service.ingest_documents_batch(docs)
+
+    assert summary['successful'] == 3
+    assert len(embeddings.texts) == 2
+    assert summary['dedup']['skipped'] == 4
+    assert summary['total_embeddings'] == 2
+
+
+@pytest.mark.asyncio
+async def test_skip_policy_keeps_copies_of_other_owners(fake_supabase):
+    """Each owner keeps their own copy, whether written or still in flight"""
+    service, embeddings = make_service(fake_supabase)
+    await service.ingest_document('wiki', ORIGINAL, 'user-1')
+
+    stats = await service.ingest_document('notes', COPY, 'user-2')
+    assert stats['dedup']['duplicates'] == 2 and stats['dedup']['skipped'] == 0
+    assert len(chunks_of(fake_supabase, stats['document_id'])) == 3
+
+    embeddings.texts.clear()
+    docs = [{'title': 'copy', 'content': ORIGINAL, 'created_by': owner} for owner in ('user-3', 'user-4')]
+    summary = await service.ingest_documents_batch(docs)
+    assert summary['dedup']['skipped'] == 0 and len(embeddings.texts) == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_write_releases_reservations(fake_supabase):
+    service, embeddings = make_service(fake_supabase)
+    service.bulk_writer.retry_backoff = 0
+    fake_supabase.fail_tables['document_chunks'] = service.bulk_writer.max_retries + 1
+    with pytest.raises(RuntimeError):
+        await service.ingest_document('wiki', ORIGINAL, 'user-1')
+
+    stats = await service.ingest_document('wiki', ORIGINAL, 'user-1')
+
+    assert stats['dedup']['skipped'] == 0 and stats['embeddings_generated'] == 2
+
+
+def test_index_log_is_shared_and_compacted(tmp_path):
+    path = str(tmp_path / 'lsh.jsonl')
+    writer, reader = NearDuplicateIndex(path), NearDuplicateIndex(path)
+    signatures = writer.hasher.signatures([paragraph('alpha'), paragraph('beta')])
+    writer.add([('c1', 'd1', signatures[0]), ('c2', 'd2', signatures[1])])
+
+    assert reader.refresh() == 3  # params header + two chunks
+    assert reader.query(signatures[0])[:2] == ('c1', 'd1')
+
+    reader.remove_documents(['d1'])
+    writer.refresh()
+    assert writer.query(signatures[0]) is None and len(writer) == 1
+
+    writer.compact()
+    reopened = NearDuplicateIndex(path)
+    assert len(reopened) == 1 and reopened.query(signatures[1])[0] == 'c2'
+    reader.refresh()
+    assert len(reader) == 1
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path, seed=2)
@@ -0,0 +1,73 @@
+"""
+Tests for ContextBuilder token budgeting.
+"""
+
+from services.context_builder import ContextBuilder
+from services.rag_service import RAGResult
+from utils.tokenizer import CachedTokenCounter, Tokenizer
+
+
+class WordTokenizer(Tokenizer):
+    def __init__(self):
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+def result(text, title='Doc'):
+    return RAGResult(
+        id=text, document_id=title, document_title=title,
+        chunk_text=text, chunk_index=0, similarity_score=0.9, metadata={}
+    )
+
+
+def test_budget_counts_headers_and_skips_oversized_results():
+    builder = ContextBuilder(max_tokens=12, token_counter=WordTokenizer())
+    results = [
+        result('one two three'),             # 3 + header 3
+        result(' '.join(['x'] * 20)),        # does not fit
+        result('four five'),                 # 2 + header 3
+    ]
+    context = builder.build_context('q', results)
+
+    assert [s['chunk_index'] for s in context.sources] == [0, 0]
+    assert context.token_count == 11
+    assert context.truncated
+    assert '[Source 2: Doc]\nfour five' in context.context_text
+
+
+def test_repeated_results_are_not_retokenized():
+    backend = WordTokenizer()
+    builder = ContextBuilder(max_tokens=100, token_counter=CachedTokenCounter(backend))
+    results = [result('alpha beta'), result('gamma')]
+
+    builder.build_context('q', results)
+    calls = backend.calls
+    builder.build_context('q', results)
+    assert backend.calls == calls
+
+
+def test_diversify_collapses_and_dedupes():
+    """Adjacent chunks are merged and a copied passage is not paid for twice"""
+    builder = ContextBuilder(max_tokens=100, token_counter=WordTokenizer(), diversify=True)
+    first = RAGResult(
+        id='c0', document_id='d', document_title='Doc', chunk_text='alpha beta gamma delta',
+        chunk_index=0, similarity_score=0.9, metadata={}
+    )
+    second = RAGResult(
+        id='c1', document_id='d', document_title='Doc', chunk_text='gamma delta epsilon',
+        chunk_index=1, similarity_score=0.8, metadata={}
+    )
+    copy = RAGResult(
+        id='x', document_id='e', document_title='Copy',
+        chunk_text='alpha beta gamma delta epsilon gamma delta',
+        chunk_index=7, similarity_score=0.7, metadata={}
+    )
+
+    context = builder.build_context('q', [first, second, copy])
+
+    assert [s['id'] for s in context.sources] == ['d']
+    assert 'alpha beta gamma delta\ngamma delta epsilon' in context.context_text
+    assert not context.truncated
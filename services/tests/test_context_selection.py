@@ -0,0 +1,103 @@
+"""
+Tests for context selection
+
+Adjacent-chunk collapsing, MMR with near-duplicate removal, and packing
+by gain per token.
+"""
+
+import pytest
+from services.context_selection import (
+    collapse_adjacent,
+    merge_overlap,
+    result_vectors,
+    select_diverse,
+)
+from services.rag_results import RAGResult
+
+
+def result(text, doc='d1', index=0, score=0.9, embedding=None):
+    return RAGResult(
+        id=f"{doc}-{index}", document_id=doc, document_title=doc,
+        chunk_text=text, chunk_index=index, similarity_score=score,
+        metadata={}, embedding=embedding
+    )
+
+
+OVERLAP = "shared sentence that both chunks contain because of overlap. "
+
+
+def test_merge_overlap_drops_shared_text():
+    assert merge_overlap("intro. " + OVERLAP, OVERLAP + "outro.") == "intro. " + OVERLAP + "outro."
+    assert merge_overlap("short a", "short b") == "short a\nshort b"
+
+
+def test_collapse_adjacent_chunks():
+    """Consecutive chunks merge at the best member's rank; others stay"""
+    results = [
+        result(OVERLAP + "more", index=4, score=0.95),
+        result("elsewhere", doc='d2', index=4, score=0.9),
+        result("A " + OVERLAP, index=3, score=0.8),
+        result("far away", index=9, score=0.7),
+    ]
+
+    collapsed = collapse_adjacent(results)
+
+    assert [r.id for r in collapsed] == ["d1-4", "d2-4", "d1-9"]
+    assert collapsed[0].chunk_text == "A " + OVERLAP + "more"
+    assert collapsed[0].chunk_index == 3
+    assert collapsed[0].similarity_score == 0.95
+    assert collapsed[0].metadata == {'chunk_indexes': [3, 4]}
+
+
+def test_result_vectors_prefer_embeddings():
+    with_embeddings = [result("x", embedding=[3.0, 4.0]), result("y", index=1, embedding=[1.0, 0.0])]
+    assert result_vectors(with_embeddings).ravel().tolist() == pytest.approx([0.6, 0.8, 1.0, 0.0])
+    pgvector_text = [result("x", embedding='[3,4]'), result("y", index=1, embedding='[1,0]')]
+    assert result_vectors(pgvector_text).ravel().tolist() == pytest.approx([0.6, 0.8, 1.0, 0.0])
+
+    text = result_vectors([result("the same words"), result("The same words!", index=1)])
+    assert text.shape == (2, 2048)
+    assert float(text[0] @ text[1]) == pytest.approx(1.0)
+
+
+def test_near_duplicates_are_dropped():
+    """A duplicate never displaces a distinct result, even with budget left"""
+    results = [
+        result("a", index=0, score=0.9, embedding=[1.0, 0.0]),
+        result("a'", index=2, score=0.89, embedding=[0.99, 0.01]),
+        result("b", index=4, score=0.7, embedding=[0.0, 1.0]),
+    ]
+
+    selected, truncated = select_diverse(results, [10, 10, 10], budget=100)
+
+    assert selected == [0, 2]
+    assert not truncated
+
+
+def test_packs_by_gain_per_token():
+    """Two cheap relevant results beat one expensive one under a tight budget"""
+    results = [
+        result("big", index=0, score=0.9, embedding=[1.0, 0.0, 0.0]),
+        result("small one", index=2, score=0.8, embedding=[0.0, 1.0, 0.0]),
+        result("small two", index=4, score=0.8, embedding=[0.0, 0.0, 1.0]),
+    ]
+
+    selected, truncated = select_diverse(results, [90, 40, 40], budget=100)
+
+    assert selected == [1, 2]
+    assert truncated
+    assert select_diverse([], [], budget=100) == ([], False)
+
+
+def test_redundant_candidates_prefer_the_cheapest():
+    """Negative MMR gain must not favour costly chunks"""
+    redundant = [0.9, 0.19 ** 0.5]
+    results = [
+        result("a", index=0, score=0.9, embedding=[1.0, 0.0]),
+        result("a long", index=2, score=0.2, embedding=redundant),
+        result("a short", index=4, score=0.2, embedding=redundant),
+    ]
+
+    selected, _ = select_diverse(results, [10, 40, 10], budget=55)
+
+    assert selected == [0, 2]
@@ -0,0 +1,130 @@
+"""
+Tests for resumable directory ingestion (DirectoryIngestor, IngestManifest).
+"""
+
+import os
+
+import pytest
+
+from services.directory_ingestion import DirectoryIngestor
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.ingest_manifest import IngestManifest, ManifestEntry
+from services.rag_cache import RAGResultCache
+
+
+class RecordingEmbeddings:
+    """Deterministic embeddings; fails on 'BAD' like a rejecting provider."""
+
+    def __init__(self):
+        self.embedded = []
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        if any('BAD' in t for t in texts):
+            raise RuntimeError("provider rejected input")
+        self.embedded.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def paragraphs(name, count=3):
+    return '\n\n'.join(f"{name} paragraph {i} " + 'text ' * 8 for i in range(count))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for i in range(5):
+        folder = tmp_path / 'docs' / f"part{i % 2}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"note{i}.md").write_text(paragraphs(f"note{i}"))
+    (tmp_path / 'docs' / 'image.png').write_bytes(b'\x89PNG')
+    return tmp_path
+
+
+@pytest.fixture
+def make_ingestor(fake_supabase, corpus):
+    fake_supabase.rpc_handlers['reindex_document_chunks'] = lambda params: None
+    embeddings = RecordingEmbeddings()
+    service = DocumentIngestionService(
+        fake_supabase,
+        chunker=DocumentChunker(chunk_size=12, chunk_overlap=0),
+        embedding_service=embeddings,
+        rag_cache=RAGResultCache()
+    )
+
+    def make(created_by='user-1', manifest_name='manifest.jsonl'):
+        manifest = IngestManifest(str(corpus / manifest_name))
+        return DirectoryIngestor(service, manifest, created_by, batch_size=2, read_concurrency=3)
+    make.embeddings = embeddings
+    return make
+
+
+@pytest.mark.asyncio
+async def test_rerun_skips_unchanged_and_syncs_edits(make_ingestor, corpus, fake_supabase):
+    first = await make_ingestor().run([str(corpus / 'docs')])
+
+    assert first['ingested'] == 5 and first['failed'] == 0 and first['chunks'] == 15
+    documents = fake_supabase.tables['documents']
+    assert sorted(os.path.basename(d['external_key']) for d in documents) == [f"note{i}.md" for i in range(5)]
+
+    edited, touched = corpus / 'docs' / 'part0' / 'note0.md', corpus / 'docs' / 'part1' / 'note1.md'
+    edited.write_text(paragraphs('note0') + '\n\nA new closing paragraph ' + 'text ' * 8)
+    os.utime(touched, ns=(1, 1))
+    make_ingestor.embeddings.embedded.clear()
+
+    second = await make_ingestor().run([str(corpus / 'docs')])
+
+    assert (second['unchanged'], second['updated'], second['ingested']) == (4, 1, 0)
+    assert len(fake_supabase.tables['documents']) == 5
+    assert make_ingestor.embeddings.embedded == ['A new closing paragraph ' + 'text ' * 8]
+    assert IngestManifest(str(corpus / 'manifest.jsonl')).get(str(touched)).mtime_ns == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_files_are_not_checkpointed(make_ingestor, corpus):
+    bad = corpus / 'docs' / 'part0' / 'bad.md'
+    bad.write_text(paragraphs('BAD'))
+
+    first = await make_ingestor().run([str(corpus / 'docs' / '**' / '*.md')])
+
+    assert first['ingested'] == 5 and first['failed'] == 1
+    assert first['errors'][0]['path'] == str(bad)
+
+    bad.write_text(paragraphs('fixed'))
+    second = await make_ingestor().run([str(corpus / 'docs')])
+
+    assert (second['unchanged'], second['ingested'], second['failed']) == (5, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_keys_are_absolute_and_owner_scoped(make_ingestor, corpus, fake_supabase, monkeypatch):
+    """Two users ingesting the same relative layout never share documents"""
+    monkeypatch.chdir(corpus)
+    await make_ingestor().run(['docs'])
+    first = {d['id']: dict(d) for d in fake_supabase.tables['documents']}
+
+    (corpus / 'docs' / 'part0' / 'note0.md').write_text(paragraphs('other user'))
+    report = await make_ingestor('user-2', 'other.jsonl').run(['docs'])
+
+    assert report['ingested'] == 5 and report['failed'] == 0
+    keys = {d['external_key'] for d in fake_supabase.tables['documents']}
+    assert len(keys) == 10
+    assert all(os.path.isabs(key.split(':', 1)[1]) for key in keys)
+    assert all(d == first[d['id']] for d in fake_supabase.tables['documents'] if d['id'] in first)
+
+
+def test_manifest_ignores_torn_line_and_compacts(tmp_path):
+    path = str(tmp_path / 'manifest.jsonl')
+    with IngestManifest(path) as manifest:
+        manifest.record([ManifestEntry('a.md', 1, 10, 'h1', 'doc-1'), ManifestEntry('b.md', 1, 10, 'h2', 'doc-2')])
+        manifest.record([ManifestEntry('a.md', 2, 12, 'h3', 'doc-1')])
+    with open(path, 'a') as f:
+        f.write('{"path": "c.md", "mtime')  # interrupted mid-write
+
+    manifest = IngestManifest(path)
+    assert len(manifest) == 2 and manifest.is_current('a.md', 2, 12)
+    manifest.record([ManifestEntry('c.md', 3, 5, 'h4', 'doc-3')])
+    manifest.compact()
+
+    reloaded = IngestManifest(path)
+    assert sorted(reloaded.entries) == ['a.md', 'b.md', 'c.md']
+    assert len(open(path).read().splitlines()) == 3
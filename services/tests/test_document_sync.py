@@ -0,0 +1,159 @@
+"""
+Tests for incremental re-ingestion (DocumentSync).
+"""
+
+import pytest
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.document_sync import DocumentSync, diff_chunks
+from services.embedding_cache import text_hash
+from services.embedding_store import EmbeddingSegmentStore
+from services.local_vector_index import LocalVectorIndex
+from services.rag_cache import RAGResultCache
+from services.segment_vector_backend import SegmentVectorBackend
+
+
+class RecordingEmbeddings:
+    """Deterministic embeddings; records every text sent for embedding."""
+
+    def __init__(self):
+        self.embedded = []
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        self.embedded.extend(texts)
+        return [[float(len(t)), 1.0, float(sum(map(ord, t)) % 7)] for t in texts]
+
+
+def paragraphs(*names):
+    return '\n\n'.join(f"Paragraph {name} " + 'text ' * 8 for name in names)
+
+
+@pytest.fixture
+def fake_db(fake_supabase):
+    def reindex(params):
+        by_id = {r['id']: r for r in fake_supabase.tables['document_chunks'] if r['document_id'] == params['doc_id']}
+        for chunk_id, index in zip(params['chunk_ids'], params['chunk_indexes']):
+            by_id[chunk_id]['chunk_index'] = index
+
+    fake_supabase.rpc_handlers['reindex_document_chunks'] = reindex
+    return fake_supabase
+
+
+@pytest.fixture
+def sync(fake_db):
+    ingestion = DocumentIngestionService(
+        fake_db,
+        chunker=DocumentChunker(chunk_size=12, chunk_overlap=0),
+        embedding_service=RecordingEmbeddings(),
+        vector_index=LocalVectorIndex(),
+        rag_cache=RAGResultCache()
+    )
+    return DocumentSync(ingestion)
+
+
+async def _sync(sync, content, **kwargs):
+    return await sync.sync('wiki/policy', 'Policy', content, 'user-1', visibility='team', **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_first_sync_creates_document(sync, fake_db):
+    stats = await _sync(sync, paragraphs('a', 'b', 'c'))
+
+    assert stats['created'] and stats['chunks_added'] == 3
+    assert fake_db.tables['documents'][0]['external_key'] == 'wiki/policy'
+    assert all(r['content_hash'] for r in fake_db.tables['document_chunks'])
+
+
+@pytest.mark.asyncio
+async def test_resync_embeds_only_changed_chunks(sync, fake_db):
+    await _sync(sync, paragraphs('a', 'b', 'c'))
+    before = {r['chunk_index']: r['id'] for r in fake_db.tables['document_chunks']}
+    embeddings = sync.ingestion.embedding_service
+    embeddings.embedded.clear()
+
+    stats = await _sync(sync, paragraphs('a', 'B2', 'c'))
+
+    assert (stats['chunks_unchanged'], stats['chunks_added'], stats['chunks_deleted']) == (2, 1, 1)
+    assert embeddings.embedded == [paragraphs('B2')]
+    rows = {r['chunk_index']: r['id'] for r in fake_db.tables['document_chunks']}
+    assert rows[0] == before[0] and rows[2] == before[2] and rows[1] != before[1]
+    assert len(fake_db.tables['documents']) == 1
+    assert len(sync.ingestion.vector_index) == 3
+
+
+@pytest.mark.asyncio
+async def test_unchanged_resync_writes_no_chunks(sync, fake_db):
+    await _sync(sync, paragraphs('a', 'b'))
+    fake_db.calls.clear()
+
+    stats = await _sync(sync, paragraphs('a', 'b'))
+
+    assert stats['chunks_unchanged'] == 2 and stats['embeddings_generated'] == 0
+    assert fake_db.count('document_chunks', 'upsert') == 0
+    assert fake_db.count('document_chunks', 'delete') == 0
+    assert fake_db.count('rpc') == 0
+
+
+@pytest.mark.asyncio
+async def test_inserted_paragraph_moves_following_chunks(sync, fake_db):
+    await _sync(sync, paragraphs('a', 'b'))
+    stats = await _sync(sync, paragraphs('new', 'a', 'b'))
+
+    assert (stats['chunks_moved'], stats['chunks_added'], stats['chunks_deleted']) == (2, 1, 0)
+    texts = sorted(fake_db.tables['document_chunks'], key=lambda r: r['chunk_index'])
+    assert [r['chunk_text'] for r in texts] == [paragraphs(n) for n in ('new', 'a', 'b')]
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_to_their_owner(sync, fake_db):
+    """Another user's sync of the same key never touches the first document"""
+    first = await _sync(sync, paragraphs('a', 'b'))
+    other = await sync.sync('wiki/policy', 'Hijack', paragraphs('x'), 'user-2', visibility='public')
+
+    assert other['created'] and other['document_id'] != first['document_id']
+    original = next(d for d in fake_db.tables['documents'] if d['id'] == first['document_id'])
+    assert (original['title'], original['created_by'], original['visibility']) == ('Policy', 'user-1', 'team')
+    assert original['content'] == paragraphs('a', 'b')
+
+
+@pytest.mark.asyncio
+async def test_resync_keeps_visibility_and_team(sync, fake_db):
+    await _sync(sync, paragraphs('a'))
+    await sync.sync('wiki/policy', 'Policy v2', paragraphs('a'), 'user-1', visibility='public', team_id='t9')
+
+    stored = fake_db.tables['documents'][0]
+    assert (stored['title'], stored['visibility'], stored['team_id']) == ('Policy v2', 'team', None)
+
+
+def test_diff_prefers_rows_at_same_position():
+    chunker = DocumentChunker(chunk_size=12, chunk_overlap=0)
+    chunks = chunker.chunk_text(paragraphs('x', 'x'), 'doc')
+    existing = [
+        {'id': 'r0', 'chunk_index': 0, 'content_hash': 'stale'},
+        {'id': 'r1', 'chunk_index': 1, 'content_hash': None},
+    ]
+    existing[1]['content_hash'] = text_hash(chunks[1].text)
+
+    diff = diff_chunks(chunks, existing)
+    assert diff.unchanged == ['r1'] and diff.deleted == ['r0'] and len(diff.added) == 1
+
+
+@pytest.mark.asyncio
+async def test_resync_updates_segment_store_by_chunk_id(fake_db, tmp_path):
+    """Kept chunks survive resync and compaction; moved ones get new indexes"""
+    store = EmbeddingSegmentStore(str(tmp_path / "store"))
+    sync = DocumentSync(DocumentIngestionService(
+        fake_db,
+        chunker=DocumentChunker(chunk_size=12, chunk_overlap=0),
+        embedding_service=RecordingEmbeddings(),
+        vector_index=SegmentVectorBackend(store),
+        rag_cache=RAGResultCache()
+    ))
+    await _sync(sync, paragraphs('a', 'b', 'c'))
+    await _sync(sync, paragraphs('new', 'a', 'B2', 'c'))
+    store.compact()
+
+    rows = sync.ingestion.vector_index.search_sync([1.0, 1.0, 1.0], -1.0, 10)
+    indexed = {r['id']: r['chunk_index'] for r in rows}
+    assert indexed == {r['id']: r['chunk_index'] for r in fake_db.tables['document_chunks']}
+    assert len(indexed) == 4
@@ -0,0 +1,236 @@
+"""
+Tests for EmbeddingService
+
+Batch embedding path: bulk cache lookup, multi-input API call, bulk save,
+bounded API concurrency, in-process L1 cache tier, local model pool.
+"""
+
+import asyncio
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from services.embedding_service import EmbeddingService
+from services.embedding_cache import text_hash
+from services.local_embedder import LocalEmbedder
+from utils.vector_cache import VectorLRUCache
+
+
+def fake_vector(text: str, dims: int = 8):
+    """Deterministic embedding derived from the text."""
+    return [float((len(text) + i) % 7) for i in range(dims)]
+
+
+@pytest.fixture
+def service(fake_supabase):
+    """EmbeddingService with a recording fake OpenAI backend."""
+    svc = EmbeddingService(
+        fake_supabase, primary_model="openai", l1_cache=VectorLRUCache()
+    )
+    svc.api_calls = []
+
+    async def fake_openai(texts):
+        svc.api_calls.append(list(texts))
+        return [fake_vector(t) for t in texts]
+
+    svc._generate_openai = fake_openai
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_single_api_call_and_bulk_cache(service, fake_supabase):
+    """A batch of misses costs one lookup, one API call, one insert"""
+    texts = [f"chunk {i}" for i in range(25)]
+
+    embeddings = await service.generate_embeddings_batch(texts)
+
+    assert embeddings == [fake_vector(t) for t in texts]
+    assert len(service.api_calls) == 1
+    assert fake_supabase.count('embedding_cache', 'select') == 1
+    assert fake_supabase.count('embedding_cache', 'upsert') == 1
+    assert len(fake_supabase.tables['embedding_cache']) == 25
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_only_misses_and_keeps_order(service, fake_supabase):
+    """Cached texts are not re-embedded; output order matches input"""
+    fake_supabase.tables['embedding_cache'] = [
+        {'text_hash': text_hash("cached"), 'embedding': [9.0] * 8, 'dimensions': 8}
+    ]
+    texts = ["a", "cached", "bb", "a"]
+
+    embeddings = await service.generate_embeddings_batch(texts)
+
+    assert service.api_calls == [["a", "bb"]]
+    assert embeddings == [fake_vector("a"), [9.0] * 8, fake_vector("bb"), fake_vector("a")]
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_batch_size(service):
+    """Texts are split into API requests of at most batch_size"""
+    texts = [f"text {i}" for i in range(10)]
+
+    await service.generate_embeddings_batch(texts, batch_size=4)
+
+    assert [len(call) for call in service.api_calls] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_to_local(fake_supabase):
+    """API failure falls back to the local model for the whole batch"""
+    svc = EmbeddingService(fake_supabase, use_cache=False, l1_cache=VectorLRUCache())
+
+    async def failing_openai(texts):
+        raise RuntimeError("rate limited")
+
+    async def local(texts):
+        return [[1.0, 2.0] for _ in texts]
+
+    svc._generate_openai = failing_openai
+    svc._generate_local = local
+
+    embeddings = await svc.generate_embeddings_batch(["x", "y"])
+
+    assert embeddings == [[1.0, 2.0], [1.0, 2.0]]
+
+
+@pytest.mark.asyncio
+async def test_batches_run_concurrently_within_limit(fake_supabase):
+    """Batches overlap on the event loop but never exceed max_concurrency"""
+    in_flight = {'now': 0, 'peak': 0}
+
+    class FakeEmbeddings:
+        async def create(self, model, input):
+            in_flight['now'] += 1
+            in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return SimpleNamespace(data=[
+                SimpleNamespace(index=i, embedding=fake_vector(t))
+                for i, t in enumerate(input)
+            ])
+
+    svc = EmbeddingService(
+        fake_supabase, use_cache=False, max_concurrency=2,
+        l1_cache=VectorLRUCache()
+    )
+    svc._openai_client = SimpleNamespace(embeddings=FakeEmbeddings())
+    texts = [f"text {i}" for i in range(10)]
+
+    embeddings = await svc.generate_embeddings_batch(texts, batch_size=2)
+
+    assert embeddings == [fake_vector(t) for t in texts]
+    assert in_flight['peak'] == 2
+
+
+@pytest.mark.asyncio
+async def test_l1_hit_skips_supabase(service, fake_supabase):
+    """Second lookup of a hot text is served from the in-process tier"""
+    first = await service.generate_embedding("How to deploy?")
+    calls_before = len(fake_supabase.calls)
+
+    second = await service.generate_embedding("How to deploy?")
+
+    assert second == first
+    assert len(fake_supabase.calls) == calls_before
+    assert service.cache.stats()['l1']['hits'] == 1
+    assert service.cache.stats()['hit_rate'] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_l2_hit_promotes_to_l1(service, fake_supabase):
+    """Supabase hits (pgvector text format) are parsed and promoted"""
+    fake_supabase.tables['embedding_cache'] = [
+        {'text_hash': text_hash("warm"), 'embedding': '[0.5,0.25]', 'dimensions': 2}
+    ]
+
+    assert await service.generate_embedding("warm") == [0.5, 0.25]
+    assert await service.generate_embedding("warm") == [0.5, 0.25]
+    assert fake_supabase.count('embedding_cache', 'select') == 1
+    assert service.api_calls == []
+
+
+def test_lru_evicts_by_byte_budget():
+    """Least recently used vectors are evicted once the budget is exceeded"""
+    cache = VectorLRUCache(max_bytes=3 * 4 * 4)  # three 4-d float32 vectors
+    for key in ("a", "b", "c"):
+        cache.put(key, [1.0, 2.0, 3.0, 4.0])
+    cache.get("a")
+    cache.put("d", [0.0] * 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("a").dtype.name == "float32"
+    assert cache.stats()['evictions'] == 1
+    assert cache.current_bytes == 48
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_are_flushed_in_one_rpc(service, fake_supabase):
+    """Usage counts accumulate in memory and flush as one bulk RPC"""
+    flushed = []
+    fake_supabase.rpc_handlers['increment_cache_use_batch'] = flushed.append
+    fake_supabase.tables['embedding_cache'] = [
+        {'text_hash': text_hash(t), 'embedding': [1.0], 'dimensions': 1}
+        for t in ("a", "b")
+    ]
+
+    await service.generate_embeddings_batch(["a", "b", "a"])
+    await service.generate_embedding("a")
+    assert fake_supabase.count('rpc') == 0
+
+    await service.aclose()
+
+    assert fake_supabase.count('rpc', 'increment_cache_use_batch') == 1
+    counts = dict(zip(flushed[0]['hashes'], flushed[0]['counts']))
+    assert counts == {text_hash("a"): 2, text_hash("b"): 1}
+
+
+@pytest.mark.asyncio
+async def test_local_embedder_batches_on_pool():
+    """Local model runs batched encode() calls and preserves input order"""
+    class FakeModel:
+        def __init__(self):
+            self.calls = []
+
+        def encode(self, texts, batch_size):
+            self.calls.append(len(texts))
+            return np.array([[float(t.split()[1])] for t in texts])
+
+    embedder = LocalEmbedder(batch_size=4, max_workers=2)
+    embedder._model = FakeModel()
+    texts = [f"text {i}" for i in range(10)]
+
+    embeddings = await embedder.embed(texts)
+
+    assert embeddings == [[float(i)] for i in range(10)]
+    assert sorted(embedder._model.calls) == [2, 4, 4]
+    embedder.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reduced_dimensions_use_separate_cache_keys(fake_supabase):
+    """256-d vectors are cached under '<hash>:256', never the full-size key"""
+    fake_supabase.tables['embedding_cache'] = [
+        {'text_hash': text_hash("doc"), 'embedding': [9.0] * 8, 'dimensions': 1536}
+    ]
+    svc = EmbeddingService(
+        fake_supabase, primary_model="openai", l1_cache=VectorLRUCache(), dimensions=256
+    )
+    calls = []
+
+    async def fake_openai(texts):
+        calls.append(list(texts))
+        return [fake_vector(t) for t in texts]
+
+    svc._generate_openai = fake_openai
+
+    assert await svc.generate_embeddings_batch(["doc"]) == [fake_vector("doc")]
+    assert calls == [["doc"]]
+    keys = {row['text_hash'] for row in fake_supabase.tables['embedding_cache']}
+    assert keys == {text_hash("doc"), f"{text_hash('doc')}:256"}
+
+    calls.clear()
+    assert await svc.generate_embeddings_batch(["doc"]) == [fake_vector("doc")]
+    assert calls == []
+    with pytest.raises(ValueError):
+        EmbeddingService(fake_supabase, dimensions=300)
@@ -0,0 +1,158 @@
+"""
+Tests for EmbeddingSegmentStore and SegmentVectorBackend
+
+Append-only memory-mapped segments, tombstones, and compaction.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from pathlib import Path
+from services.embedding_store import EmbeddingSegmentStore
+from services.segment_vector_backend import SegmentVectorBackend
+
+
+def normalize(vec):
+    return (np.asarray(vec) / np.linalg.norm(vec)).tolist()
+
+
+def rows_for(doc, vectors):
+    return [
+        {
+            'id': f"{doc}-{i}",
+            'document_id': doc,
+            'document_title': doc.title(),
+            'chunk_index': i,
+            'chunk_text': f"{doc} chunk {i}",
+            'embedding': vec,
+        }
+        for i, vec in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingSegmentStore(str(tmp_path / "store"))
+
+
+def test_segments_are_memory_mapped(store):
+    """Appended vectors are stored normalized and read back via memmap"""
+    store.append(rows_for("alpha", [[3.0, 4.0], [0.0, 2.0]]))
+
+    vectors, rows, live = next(store.segments())
+
+    assert isinstance(vectors, np.memmap)
+    assert vectors.dtype == np.float32
+    assert vectors[0].tolist() == pytest.approx([0.6, 0.8])
+    assert [r['id'] for r in rows] == ["alpha-0", "alpha-1"]
+    assert live.all()
+
+
+def test_search_across_segments(store):
+    """Backend merges top-k across segments"""
+    backend = SegmentVectorBackend(store, block_rows=1)
+    backend.add_chunks(rows_for("alpha", [[1.0, 0.0], [0.0, 1.0]]))
+    backend.add_chunks(rows_for("beta", [[0.9, 0.1]]))
+
+    results = backend.search_sync([1.0, 0.0], match_threshold=0.5, match_count=5)
+
+    assert [r['id'] for r in results] == ["alpha-0", "beta-0"]
+    assert results[0]['similarity'] == pytest.approx(1.0)
+    assert results[1]['embedding'].tolist() == pytest.approx(normalize([0.9, 0.1]))
+
+
+def test_tombstones_and_compaction(store):
+    """Deleted documents are hidden at once and dropped by compaction"""
+    store.append(rows_for("alpha", [[1.0, 0.0]]))
+    store.append(rows_for("beta", [[0.0, 1.0]]))
+    store.delete_documents(["alpha"])
+    assert len(store) == 1
+
+    store.compact()
+
+    segments = list(store.segments())
+    assert len(segments) == 1
+    assert [r['document_id'] for r in segments[0][1]] == ["beta"]
+    assert sorted(p.name for p in Path(store.path).glob("seg-*")) == [
+        "seg-000003.f32", "seg-000003.keys.json", "seg-000003.rows.jsonl"
+    ]
+
+
+def test_readded_document_survives_tombstone(store):
+    """Remove then re-add (how sync updates a document) keeps the new rows"""
+    backend = SegmentVectorBackend(store)
+    backend.add_chunks(rows_for("alpha", [[1.0, 0.0]]))
+    backend.remove_documents(["alpha"])
+    backend.add_chunks(rows_for("alpha", [[0.0, 1.0]]))
+
+    assert [r['id'] for r in backend.search_sync([0.0, 1.0], 0.5, 5)] == ["alpha-0"]
+    store.compact()
+    assert len(store) == 1
+    assert backend.search_sync([0.0, 1.0], 0.5, 5)[0]['similarity'] == pytest.approx(1.0)
+
+
+def test_chunk_tombstones(store):
+    """Single chunks can be hidden and compacted away"""
+    store.append(rows_for("alpha", [[1.0, 0.0], [0.0, 1.0]]))
+    store.delete_chunks(["alpha-0"])
+    assert [r['id'] for _, rows, live in store.segments() for r, ok in zip(rows, live) if ok] == ["alpha-1"]
+    store.compact()
+    assert len(store) == 1
+
+
+def test_auto_compaction_and_cross_process_visibility(tmp_path):
+    """A second handle sees new segments; too many segments are merged"""
+    writer = EmbeddingSegmentStore(str(tmp_path), max_segments=2)
+    reader = EmbeddingSegmentStore(str(tmp_path))
+
+    for doc in ("a", "b", "c"):
+        writer.append(rows_for(doc, [[1.0, 1.0]]))
+
+    assert len(list(reader.segments())) == 1
+    assert len(reader) == 3
+
+
+def test_dimension_mismatch_rejected(store):
+    """All segments in a store share one dimensionality"""
+    store.append(rows_for("alpha", [[1.0, 0.0]]))
+    with pytest.raises(ValueError):
+        store.append(rows_for("beta", [[1.0, 0.0, 0.0]]))
+
+
+def test_live_masks_are_cached_until_tombstones_change(tmp_path):
+    """Searches reuse the mask; a delete in another process rebuilds it"""
+    store, other = EmbeddingSegmentStore(str(tmp_path)), EmbeddingSegmentStore(str(tmp_path))
+    store.append(rows_for("alpha", [[1.0, 0.0], [0.0, 1.0]]))
+    first = next(store.segments())[2]
+    assert next(store.segments())[2] is first
+
+    other.delete_chunks(["alpha-1"])
+    store.append(rows_for("beta", [[1.0, 1.0]]))
+    assert next(store.segments())[2].tolist() == [True, False]
+
+
+def test_side_table_text_is_read_on_demand(store):
+    """Only ids stay resident; hits and filters read rows from disk"""
+    backend = SegmentVectorBackend(store)
+    backend.add_chunks(rows_for("alpha", [[1.0, 0.0], [0.9, 0.1]]))
+    _, rows, _ = next(store.segments())
+
+    assert rows.columns == {'id': ["alpha-0", "alpha-1"], 'document_id': ["alpha", "alpha"]}
+    hits = backend.search_sync([1.0, 0.0], 0.5, 5, filters={'chunk_index': 1})
+    assert [(r['id'], r['chunk_text']) for r in hits] == [("alpha-1", "alpha chunk 1")]
+
+
+def test_legacy_rows_json_segments_are_readable(store):
+    """Segments written before the keys/jsonl split still load"""
+    store.append(rows_for("alpha", [[1.0, 0.0]]))
+    base = Path(store.path) / "seg-000001"
+    rows = [json.loads(line) for line in open(f"{base}.rows.jsonl")]
+    Path(f"{base}.rows.json").write_text(json.dumps(rows))
+    Path(f"{base}.keys.json").unlink()
+
+    reopened = EmbeddingSegmentStore(store.path)
+    reopened.delete_documents(["alpha"])
+    assert len(reopened) == 0
+    reopened.compact()
+    assert sorted(p.name for p in Path(store.path).glob("seg-*")) == []
@@ -0,0 +1,98 @@
+"""
+Tests for pipelined batch ingestion (IngestionPipeline, EmbeddingBatcher).
+"""
+
+import asyncio
+import pytest
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.ingestion_pipeline import IngestionPipeline
+from services.rag_cache import RAGResultCache
+
+
+class BatchRecorder:
+    """Fake embedding service recording request sizes; fails on 'BAD'."""
+
+    def __init__(self, delay=0.0):
+        self.requests = []
+        self.delay = delay
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        self.requests.append(len(texts))
+        await asyncio.sleep(self.delay)
+        if any('BAD' in t for t in texts):
+            raise RuntimeError("provider rejected input")
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def document(name, paragraphs=3, marker=''):
+    content = '\n\n'.join(f"{name} {marker} section {i} " + 'words ' * 6 for i in range(paragraphs))
+    return {'title': name, 'content': content, 'created_by': 'user-1'}
+
+
+def make_service(fake_supabase, embeddings):
+    return DocumentIngestionService(
+        fake_supabase,
+        chunker=DocumentChunker(chunk_size=12, chunk_overlap=0),
+        embedding_service=embeddings,
+        rag_cache=RAGResultCache()
+    )
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_packed_across_documents(fake_supabase):
+    embeddings = BatchRecorder()
+    service = make_service(fake_supabase, embeddings)
+    pipeline = IngestionPipeline(service, embed_batch_size=10)
+
+    summary = await service.ingest_documents_batch(
+        [document(f"doc{i}") for i in range(6)], pipeline=pipeline
+    )
+
+    assert summary['successful'] == 6 and summary['total_chunks'] == 18
+    assert max(embeddings.requests) == 10 and len(embeddings.requests) == 2
+    assert len(fake_supabase.tables['document_chunks']) == 18
+
+
+@pytest.mark.asyncio
+async def test_unknown_document_keys_are_ignored(fake_supabase):
+    service = make_service(fake_supabase, BatchRecorder())
+    doc = {**document('extra'), 'visibility': 'team', 'source_path': 'docs/extra.md'}
+
+    summary = await service.ingest_documents_batch([doc], pipeline=IngestionPipeline(service))
+
+    assert summary['successful'] == 1
+    assert fake_supabase.tables['documents'][0]['visibility'] == 'team'
+
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated_per_document(fake_supabase):
+    embeddings = BatchRecorder()
+    service = make_service(fake_supabase, embeddings)
+    docs = [document('good1'), document('bad', marker='BAD'), document('good2'), {'title': 'broken'}]
+    progress = []
+
+    summary = await service.ingest_documents_batch(
+        docs, progress_callback=lambda done, total, title: progress.append((done, total, title))
+    )
+
+    assert summary['successful'] == 2 and summary['failed'] == 2
+    assert {e['title'] for e in summary['errors']} == {'bad', 'broken'}
+    assert sorted(title for _, _, title in progress) == ['good1', 'good2']
+    assert all(total == 4 for _, total, _ in progress)
+    stored = {r['document_id'] for r in fake_supabase.tables['document_chunks']}
+    assert len(stored) == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_requests_run_concurrently(fake_supabase):
+    embeddings = BatchRecorder(delay=0.05)
+    service = make_service(fake_supabase, embeddings)
+    pipeline = IngestionPipeline(service, embed_workers=4, embed_batch_size=3)
+
+    start = asyncio.get_running_loop().time()
+    summary = await pipeline.run([document(f"doc{i}") for i in range(8)])
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert summary['successful'] == 8 and len(embeddings.requests) == 8
+    assert elapsed < 8 * 0.05
@@ -0,0 +1,94 @@
+"""
+Tests for BM25Index and reciprocal rank fusion
+
+Identifier-aware tokenization, BM25 ranking, incremental updates and
+compaction of the array-backed postings.
+"""
+
+import pytest
+from services.hybrid_search import reciprocal_rank_fusion
+from services.lexical_index import BM25Index, tokenize
+
+
+def chunk(chunk_id, doc, text):
+    return {
+        'id': chunk_id, 'document_id': doc, 'document_title': doc,
+        'chunk_text': text, 'chunk_index': 0
+    }
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add_chunks([
+        chunk("a", "d1", "Retry on ERR_CONN_RESET when the upstream closes the socket"),
+        chunk("b", "d1", "Call getUserById to load a user profile"),
+        chunk("c", "d2", "Set max_tokens in config.llm.max_tokens for long answers"),
+        chunk("d", "d2", "The user guide covers the user profile page"),
+    ])
+    return index
+
+
+def test_tokenize_splits_compound_identifiers():
+    """Identifiers are indexed whole and by their parts"""
+    assert tokenize("ERR_CONN_RESET") == ["err_conn_reset", "err", "conn", "reset"]
+    assert tokenize("getUserById()") == ["getuserbyid", "get", "user", "by", "id"]
+    assert tokenize("config.llm.max_tokens") == [
+        "config.llm.max_tokens", "config", "llm", "max", "tokens"
+    ]
+    assert tokenize("plain words") == ["plain", "words"]
+
+
+def test_exact_identifier_ranks_first(index):
+    """A rare identifier beats common words"""
+    assert index.search_sync("what does ERR_CONN_RESET mean", 2)[0]['id'] == "a"
+    assert index.search_sync("getUserById", 2)[0]['id'] == "b"
+    assert [r['id'] for r in index.search_sync("max_tokens", 5)] == ["c"]
+
+
+def test_scores_and_filters(index):
+    """Rows carry a BM25 score; filters match stored fields"""
+    results = index.search_sync("user profile", 5)
+    assert {r['id'] for r in results} == {"b", "d"}
+    assert all(r['bm25'] > 0 for r in results)
+
+    filtered = index.search_sync("user profile", 5, filters={'document_id': "d2"})
+    assert [r['id'] for r in filtered] == ["d"]
+    assert index.search_sync("nothing matches", 5) == []
+
+
+def test_incremental_remove_and_compaction(index):
+    """Removed chunks disappear at once; their postings are compacted away"""
+    index.remove_documents(["d1"])
+    assert len(index) == 2
+    assert index.search_sync("getuserbyid", 5) == []
+
+    index.remove_documents(["d2"])
+    assert len(index) == 0
+    assert index._postings == {}
+
+    index.add_chunks([chunk("e", "d3", "ERR_CONN_RESET again")])
+    assert [r['id'] for r in index.search_sync("ERR_CONN_RESET", 5)] == ["e"]
+
+
+def test_remove_chunks_by_id(index):
+    """Single chunks can be removed and re-added under the same id"""
+    index.remove_chunks(["b", "missing"])
+    assert len(index) == 3
+    assert index.search_sync("getuserbyid", 5) == []
+
+    index.add_chunks([chunk("b", "d1", "Call getUserById with a cache")])
+    index.remove_documents(["d1"])
+    assert len(index) == 2
+
+
+def test_reciprocal_rank_fusion():
+    """Rows found by both rankings rise; scores are normalized to 0-1"""
+    vector = [{'id': "x"}, {'id': "y"}, {'id': "z"}]
+    lexical = [{'id': "z"}, {'id': "w"}]
+
+    fused = reciprocal_rank_fusion([vector, lexical])
+
+    assert [r['id'] for r in fused] == ["z", "x", "y", "w"]
+    assert 0 < fused[-1]['similarity'] < fused[0]['similarity'] < 1
+    assert reciprocal_rank_fusion([[{'id': "x"}], [{'id': "x"}]])[0]['similarity'] == pytest.approx(1.0)
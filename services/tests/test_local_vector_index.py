@@ -0,0 +1,120 @@
+"""
+Tests for LocalVectorIndex
+
+In-process IVF search, ingest-time updates, and RAGService integration
+without a pgvector round-trip.
+"""
+
+import numpy as np
+import pytest
+from services.local_vector_index import LocalVectorIndex
+from services.rag_service import RAGService
+
+
+def make_rows(vectors, doc="doc-1"):
+    return [
+        {
+            'id': f"{doc}-chunk-{i}",
+            'document_id': doc,
+            'document_title': f"Title {doc}",
+            'chunk_text': f"text {i}",
+            'chunk_index': i,
+            'embedding': vec,
+        }
+        for i, vec in enumerate(vectors)
+    ]
+
+
+class StubEmbeddings:
+    """Returns a fixed query vector."""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    async def generate_embedding(self, text):
+        return self.vector
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(2000, 32)).astype(np.float32)
+
+
+def brute_force(corpus, query, k):
+    normed = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    return set(np.argsort(-(normed @ (query / np.linalg.norm(query))))[:k].tolist())
+
+
+def test_exact_search_matches_brute_force(corpus):
+    """Untrained index is exact"""
+    index = LocalVectorIndex()
+    index.add_chunks(make_rows(corpus))
+
+    results = index.search_sync(corpus[7], match_threshold=-1.0, match_count=5)
+
+    assert results[0]['id'] == "doc-1-chunk-7"
+    assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-5)
+    assert {r['chunk_index'] for r in results} == brute_force(corpus, corpus[7], 5)
+    assert float(results[0]['embedding'] @ results[0]['embedding']) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_ivf_recall_improves_with_nprobe(corpus):
+    """Trained IVF search approaches exact recall as nprobe grows"""
+    index = LocalVectorIndex(nlist=32, nprobe=1, train_threshold=1000)
+    index.add_chunks(make_rows(corpus))
+    assert index.trained
+
+    def recall(nprobe):
+        index.nprobe = nprobe
+        hits = 0
+        for q in corpus[:50]:
+            found = {r['chunk_index'] for r in index.search_sync(q, -1.0, 10)}
+            hits += len(found & brute_force(corpus, q, 10))
+        return hits / 500
+
+    assert recall(32) == 1.0
+    assert recall(1) <= recall(8) <= recall(32)
+
+
+def test_remove_documents_and_threshold():
+    """Removed documents and low-similarity rows are not returned"""
+    index = LocalVectorIndex()
+    index.add_chunks(make_rows([[1.0, 0.0], [0.0, 1.0]], doc="a"))
+    index.add_chunks(make_rows([[1.0, 0.1]], doc="b"))
+
+    index.remove_documents(["a"])
+
+    results = index.search_sync([1.0, 0.0], match_threshold=0.5, match_count=10)
+    assert [r['document_id'] for r in results] == ["b"]
+    assert len(index) == 1
+
+
+def test_remove_chunks_by_id():
+    """A chunk removed by id is hidden; re-adding the id makes it live again"""
+    index = LocalVectorIndex()
+    rows = make_rows([[1.0, 0.0], [0.0, 1.0]], doc="a")
+    index.add_chunks(rows)
+
+    index.remove_chunks([rows[0]['id']])
+    assert len(index) == 1
+    index.add_chunks([{**rows[0], 'embedding': [0.9, 0.1]}])
+    assert index.search_sync([1.0, 0.0], 0.5, 10)[0]['id'] == rows[0]['id']
+    assert len(index) == 2
+
+
+@pytest.mark.asyncio
+async def test_rag_query_on_local_index_filters_by_permission(fake_supabase):
+    """Local results are post-filtered to documents visible to the user"""
+    fake_supabase.tables['documents'] = [{'id': "visible"}]
+    index = LocalVectorIndex()
+    index.add_chunks(make_rows([[1.0, 0.0]], doc="visible"))
+    index.add_chunks(make_rows([[1.0, 0.0]], doc="hidden"))
+    rag = RAGService(
+        fake_supabase, StubEmbeddings([1.0, 0.0]), vector_backend=index
+    )
+
+    results = await rag.query("question", user_id="user-1")
+
+    assert [r.document_id for r in results] == ["visible"]
+    assert fake_supabase.count('rpc', 'match_documents') == 0
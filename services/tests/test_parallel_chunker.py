@@ -0,0 +1,69 @@
+"""
+Tests for ParallelChunker and its use by IngestionPipeline.
+"""
+
+import random
+
+import pytest
+
+from services.document_chunker import DocumentChunker
+from services.document_ingestion import DocumentIngestionService
+from services.ingestion_pipeline import IngestionPipeline
+from services.parallel_chunker import ParallelChunker
+from services.rag_cache import RAGResultCache
+
+
+class FakeEmbeddings:
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _corpus(n=40, seed=3):
+    rng = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'naïve', 'δelta', '\n\n', '. ', '\n']
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(0, 400))) for _ in range(n)] + ['', '   ']
+
+
+@pytest.fixture(scope='module')
+def chunker():
+    return DocumentChunker(chunk_size=40, chunk_overlap=10)
+
+
+@pytest.mark.parametrize('shm_min_bytes', [0, 10 ** 9], ids=['shared-memory', 'pickled'])
+def test_matches_serial_chunking_in_input_order(chunker, shm_min_bytes):
+    texts = _corpus()
+    ids = [f"doc-{i}" for i in range(len(texts))]
+    with ParallelChunker(chunker, workers=2, min_unit_chars=1, shm_min_bytes=shm_min_bytes) as parallel:
+        assert len(parallel.units(texts)) > 2
+        results = parallel.chunk_many(texts, ids)
+
+    assert results == [chunker.chunk_text(text, doc_id) for text, doc_id in zip(texts, ids)]
+
+
+def test_units_are_contiguous_and_cover_every_document(chunker):
+    texts = _corpus(100)
+    ranges = ParallelChunker(chunker, workers=3, min_unit_chars=1).units(texts)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(texts)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_chunks_windows_in_parallel(fake_supabase, chunker):
+    service = DocumentIngestionService(
+        fake_supabase, chunker=chunker, embedding_service=FakeEmbeddings(), rag_cache=RAGResultCache()
+    )
+    docs = [{'title': f"doc{i}", 'content': text, 'created_by': 'user-1'} for i, text in enumerate(_corpus(12))]
+
+    with ParallelChunker(chunker, workers=2, min_unit_chars=1) as parallel:
+        pipeline = IngestionPipeline(service, parallel_chunker=parallel, chunk_window=5)
+        summary = await service.ingest_documents_batch(docs, pipeline=pipeline)
+
+    titles = {row['id']: row['title'] for row in fake_supabase.tables['documents']}
+    expected = sum(len(chunker.chunk_text(doc['content'], None)) for doc in docs)
+    rows = fake_supabase.tables['document_chunks']
+    assert summary['successful'] == len(docs) and summary['total_chunks'] == expected == len(rows)
+    for row in rows:
+        content = docs[int(titles[row['document_id']][3:])]['content']
+        assert row['chunk_text'] in content
+        assert row['metadata']['document_id'] == row['document_id']
@@ -0,0 +1,94 @@
+"""
+Tests for QuantizedSegmentBackend
+
+First pass on int8 / binary codes, exact float32 rescoring.
+"""
+
+import numpy as np
+import pytest
+from pathlib import Path
+from services.embedding_store import EmbeddingSegmentStore
+from services.quantized_vector_backend import QuantizedSegmentBackend
+from services.segment_vector_backend import SegmentVectorBackend
+from utils.vector_utils import normalize_matrix
+
+
+def make_rows(doc, vectors):
+    return [
+        {
+            'id': f"{doc}-{i}",
+            'document_id': doc,
+            'document_title': doc.title(),
+            'chunk_index': i,
+            'chunk_text': f"{doc} chunk {i}",
+            'embedding': vec,
+        }
+        for i, vec in enumerate(vectors)
+    ]
+
+
+def store_files(store):
+    return sorted(Path(store.path).glob("seg-*"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingSegmentStore(str(tmp_path / "store"))
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(1)
+    return normalize_matrix(rng.normal(size=(300, 64)).astype(np.float32))
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_matches_exact_search(store, vectors, mode):
+    """Rescored results equal the exact backend's, similarities included"""
+    backend = QuantizedSegmentBackend(store, mode=mode, rescore_factor=20, block_rows=64)
+    backend.add_chunks(make_rows("alpha", vectors[:150]))
+    backend.add_chunks(make_rows("beta", vectors[150:]))
+    exact = SegmentVectorBackend(store)
+
+    for query in vectors[:5] + 0.1 * vectors[5:10]:
+        got = backend.search_sync(query, match_threshold=0.0, match_count=5)
+        want = exact.search_sync(query, match_threshold=0.0, match_count=5)
+        assert [r['id'] for r in got] == [r['id'] for r in want]
+        assert [r['similarity'] for r in got] == pytest.approx([r['similarity'] for r in want], abs=1e-5)
+        assert np.allclose([r['embedding'] for r in got], [r['embedding'] for r in want])
+
+
+def test_codes_written_at_ingest_and_dropped_by_compaction(store, vectors):
+    """Sidecar code files follow their segment's lifecycle"""
+    backend = QuantizedSegmentBackend(store, mode='int8')
+    backend.add_chunks(make_rows("alpha", vectors[:10]))
+    assert sorted(p.suffix for p in store_files(store)) == ['.f32', '.i8', '.i8s', '.json', '.jsonl']
+
+    backend.remove_documents(["alpha"])
+    backend.add_chunks(make_rows("beta", vectors[10:20]))
+    store.compact()
+    backend.build_codes()
+
+    names = {p.name.split('.')[0] for p in store_files(store)}
+    assert len(names) == 1
+    results = backend.search_sync(vectors[12], match_threshold=0.5, match_count=3)
+    assert results[0]['id'] == "beta-2"
+
+
+def test_filters_and_threshold(store, vectors):
+    """Tombstones, filters and the threshold apply before results"""
+    backend = QuantizedSegmentBackend(store, mode='binary')
+    backend.add_chunks(make_rows("alpha", vectors[:20]) + make_rows("beta", vectors[:20]))
+
+    results = backend.search_sync(
+        vectors[3], match_threshold=0.99, match_count=5, filters={'document_id': 'beta'}
+    )
+    assert [r['id'] for r in results] == ["beta-3"]
+
+    backend.remove_documents(["beta"])
+    assert backend.search_sync(vectors[3], 0.99, 5, filters={'document_id': 'beta'}) == []
+
+
+def test_unknown_mode_rejected(store):
+    with pytest.raises(ValueError):
+        QuantizedSegmentBackend(store, mode='pq')
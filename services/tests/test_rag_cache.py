@@ -0,0 +1,108 @@
+"""
+Tests for RAGResultCache
+
+Result caching in RAGService and ACL/ingest-driven invalidation.
+"""
+
+import pytest
+import services.rag_cache as rag_cache_module
+from services.document_ingestion import DocumentIngestionService
+from services.rag_cache import RAGResultCache
+from services.rag_service import RAGService
+from utils.acl_helper import ACLHelper
+
+
+class CountingEmbeddings:
+    """Embeds every text as the same unit vector and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_embedding(self, text):
+        self.calls += 1
+        return [1.0, 0.0]
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+def cache():
+    return RAGResultCache(ttl_seconds=60)
+
+
+@pytest.fixture
+def rag(fake_supabase, cache):
+    fake_supabase.rpc_handlers['match_documents'] = lambda params: [{
+        'id': 'c1', 'document_id': 'd1', 'document_title': 'Doc',
+        'chunk_text': 'text', 'chunk_index': 0, 'similarity': 0.9
+    }]
+    return RAGService(fake_supabase, CountingEmbeddings(), result_cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_hits_cache(rag, fake_supabase):
+    """Normalized repeats skip embedding and match_documents"""
+    first = await rag.query("How to deploy?", "user-1")
+    second = await rag.query("  how to   DEPLOY? ", "user-1")
+
+    assert [r.id for r in second] == [r.id for r in first]
+    assert rag.embedding_service.calls == 1
+    assert fake_supabase.count('rpc', 'match_documents') == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_per_user_and_filters(rag):
+    """Different users or filters never share entries"""
+    await rag.query("q", "user-1")
+    await rag.query("q", "user-2")
+    await rag.query("q", "user-1", filters={'document_type': 'policy'})
+
+    assert rag.embedding_service.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_grant_and_revoke_invalidate_user(rag, fake_supabase, cache):
+    """ACL changes drop the affected user's entries only"""
+    acl = ACLHelper(fake_supabase, rag_cache=cache)
+    await rag.query("q", "user-1")
+    await rag.query("q", "user-2")
+
+    await acl.grant_permission("d1", "user-1", granted_by="owner")
+    await rag.query("q", "user-1")
+    await rag.query("q", "user-2")
+    assert rag.embedding_service.calls == 3
+
+    await acl.revoke_permission("d1", "user-1")
+    await rag.query("q", "user-1")
+    assert rag.embedding_service.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_ingest_invalidates_visible_scope(rag, fake_supabase, cache):
+    """Private ingest invalidates its creator; shared ingest everyone"""
+    ingestion = DocumentIngestionService(
+        fake_supabase, embedding_service=CountingEmbeddings(), rag_cache=cache
+    )
+    await rag.query("q", "user-1")
+    await rag.query("q", "user-2")
+
+    await ingestion.ingest_document("Notes", "private notes", created_by="user-1")
+    await rag.query("q", "user-1")
+    await rag.query("q", "user-2")
+    assert rag.embedding_service.calls == 3
+
+    await ingestion.ingest_document("Policy", "org policy", "user-3", visibility="org")
+    await rag.query("q", "user-2")
+    assert rag.embedding_service.calls == 4
+
+
+def test_ttl_expiry(cache, monkeypatch):
+    """Entries expire after ttl_seconds"""
+    now = [1000.0]
+    monkeypatch.setattr(rag_cache_module.time, 'monotonic', lambda: now[0])
+    cache.put("q", "u", None, ["result"])
+
+    assert cache.get("q", "u") == ["result"]
+    now[0] += 61
+    assert cache.get("q", "u") is None
@@ -0,0 +1,55 @@
+"""
+Tests for the process-wide RAG services used by the agent nodes.
+"""
+
+import pytest
+
+import services.rag_runtime as rag_runtime
+
+
+@pytest.fixture
+def runtime(fake_supabase, monkeypatch):
+    monkeypatch.setattr(rag_runtime, '_supabase', fake_supabase)
+    monkeypatch.setattr(rag_runtime, '_embedding_service', None)
+    monkeypatch.setattr(rag_runtime, '_rag_service', None)
+    return rag_runtime
+
+
+def test_unconfigured_returns_none(monkeypatch):
+    monkeypatch.setattr(rag_runtime, '_supabase', None)
+    monkeypatch.setattr(rag_runtime, '_embedding_service', None)
+    monkeypatch.delenv('SUPABASE_URL', raising=False)
+    assert rag_runtime.get_embedding_service() is None
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_is_shared_until_closed(runtime):
+    """Every query reuses one service; shutdown flushes and releases it"""
+    service = runtime.get_embedding_service()
+    assert runtime.get_embedding_service() is service
+
+    flushed = []
+    service.cache.close = lambda: _record(flushed)
+    await runtime.close_rag_services()
+
+    assert flushed == [True]
+    assert runtime.get_embedding_service() is not service
+
+
+@pytest.mark.asyncio
+async def test_rag_service_is_shared_and_drained(runtime):
+    """One RAGService (and audit writer) per process, drained on shutdown"""
+    rag = runtime.get_rag_service()
+    assert runtime.get_rag_service() is rag
+    assert rag.embedding_service is runtime.get_embedding_service()
+
+    drained = []
+    rag.audit.close = lambda: _record(drained)
+    await runtime.close_rag_services()
+
+    assert drained == [True]
+    assert runtime.get_rag_service() is not rag
+
+
+async def _record(calls):
+    calls.append(True)
@@ -0,0 +1,144 @@
+"""
+Tests for RAGService.query_many
+
+Batched embedding, concurrent search, cross-query dedupe, single audit row,
+and off-critical-path audit writes.
+"""
+
+import asyncio
+import pytest
+from services.event_queue import BatchedEventWriter
+from services.lexical_index import BM25Index
+from services.local_vector_index import LocalVectorIndex
+from services.rag_service import RAGService
+
+
+class BatchEmbeddings:
+    """Maps known query texts to fixed vectors and records batch calls."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.batch_calls = []
+
+    async def generate_embeddings_batch(self, texts, batch_size=100):
+        self.batch_calls.append(list(texts))
+        return [self.vectors[t] for t in texts]
+
+    async def generate_embedding(self, text):
+        return self.vectors[text]
+
+
+def chunk(chunk_id, doc, vec):
+    return {
+        'id': chunk_id, 'document_id': doc, 'document_title': doc,
+        'chunk_text': chunk_id, 'chunk_index': 0, 'embedding': vec
+    }
+
+
+@pytest.fixture
+def rag(fake_supabase):
+    fake_supabase.tables['documents'] = [{'id': "d1"}, {'id': "d2"}]
+    index = LocalVectorIndex()
+    index.add_chunks([
+        chunk("x", "d1", [1.0, 0.0, 0.0]),
+        chunk("xy", "d1", [0.8, 0.6, 0.0]),
+        chunk("y", "d2", [0.0, 1.0, 0.0]),
+        chunk("secret", "d3", [0.0, 0.0, 1.0]),
+    ])
+    embeddings = BatchEmbeddings({
+        "task": [1.0, 0.0, 0.0],
+        "requirements": [0.0, 1.0, 0.0],
+        "secrets": [0.0, 0.0, 1.0],
+    })
+    return RAGService(
+        fake_supabase, embeddings, similarity_threshold=0.5, vector_backend=index
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_many_batches_and_dedupes(rag, fake_supabase):
+    """One embedding request, overlapping chunk kept in its best query"""
+    results = await rag.query_many(["task", "requirements", "secrets"], "user-1")
+
+    assert rag.embedding_service.batch_calls == [["task", "requirements", "secrets"]]
+    assert [[r.id for r in rs] for rs in results] == [["x", "xy"], ["y"], []]
+    await rag.close()
+    assert fake_supabase.count('process_events', 'insert') == 1
+    event = fake_supabase.tables['process_events'][0]
+    assert event['event_name'] == 'semantic_search_batch'
+    assert event['input_data'] == {'queries': ["task", "requirements", "secrets"]}
+
+
+@pytest.mark.asyncio
+async def test_query_many_without_dedupe(rag):
+    """Overlapping chunks can be kept in every result list"""
+    results = await rag.query_many(["task", "requirements"], "user-1", dedupe=False)
+
+    assert [[r.id for r in rs] for rs in results] == [["x", "xy"], ["y", "xy"]]
+
+
+@pytest.mark.asyncio
+async def test_audit_rows_are_written_in_batches(fake_supabase):
+    """Queued rows are flushed in flush_size inserts; close() drains"""
+    writer = BatchedEventWriter(fake_supabase, flush_size=3, flush_interval=60)
+
+    for i in range(7):
+        writer.enqueue({'event_name': f"e{i}"})
+    assert fake_supabase.count('process_events') == 0
+
+    await asyncio.sleep(0)  # full batches flush without waiting for the interval
+    await asyncio.sleep(0)
+    await writer.close()
+
+    assert fake_supabase.count('process_events', 'insert') == 3
+    assert len(fake_supabase.tables['process_events']) == 7
+    assert writer.stats()['written'] == 7
+
+
+@pytest.mark.asyncio
+async def test_audit_queue_drops_when_full(fake_supabase):
+    """A full queue drops rows and counts them instead of blocking"""
+    writer = BatchedEventWriter(fake_supabase, flush_size=10, max_queue=2)
+
+    accepted = [writer.enqueue({'n': i}) for i in range(5)]
+    await writer.close()
+
+    assert accepted == [True, True, False, False, False]
+    assert writer.stats()['dropped'] == 3
+    assert len(fake_supabase.tables['process_events']) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_returns_before_audit_write(rag, fake_supabase):
+    """RAG queries do not wait for the process_events insert"""
+    await rag.query("task", "user-1")
+
+    assert fake_supabase.count('process_events') == 0
+    assert rag.audit.writer.pending == 1
+    await rag.close()
+    assert fake_supabase.count('process_events', 'insert') == 1
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_fuses_lexical_hits(rag):
+    """Hybrid mode surfaces exact-identifier chunks the vector side misses"""
+    rag.lexical_index = BM25Index()
+    rag.lexical_index.add_chunks([
+        {**chunk("y", "d2", None), 'chunk_text': "set RAG_MAX_RESULTS to 20"},
+        {**chunk("secret", "d3", None), 'chunk_text': "RAG_MAX_RESULTS is secret"},
+    ])
+
+    rag.embedding_service.vectors["RAG_MAX_RESULTS"] = [1.0, 0.0, 0.0]
+
+    vector_only = await rag.query("RAG_MAX_RESULTS", "user-1", hybrid=False)
+    hybrid = await rag.query("RAG_MAX_RESULTS", "user-1")
+
+    assert [r.id for r in vector_only] == ["x", "xy"]
+    assert [r.id for r in hybrid] == ["x", "y", "xy"]  # d3 is not readable
+    assert hybrid[0].similarity_score == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_requires_lexical_index(rag):
+    with pytest.raises(ValueError):
+        await rag.query("task", "user-1", hybrid=True)
@@ -0,0 +1,132 @@
+"""
+Tests for StreamingChunker and the linear-time DocumentChunker merge.
+"""
+
+import io
+import random
+
+import pytest
+
+from services.document_chunker import DocumentChunker
+from services.streaming_chunker import StreamingChunker, iter_splits
+from utils.tokenizer import Tokenizer
+
+
+def _random_text(rng: random.Random, length: int, alphabet: str) -> str:
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def _pieces(text: str, rng: random.Random):
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 7)
+        yield text[pos:pos + size]
+        pos += size
+
+
+def _as_tuples(chunks):
+    return [(c.text, c.chunk_index, c.token_count, c.metadata) for c in chunks]
+
+
+ALPHABETS = [
+    'abc \n.',       # all separators
+    'abcd  . ',      # no paragraph breaks
+    'abcdefgh',      # no separators: hard split
+    ' \n',           # whitespace only
+]
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_streaming_matches_chunk_text(alphabet):
+    rng = random.Random(42)
+    batch = DocumentChunker(chunk_size=10, chunk_overlap=3)
+    streaming = StreamingChunker(chunk_size=10, chunk_overlap=3, read_size=5, spool_bytes=16)
+
+    for length in [0, 5, 40, 41, 300, 2000]:
+        text = _random_text(rng, length, alphabet)
+        expected = _as_tuples(batch.chunk_text(text, 'doc'))
+        assert _as_tuples(streaming.iter_chunks(text, 'doc')) == expected
+        assert _as_tuples(streaming.iter_chunks(io.StringIO(text), 'doc')) == expected
+        assert _as_tuples(streaming.iter_chunks(_pieces(text, rng), 'doc')) == expected
+
+
+def test_separator_straddling_piece_boundaries():
+    text = 'alpha\n\nbeta\n\n\ngamma\n\n'
+    for cut in range(1, len(text)):
+        pieces = [text[:cut], text[cut:]]
+        assert list(iter_splits(pieces, '\n\n')) == text.split('\n\n')
+
+
+def test_streaming_is_lazy():
+    chunker = StreamingChunker(chunk_size=10, chunk_overlap=2)
+    consumed = []
+
+    def paragraphs():
+        for i in range(10_000):
+            consumed.append(i)
+            yield f"paragraph {i} with some words.\n\n"
+
+    first = next(chunker.iter_chunks(paragraphs(), 'doc'))
+    assert first.chunk_index == 0
+    assert len(consumed) < 10
+
+
+def test_merge_is_linear_for_many_small_splits():
+    chunker = DocumentChunker(chunk_size=500, chunk_overlap=50)
+    text = 'word ' * 400_000
+    chunks = chunker.chunk_text(text, 'doc')
+    assert len(chunks) > 800
+    assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+
+class WordTokenizer(Tokenizer):
+    """One token per whitespace-separated word (monotone in prefix length)."""
+
+    def count(self, text):
+        return len(text.split())
+
+
+def test_token_mode_targets_real_token_sizes():
+    chunker = DocumentChunker(chunk_size=20, chunk_overlap=5, token_counter=WordTokenizer())
+    text = ' '.join(f"w{i}" for i in range(500))
+    chunks = chunker.chunk_text(text, 'doc')
+
+    assert all(c.token_count <= 20 for c in chunks)
+    assert chunks[1].text.split()[:5] == chunks[0].text.split()[-5:]
+
+
+def test_streaming_matches_chunk_text_in_token_mode():
+    rng = random.Random(7)
+    counter = WordTokenizer()
+    batch = DocumentChunker(chunk_size=10, chunk_overlap=3, token_counter=counter)
+    streaming = StreamingChunker(chunk_size=10, chunk_overlap=3, token_counter=counter, read_size=4)
+
+    for length in [5, 30, 400, 3000]:
+        text = _random_text(rng, length, 'ab \n.')
+        expected = _as_tuples(batch.chunk_text(text, 'doc'))
+        assert _as_tuples(streaming.iter_chunks(_pieces(text, rng), 'doc')) == expected
+
+
+class CharTokenizer(Tokenizer):
+    """One token per character (like CJK text); records counted lengths."""
+
+    def __init__(self):
+        self.counted = []
+
+    def count(self, text):
+        self.counted.append(len(text))
+        return len(text)
+
+
+def test_token_hard_split_respects_budget_without_separators():
+    counter = CharTokenizer()
+    chunker = DocumentChunker(chunk_size=50, chunk_overlap=10, token_counter=counter)
+    text = '漢字' * 5000
+    chunks = chunker.chunk_text(text, 'doc')
+
+    assert all(c.token_count <= 50 for c in chunks)
+    assert chunks[1].text[:10] == chunks[0].text[-10:]
+    assert max(counter.counted) <= 50 * 8  # never tokenizes the whole document
+
+    streaming = StreamingChunker(chunk_size=50, chunk_overlap=10, token_counter=counter, read_size=7)
+    assert _as_tuples(streaming.iter_chunks(text, 'doc')) == _as_tuples(chunks)
@@ -0,0 +1,85 @@
+"""
+Phase 3: Vector Search Backends
+
+Pluggable similarity search used by RAGService.
+Rows follow the match_documents() shape:
+id, document_id, document_title, chunk_text, chunk_index, similarity.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VectorSearchBackend(ABC):
+    """Interface for top-k chunk retrieval."""
+
+    # True if results are already filtered by the caller's permissions
+    # (pgvector under RLS). Otherwise RAGService post-filters via ACLHelper.
+    enforces_rls: bool = False
+
+    @abstractmethod
+    async def search(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Return up to match_count rows with similarity >= match_threshold."""
+
+    def add_chunks(self, rows: List[Dict]):
+        """Index newly ingested chunks (no-op for server-side backends)."""
+
+    def remove_documents(self, document_ids: List[str]):
+        """Drop all chunks of the given documents (no-op by default)."""
+
+    def remove_chunks(self, chunk_ids: List[str]):
+        """Drop individual chunks by id (no-op by default)."""
+
+
+class SupabaseVectorBackend(VectorSearchBackend):
+    """pgvector search through the match_documents() RPC."""
+
+    enforces_rls = True
+
+    def __init__(self, supabase_client, rescore_factor: Optional[int] = None):
+        """
+        Args:
+            supabase_client: Supabase client (with user JWT for RLS)
+            rescore_factor: If set, search the binary-quantized index
+                (match_documents_quantized) and exactly rescore this many
+                candidates per requested result
+        """
+        self.supabase = supabase_client
+        self.rescore_factor = rescore_factor
+
+    async def search(
+        self,
+        query_vector: List[float],
+        match_threshold: float,
+        match_count: int,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Execute vector similarity search.
+
+        The blocking RPC runs in a worker thread so other requests on
+        the event loop are not stalled.
+        """
+        params = {
+            'query_embedding': query_vector,
+            'match_threshold': match_threshold,
+            'match_count': match_count
+        }
+        if self.rescore_factor:
+            rpc = self.supabase.rpc('match_documents_quantized', {
+                **params, 'rescore_factor': self.rescore_factor
+            })
+        else:
+            rpc = self.supabase.rpc('match_documents', params)
+        result = await asyncio.to_thread(rpc.execute)
+        return result.data
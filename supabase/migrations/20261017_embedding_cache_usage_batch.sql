@@ -0,0 +1,24 @@
+-- =============================================
+-- Phase 3: Embedding Cache - Batched Usage Accounting
+-- Version: 1.0.0
+-- Date: 2026-10-17
+-- =============================================
+-- Replaces per-hit increment_cache_use() calls with one bulk RPC.
+-- EmbeddingService accumulates use counts in memory and flushes
+-- them periodically (services/cache_usage.py).
+-- =============================================
+
+CREATE OR REPLACE FUNCTION increment_cache_use_batch(
+  hashes TEXT[],
+  counts INTEGER[],
+  last_used_at TIMESTAMPTZ[]
+)
+RETURNS void AS $$
+BEGIN
+  UPDATE embedding_cache AS c
+  SET use_count = COALESCE(c.use_count, 0) + u.use_count,
+      last_used = GREATEST(COALESCE(c.last_used, u.last_used_at), u.last_used_at)
+  FROM unnest(hashes, counts, last_used_at) AS u(text_hash, use_count, last_used_at)
+  WHERE c.text_hash = u.text_hash;
+END;
+$$ LANGUAGE plpgsql;
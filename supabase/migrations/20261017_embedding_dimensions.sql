@@ -0,0 +1,165 @@
+-- =============================================
+-- Phase 3: Configurable Embedding Dimensions
+-- Version: 1.0.0
+-- Date: 2026-10-17
+-- =============================================
+-- Lets a deployment run text-embedding-3-small at 256/512/1024 dims
+-- instead of 1536 (EMBEDDING_DIMENSIONS, utils/embedding_dimensions.py).
+-- The model is Matryoshka-trained, so existing vectors are converted by
+-- truncating and re-normalizing them; nothing has to be re-embedded.
+--
+-- Backfill path (scripts/backfill_embedding_dimensions.py drives it):
+--   1. backfill_embedding_cache(target)     cache rows keyed '<hash>:<dims>'
+--   2. backfill_chunk_embeddings(target)    batched, online, into
+--                                           document_chunks.embedding_reduced
+--   3. switch_chunk_embedding_dimensions(target)
+--                                           catch up, swap columns, rebuild
+--                                           HNSW + binary indexes (short lock)
+--   4. deploy with EMBEDDING_DIMENSIONS=target
+-- Going back to a larger size requires re-embedding the chunks.
+-- =============================================
+
+-- embedding_cache holds vectors of any configured size
+ALTER TABLE embedding_cache
+  ALTER COLUMN embedding TYPE vector;
+
+-- Staging column for the online chunk backfill
+ALTER TABLE document_chunks
+  ADD COLUMN IF NOT EXISTS embedding_reduced vector;
+
+-- Matryoshka truncation: first dims components, re-normalized
+CREATE OR REPLACE FUNCTION truncate_embedding(v vector, dims INTEGER)
+RETURNS vector AS $$
+  SELECT l2_normalize(subvector(v, 1, dims));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Derive reduced cache rows from full-size ones; returns rows inserted
+CREATE OR REPLACE FUNCTION backfill_embedding_cache(
+  target INTEGER,
+  batch_size INTEGER DEFAULT 5000
+)
+RETURNS INTEGER AS $$
+DECLARE
+  inserted INTEGER;
+BEGIN
+  INSERT INTO embedding_cache (text_hash, embedding, model, dimensions, use_count)
+  SELECT c.text_hash || ':' || target, truncate_embedding(c.embedding, target),
+         c.model, target, 0
+  FROM embedding_cache c
+  WHERE c.dimensions = 1536
+    AND position(':' IN c.text_hash) = 0
+    AND NOT EXISTS (
+      SELECT 1 FROM embedding_cache r WHERE r.text_hash = c.text_hash || ':' || target
+    )
+  LIMIT batch_size
+  ON CONFLICT (text_hash) DO NOTHING;
+
+  GET DIAGNOSTICS inserted = ROW_COUNT;
+  RETURN inserted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fill embedding_reduced for one batch of chunks; returns rows updated
+CREATE OR REPLACE FUNCTION backfill_chunk_embeddings(
+  target INTEGER,
+  batch_size INTEGER DEFAULT 5000
+)
+RETURNS INTEGER AS $$
+DECLARE
+  updated INTEGER;
+BEGIN
+  UPDATE document_chunks AS c
+  SET embedding_reduced = truncate_embedding(c.embedding, target)
+  WHERE c.id IN (
+    SELECT id FROM document_chunks
+    WHERE embedding_reduced IS NULL OR vector_dims(embedding_reduced) <> target
+    LIMIT batch_size
+  );
+
+  GET DIAGNOSTICS updated = ROW_COUNT;
+  RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Swap the reduced vectors in as document_chunks.embedding
+CREATE OR REPLACE FUNCTION switch_chunk_embedding_dimensions(target INTEGER)
+RETURNS void AS $$
+BEGIN
+  IF target NOT IN (256, 512, 1024, 1536) THEN
+    RAISE EXCEPTION 'Unsupported embedding dimensions: %', target;
+  END IF;
+
+  LOCK TABLE document_chunks IN ACCESS EXCLUSIVE MODE;
+
+  -- Rows written since the last backfill batch
+  UPDATE document_chunks
+  SET embedding_reduced = truncate_embedding(embedding, target)
+  WHERE embedding_reduced IS NULL OR vector_dims(embedding_reduced) <> target;
+
+  ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_bits;
+  DROP INDEX IF EXISTS idx_chunks_embedding_hnsw;
+  ALTER TABLE document_chunks DROP COLUMN embedding;
+  ALTER TABLE document_chunks RENAME COLUMN embedding_reduced TO embedding;
+  EXECUTE format(
+    'ALTER TABLE document_chunks ALTER COLUMN embedding TYPE vector(%s), '
+    'ALTER COLUMN embedding SET NOT NULL', target
+  );
+  ALTER TABLE document_chunks ADD COLUMN embedding_reduced vector;
+
+  CREATE INDEX idx_chunks_embedding_hnsw ON document_chunks
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+  EXECUTE format(
+    'ALTER TABLE document_chunks ADD COLUMN embedding_bits bit(%s) '
+    'GENERATED ALWAYS AS (binary_quantize(embedding)::bit(%s)) STORED', target, target
+  );
+  CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_bits
+    ON document_chunks
+    USING hnsw (embedding_bits bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Quantized search without a fixed bit length, so it works at any size
+CREATE OR REPLACE FUNCTION match_documents_quantized(
+  query_embedding vector,
+  match_threshold FLOAT DEFAULT 0.7,
+  match_count INT DEFAULT 10,
+  rescore_factor INT DEFAULT 10
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  document_title TEXT,
+  chunk_text TEXT,
+  chunk_index INT,
+  similarity FLOAT
+)
+LANGUAGE sql STABLE
+SET hnsw.ef_search = 400
+AS $$
+  WITH candidates AS (
+    SELECT dc.id
+    FROM document_chunks dc
+    ORDER BY dc.embedding_bits <~> binary_quantize(query_embedding)
+    LIMIT match_count * rescore_factor
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    d.title AS document_title,
+    dc.chunk_text,
+    dc.chunk_index,
+    1 - (dc.embedding <=> query_embedding) AS similarity
+  FROM candidates c
+  JOIN document_chunks dc ON dc.id = c.id
+  JOIN documents d ON d.id = dc.document_id
+  WHERE 1 - (dc.embedding <=> query_embedding) >= match_threshold
+  ORDER BY dc.embedding <=> query_embedding
+  LIMIT match_count;
+$$;
+
+REVOKE EXECUTE ON FUNCTION backfill_embedding_cache(INTEGER, INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION backfill_chunk_embeddings(INTEGER, INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION switch_chunk_embedding_dimensions(INTEGER) FROM PUBLIC;
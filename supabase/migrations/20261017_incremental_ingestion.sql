@@ -0,0 +1,56 @@
+-- =============================================
+-- Phase 3: Incremental Re-Ingestion
+-- Version: 1.0.0
+-- Date: 2026-10-17
+-- =============================================
+-- Stable external keys on documents and per-chunk content hashes, so
+-- DocumentSync (services/document_sync.py) can re-embed only new or
+-- changed chunks when a source document is refreshed. Keys are unique
+-- per owner, so one user's key never resolves to another user's row.
+-- =============================================
+
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS external_key TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_owner_external_key
+  ON documents(created_by, external_key)
+  WHERE external_key IS NOT NULL;
+
+-- SHA-256 (hex) of chunk_text, same as embedding_cache.text_hash
+ALTER TABLE document_chunks
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+UPDATE document_chunks
+SET content_hash = encode(sha256(convert_to(chunk_text, 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+-- Move unchanged chunks to new positions without violating
+-- UNIQUE(document_id, chunk_index): park them on negative indexes first.
+-- Only chunks of doc_id move, and only its owner (or the service role)
+-- may move them.
+CREATE OR REPLACE FUNCTION reindex_document_chunks(
+  doc_id UUID,
+  chunk_ids UUID[],
+  chunk_indexes INTEGER[]
+)
+RETURNS void AS $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM documents d
+    WHERE d.id = doc_id
+      AND (d.created_by::text = auth.uid()::text OR auth.role() = 'service_role')
+  ) THEN
+    RAISE EXCEPTION 'Not the owner of document %', doc_id;
+  END IF;
+
+  UPDATE document_chunks AS c
+  SET chunk_index = -1 - u.chunk_index
+  FROM unnest(chunk_ids, chunk_indexes) AS u(id, chunk_index)
+  WHERE c.id = u.id AND c.document_id = doc_id;
+
+  UPDATE document_chunks AS c
+  SET chunk_index = u.chunk_index
+  FROM unnest(chunk_ids, chunk_indexes) AS u(id, chunk_index)
+  WHERE c.id = u.id AND c.document_id = doc_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,66 @@
+-- =============================================
+-- Phase 3: Quantized Embeddings with Exact Rescoring
+-- Version: 1.0.0
+-- Date: 2026-10-17
+-- =============================================
+-- Binary (sign-bit) codes for every chunk embedding, produced at ingest
+-- by a generated column, with an HNSW Hamming index over them.
+-- match_documents_quantized() takes candidates from the 32× smaller
+-- bit index and rescores them with exact cosine similarity, so results
+-- and similarities match match_documents() for the rows it returns.
+--
+-- Requires pgvector >= 0.7 (bit type, binary_quantize, bit_hamming_ops).
+-- The local equivalent (int8 or binary codes beside the segment store)
+-- is services/quantized_vector_backend.py.
+-- =============================================
+
+ALTER TABLE document_chunks
+  ADD COLUMN IF NOT EXISTS embedding_bits bit(1536)
+  GENERATED ALWAYS AS (binary_quantize(embedding)::bit(1536)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_bits
+  ON document_chunks
+  USING hnsw (embedding_bits bit_hamming_ops)
+  WITH (m = 16, ef_construction = 64);
+
+-- Candidate pass on bits, exact rescoring on the float vectors.
+-- ef_search must cover match_count * rescore_factor candidates.
+CREATE OR REPLACE FUNCTION match_documents_quantized(
+  query_embedding vector(1536),
+  match_threshold FLOAT DEFAULT 0.7,
+  match_count INT DEFAULT 10,
+  rescore_factor INT DEFAULT 10
+)
+RETURNS TABLE (
+  id UUID,
+  document_id UUID,
+  document_title TEXT,
+  chunk_text TEXT,
+  chunk_index INT,
+  similarity FLOAT
+)
+LANGUAGE sql STABLE
+SET hnsw.ef_search = 400
+AS $$
+  WITH candidates AS (
+    SELECT dc.id
+    FROM document_chunks dc
+    ORDER BY dc.embedding_bits <~> binary_quantize(query_embedding)::bit(1536)
+    LIMIT match_count * rescore_factor
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    d.title AS document_title,
+    dc.chunk_text,
+    dc.chunk_index,
+    1 - (dc.embedding <=> query_embedding) AS similarity
+  FROM candidates c
+  JOIN document_chunks dc ON dc.id = c.id
+  JOIN documents d ON d.id = dc.document_id
+  WHERE 1 - (dc.embedding <=> query_embedding) >= match_threshold
+  ORDER BY dc.embedding <=> query_embedding
+  LIMIT match_count;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_documents_quantized(vector, FLOAT, INT, INT) TO authenticated;
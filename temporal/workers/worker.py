@@ -8,6 +8,7 @@ Phase 2: AI code generation (CodeGenerationWorkflow)
 
 import asyncio
 import logging
+import os
 import signal
 import sys
 from pathlib import Path
@@ -110,6 +111,38 @@ async def create_worker(client: Client) -> Worker:
     return worker
 
 
+async def warm_local_embedder():
+    """
+    Load the local embedding fallback model at startup.
+    
+    Phase 3: avoids paying model load time on the first OpenAI failure.
+    Disable with LOCAL_EMBEDDING_WARMUP=false.
+    """
+    if os.getenv("LOCAL_EMBEDDING_WARMUP", "true").lower() == "false":
+        return
+    
+    try:
+        from services.local_embedder import get_local_embedder
+        await get_local_embedder().warmup()
+        logger.info("Local embedding model warmed")
+    except Exception as e:
+        logger.warning(f"Local embedding warmup skipped: {e}")
+
+
+async def close_rag_services():
+    """
+    Drain the process-wide RAG services used by the agent nodes.
+    
+    Phase 3: drains queued RAG audit rows and flushes deferred
+    embedding-cache usage counts.
+    """
+    try:
+        from services.rag_runtime import close_rag_services as close_shared
+        await close_shared()
+    except Exception as e:
+        logger.warning(f"RAG services shutdown skipped: {e}")
+
+
 async def main():
     """
     Main worker entry point.
@@ -134,6 +167,8 @@ async def main():
         )
         logger.info("Connected to Temporal Server successfully")
         
+        await warm_local_embedder()
+        
         # Create worker
         _worker_instance = await create_worker(client)
         
@@ -151,6 +186,7 @@ async def main():
         logger.error(f"Worker error: {e}", exc_info=True)
         raise
     finally:
+        await close_rag_services()
         logger.info("Worker shutdown complete")
 
 
@@ -0,0 +1,170 @@
+"""
+Phase 3: ACL Cache
+
+TTL caches behind ACLHelper, so permission checks on hot paths (RAG
+post-filtering, listings) are mostly answered without Supabase:
+- teams: per user, the team ids from team_members
+- grants: per user, document ids granted to the user or to their teams
+- documents: per document, the ACL columns of the row; answers that
+  depend on the caller's RLS view (row not returned, or returned
+  without ACL columns) are kept per (user, document) instead, so one
+  process-wide cache can serve every ACLHelper
+
+Access is decided with the ADR-012 rule (owner, team member of a
+team-visible document, explicit grant, public). ACLHelper invalidates a
+user on grant/revoke; team membership and visibility changes made
+elsewhere are picked up when entries expire.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import time
+
+ACL_COLUMNS = ('created_by', 'visibility', 'team_id')
+
+
+@dataclass(frozen=True)
+class DocumentACL:
+    """The columns of a documents row that decide who may read it."""
+    created_by: Optional[str] = None
+    visibility: Optional[str] = None
+    team_id: Optional[str] = None
+    rls_checked: bool = False  # row came back without ACL columns: RLS already decided
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'DocumentACL':
+        if not all(column in row for column in ACL_COLUMNS):
+            return cls(rls_checked=True)
+        return cls(*(row[column] for column in ACL_COLUMNS))
+
+    def needs_principals(self, user_id: str) -> bool:
+        """True unless RLS, ownership or public visibility settle it alone."""
+        return not (self.rls_checked or self.created_by == user_id or self.visibility == 'public')
+
+    def allows(self, user_id: str, document_id: str, teams: Set[str], grants: Set[str]) -> bool:
+        return (
+            not self.needs_principals(user_id)
+            or (self.visibility == 'team' and self.team_id in teams)
+            or document_id in grants
+        )
+
+
+class TTLMap:
+    """Bounded LRU map whose entries expire ttl_seconds after being stored."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """Fresh values by key, and the keys that are missing or expired."""
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    self._entries.pop(key, None)
+                    missing.append(key)
+        return found, missing
+
+    def put_many(self, items: Dict[Hashable, Any]):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[Hashable]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ACLCache:
+    """Per-user principals and per-document ACL columns, with TTL."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_users: int = 10_000, max_documents: int = 100_000):
+        """
+        Args:
+            ttl_seconds: Maximum age of any cached entry (bounds staleness
+                of changes not made through ACLHelper)
+            max_users: LRU bound on users with cached teams / grants
+            max_documents: LRU bound on cached documents
+        """
+        self.teams = TTLMap(ttl_seconds, max_users)
+        self.grants = TTLMap(ttl_seconds, max_users)
+        self.documents = TTLMap(ttl_seconds, max_documents)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup_documents(self, user_id: str, document_ids: List[str]) -> Tuple[Dict[str, Optional[DocumentACL]], List[str]]:
+        """Cached ACLs (shared, then the user's RLS view) and the ids still missing."""
+        found, missing = self.documents.lookup(document_ids)
+        if missing:
+            viewed, _ = self.documents.lookup([(user_id, doc_id) for doc_id in missing])
+            found.update((doc_id, acl) for (_, doc_id), acl in viewed.items())
+            missing = [doc_id for doc_id in missing if doc_id not in found]
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def put_documents(self, user_id: str, acls: Dict[str, Optional[DocumentACL]]):
+        self.documents.put_many({
+            doc_id if acl is not None and not acl.rls_checked else (user_id, doc_id): acl
+            for doc_id, acl in acls.items()
+        })
+
+    def invalidate_user(self, user_id: str):
+        """Drop a user's teams and grants (grant/revoke, membership change)."""
+        self.teams.discard([user_id])
+        self.grants.discard([user_id])
+
+    def invalidate_documents(self, document_ids: Iterable[str], user_id: Optional[str] = None):
+        """Drop documents whose visibility, team or existence changed."""
+        document_ids = list(document_ids)
+        self.documents.discard(document_ids + [(user_id, doc_id) for doc_id in document_ids])
+
+    def clear(self):
+        for cache in (self.teams, self.grants, self.documents):
+            cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'users': len(self.teams),
+            'documents': len(self.documents),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+_shared_cache: Optional[ACLCache] = None
+
+
+def get_shared_acl_cache() -> ACLCache:
+    """
+    Process-wide cache, so a grant or revoke through any ACLHelper is
+    seen by every other helper (e.g. the one inside RAGService).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ACLCache()
+    return _shared_cache
@@ -3,10 +3,17 @@ Phase 3: ACL Helper Utilities
 
 Application-level permission checking (defense in depth).
 Complements PostgreSQL RLS (ADR-012).
+
+Team memberships, explicit grants and document ACL columns are cached
+(ACLCache via ACLResolver), so bulk checks like RAG post-filtering
+usually cost no queries.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
+from services.rag_cache import RAGResultCache, get_shared_rag_cache
+from utils.acl_cache import ACLCache
+from utils.acl_resolver import ACLResolver
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +21,50 @@ logger = logging.getLogger(__name__)
 class ACLHelper:
     """Helper functions for ACL validation and permission checks."""
     
-    def __init__(self, supabase_client):
+    def __init__(
+        self,
+        supabase_client,
+        rag_cache: Optional[RAGResultCache] = None,
+        acl_cache: Optional[ACLCache] = None,
+        in_chunk_size: int = 200,
+        max_concurrency: int = 4
+    ):
         """
         Initialize ACL helper.
         
         Args:
             supabase_client: Supabase client (with user JWT)
+            rag_cache: RAG result cache to invalidate on ACL changes
+                (shared if None)
+            acl_cache: Cache of teams, grants and document ACL columns
+                (shared if None)
+            in_chunk_size: Values per in_() filter on cache misses
+            max_concurrency: Chunked queries in flight at once
         """
         self.supabase = supabase_client
+        self.rag_cache = rag_cache or get_shared_rag_cache()
+        self.resolver = ACLResolver(supabase_client, acl_cache, in_chunk_size, max_concurrency)
+        self.acl_cache = self.resolver.cache
+    
+    async def can_access_many(self, user_id: str, document_ids: List[str]) -> Dict[str, bool]:
+        """
+        Check access to many documents at once.
+        
+        Mostly answered from cache; teams and grants are loaded only if
+        some document is neither owned by the user nor public.
+        
+        Args:
+            user_id: User UUID
+            document_ids: Document UUIDs (duplicates allowed)
+            
+        Returns:
+            Access decision per distinct document id (False on errors)
+        """
+        try:
+            return await self.resolver.can_access_many(user_id, document_ids)
+        except Exception as e:
+            logger.error(f"Access check failed: {e}")
+            return dict.fromkeys(document_ids, False)
     
     async def user_can_access_document(
         self,
@@ -41,25 +84,11 @@ class ACLHelper:
         Returns:
             True if user can access, False otherwise
         """
-        try:
-            # Query with user's JWT (RLS enforced)
-            result = self.supabase.table('documents')\
-                .select('id')\
-                .eq('id', document_id)\
-                .execute()
-            
-            # If RLS allows, result will contain the document
-            return len(result.data) > 0
-            
-        except Exception as e:
-            logger.error(f"Access check failed: {e}")
-            return False
+        return (await self.can_access_many(user_id, [document_id]))[document_id]
     
     async def get_user_teams(self, user_id: str) -> List[str]:
         """
-        Get all team IDs user belongs to.
-        
-        Useful for caching and permission checks.
+        Get all team IDs user belongs to (cached).
         
         Args:
             user_id: User UUID
@@ -68,13 +97,7 @@ class ACLHelper:
             List of team UUIDs
         """
         try:
-            result = self.supabase.table('team_members')\
-                .select('team_id')\
-                .eq('user_id', user_id)\
-                .execute()
-            
-            return [row['team_id'] for row in result.data]
-            
+            return list(await self.resolver.teams(user_id))
         except Exception as e:
             logger.error(f"Failed to get user teams: {e}")
             return []
@@ -92,23 +115,12 @@ class ACLHelper:
             document_ids: List of document UUIDs
             
         Returns:
-            Filtered list of document UUIDs user can access
+            Distinct authorized document UUIDs, in input order
         """
         if not document_ids:
             return []
-        
-        try:
-            # Query with user's JWT (RLS filters)
-            result = self.supabase.table('documents')\
-                .select('id')\
-                .in_('id', document_ids)\
-                .execute()
-            
-            return [row['id'] for row in result.data]
-            
-        except Exception as e:
-            logger.error(f"Permission filtering failed: {e}")
-            return []
+        allowed = await self.can_access_many(user_id, document_ids)
+        return [doc_id for doc_id, ok in allowed.items() if ok]
     
     async def grant_permission(
         self,
@@ -137,6 +149,7 @@ class ACLHelper:
                 'granted_by': granted_by
             }).execute()
             
+            self._invalidate(document_id, user_id)
             logger.info(
                 f"Granted {permission} on {document_id} to user {user_id}"
             )
@@ -168,9 +181,16 @@ class ACLHelper:
                 .eq('user_id', user_id)\
                 .execute()
             
+            self._invalidate(document_id, user_id)
             logger.info(f"Revoked permission on {document_id} from user {user_id}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to revoke permission: {e}")
             return False
+    
+    def _invalidate(self, document_id: str, user_id: str):
+        """Forget everything a grant or revoke may have changed."""
+        self.acl_cache.invalidate_user(user_id)
+        self.acl_cache.invalidate_documents([document_id], user_id)
+        self.rag_cache.invalidate_user(user_id)
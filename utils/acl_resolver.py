@@ -0,0 +1,93 @@
+"""
+Phase 3: ACL Resolver
+
+Cached access decisions for ACLHelper:
+- teams, grants and document ACL columns come from ACLCache when fresh
+- misses for many ids are fetched with chunked in_() filters
+  (utils.supabase_batch), so long id lists stay under URL-length limits
+- teams and grants are loaded only if some document is neither owned
+  by the user nor public (nor already decided by RLS)
+
+Errors propagate; ACLHelper turns them into denials.
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Set
+import asyncio
+
+from utils.acl_cache import ACL_COLUMNS, ACLCache, DocumentACL, get_shared_acl_cache
+from utils.supabase_batch import select_in
+
+
+class ACLResolver:
+    """Answers access checks from ACLCache, querying Supabase on misses."""
+
+    def __init__(
+        self,
+        supabase_client,
+        cache: Optional[ACLCache] = None,
+        in_chunk_size: int = 200,
+        max_concurrency: int = 4
+    ):
+        """
+        Args:
+            supabase_client: Supabase client (with user JWT)
+            cache: Teams, grants and document cache (shared if None)
+            in_chunk_size: Values per in_() filter
+            max_concurrency: Chunked queries in flight at once
+        """
+        self.supabase = supabase_client
+        self.cache = cache or get_shared_acl_cache()
+        self.in_chunk_size = in_chunk_size
+        self.max_concurrency = max_concurrency
+
+    async def _select_in(self, table: str, columns: str, column: str, values: List[str]) -> List[Dict]:
+        return await select_in(
+            self.supabase, table, columns, column, values, self.in_chunk_size, self.max_concurrency
+        )
+
+    async def teams(self, user_id: str) -> List[str]:
+        """Team ids of the user."""
+        found, _ = self.cache.teams.lookup([user_id])
+        if user_id not in found:
+            query = self.supabase.table('team_members').select('team_id').eq('user_id', user_id)
+            found[user_id] = [row['team_id'] for row in (await asyncio.to_thread(query.execute)).data]
+            self.cache.teams.put_many(found)
+        return found[user_id]
+
+    async def grants(self, user_id: str, teams: List[str]) -> FrozenSet[str]:
+        """Documents granted to the user directly or through one of teams."""
+        found, _ = self.cache.grants.lookup([user_id])
+        if user_id not in found:
+            query = self.supabase.table('document_permissions').select('document_id').eq('user_id', user_id)
+            rows = list((await asyncio.to_thread(query.execute)).data)
+            if teams:
+                rows += await self._select_in('document_permissions', 'document_id', 'team_id', teams)
+            found[user_id] = frozenset(row['document_id'] for row in rows)
+            self.cache.grants.put_many(found)
+        return found[user_id]
+
+    async def document_acls(self, user_id: str, document_ids: List[str]) -> Dict[str, Optional[DocumentACL]]:
+        """ACL columns per document; None if the row did not come back."""
+        acls, missing = self.cache.lookup_documents(user_id, document_ids)
+        if missing:
+            # Query with user's JWT (RLS filters)
+            rows = await self._select_in('documents', 'id, ' + ', '.join(ACL_COLUMNS), 'id', missing)
+            fetched = dict.fromkeys(missing)
+            fetched.update((row['id'], DocumentACL.from_row(row)) for row in rows)
+            self.cache.put_documents(user_id, fetched)
+            acls.update(fetched)
+        return acls
+
+    async def can_access_many(self, user_id: str, document_ids: List[str]) -> Dict[str, bool]:
+        """Access decision per distinct document id, in input order."""
+        document_ids = list(dict.fromkeys(document_ids))
+        acls = await self.document_acls(user_id, document_ids)
+        teams: Set[str] = set()
+        grants: FrozenSet[str] = frozenset()
+        if any(acl is not None and acl.needs_principals(user_id) for acl in acls.values()):
+            teams = set(await self.teams(user_id))
+            grants = await self.grants(user_id, sorted(teams))
+        return {
+            doc_id: acls[doc_id] is not None and acls[doc_id].allows(user_id, doc_id, teams, grants)
+            for doc_id in document_ids
+        }
@@ -0,0 +1,101 @@
+"""
+Phase 3: Local BPE Tokenizer
+
+Pure-Python byte-pair encoding compatible with tiktoken rank files
+(e.g. cl100k_base.tiktoken), for exact counts when the tiktoken package
+is unavailable. Text is pre-tokenized with the cl100k split pattern and
+each piece is merged by rank; merges are memoized per piece, so repeated
+words cost one dictionary lookup.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import base64
+import re
+
+from utils.tokenizer import Tokenizer
+
+try:
+    import regex as _regex
+
+    CL100K_PATTERN = _regex.compile(
+        r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+    )
+except ImportError:
+    # stdlib approximation: \w-based letter/number classes
+    CL100K_PATTERN = re.compile(
+        r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+    )
+
+
+def load_tiktoken_ranks(path: str) -> Dict[bytes, int]:
+    """
+    Load a tiktoken rank file ("<base64 token> <rank>" per line).
+
+    Args:
+        path: Path to the .tiktoken file
+
+    Returns:
+        Mapping of token bytes to merge rank (= token id)
+    """
+    ranks = {}
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+class BPETokenizer(Tokenizer):
+    """Byte-level BPE over a rank table."""
+
+    def __init__(
+        self,
+        ranks: Dict[bytes, int],
+        pattern: "re.Pattern" = CL100K_PATTERN,
+        piece_cache_size: int = 65536
+    ):
+        """
+        Args:
+            ranks: Token bytes → rank (lower merges first)
+            pattern: Pre-tokenization regex
+            piece_cache_size: Memoized pieces (words) kept
+        """
+        self.ranks = ranks
+        self.pattern = pattern
+        self._bpe = lru_cache(maxsize=piece_cache_size)(self._merge)
+
+    @classmethod
+    def from_tiktoken_file(cls, path: str, **kwargs) -> "BPETokenizer":
+        return cls(load_tiktoken_ranks(path), **kwargs)
+
+    def _merge(self, piece: bytes) -> Tuple[bytes, ...]:
+        """Apply merges in rank order until no adjacent pair is a token."""
+        if piece in self.ranks:
+            return (piece,)
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank, best_i = None, -1
+            for i in range(len(parts) - 1):
+                rank = self.ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_i = rank, i
+            if best_i < 0:
+                break
+            parts[best_i:best_i + 2] = [parts[best_i] + parts[best_i + 1]]
+        return tuple(parts)
+
+    def _pieces(self, text: str) -> List[bytes]:
+        return [m.encode('utf-8') for m in self.pattern.findall(text)]
+
+    def encode(self, text: str) -> List[int]:
+        """Token ids (bytes without a rank map to -1)."""
+        return [
+            self.ranks.get(token, -1)
+            for piece in self._pieces(text)
+            for token in self._bpe(piece)
+        ]
+
+    def count(self, text: str) -> int:
+        return sum(len(self._bpe(piece)) for piece in self._pieces(text))
@@ -0,0 +1,44 @@
+"""
+Phase 3: Embedding Dimensions
+
+Deployment-wide embedding size. text-embedding-3-small is trained so
+that a prefix of its 1536-d vector, re-normalized, is itself a usable
+embedding (Matryoshka representation), and the API can return the
+shorter vector directly. 256 or 512 dims cut storage, ANN search time
+and transfer per query 3-6× at a small recall cost.
+
+Configured with the EMBEDDING_DIMENSIONS environment variable; every
+component (API request, cache keys, chunk storage, query embedding)
+reads it through get_embedding_dimensions().
+"""
+
+import os
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+SUPPORTED_DIMENSIONS = (256, 512, 1024, 1536)
+
+
+def check_dimensions(dimensions: int) -> int:
+    """Return dimensions if supported, else raise ValueError."""
+    if dimensions not in SUPPORTED_DIMENSIONS:
+        raise ValueError(
+            f"Unsupported embedding dimensions {dimensions}; expected one of {SUPPORTED_DIMENSIONS}"
+        )
+    return dimensions
+
+
+def get_embedding_dimensions() -> int:
+    """Configured embedding size (EMBEDDING_DIMENSIONS, default 1536)."""
+    return check_dimensions(int(os.getenv('EMBEDDING_DIMENSIONS', DEFAULT_EMBEDDING_DIMENSIONS)))
+
+
+def cache_key(text_hash: str, dimensions: int) -> str:
+    """
+    embedding_cache key for a text at a given size.
+
+    Full-size vectors keep the bare hash, so rows cached before
+    dimensions became configurable stay valid.
+    """
+    if dimensions == DEFAULT_EMBEDDING_DIMENSIONS:
+        return text_hash
+    return f"{text_hash}:{dimensions}"
@@ -0,0 +1,45 @@
+"""
+Phase 3: File Discovery
+
+Expands ingestion sources (files, directory trees, globs) into a
+deduplicated list of text file paths.
+"""
+
+from typing import Iterator, List, Sequence
+import glob
+import os
+
+DEFAULT_EXTENSIONS = ('.md', '.markdown', '.txt', '.rst')
+
+
+def _walk(directory: str) -> Iterator[str]:
+    """Files under directory in sorted order, hidden entries skipped."""
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        yield from (os.path.join(root, name) for name in sorted(files) if not name.startswith('.'))
+
+
+def discover_files(sources: Sequence[str], extensions: Sequence[str] = DEFAULT_EXTENSIONS) -> List[str]:
+    """
+    Files named directly, under directories, or matching globs.
+
+    Args:
+        sources: File paths, directories (walked recursively) or glob
+            patterns (** matches across directories)
+        extensions: Suffixes kept from directories and globs (files
+            named directly are always kept)
+
+    Returns:
+        Normalized paths, deduplicated, in discovery order
+    """
+    found = {}
+    suffixes = tuple(ext.lower() for ext in extensions)
+    for source in sources:
+        if os.path.isfile(source):
+            found[os.path.normpath(source)] = None
+            continue
+        paths = _walk(source) if os.path.isdir(source) else sorted(glob.glob(source, recursive=True))
+        for path in paths:
+            if path.lower().endswith(suffixes) and os.path.isfile(path):
+                found[os.path.normpath(path)] = None
+    return list(found)
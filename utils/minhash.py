@@ -0,0 +1,91 @@
+"""
+Phase 3: MinHash Signatures
+
+Near-duplicate detection for chunk text without embeddings:
+- text is reduced to hashed word 5-gram shingles (case and whitespace
+  insensitive), computed with vectorized rolling arithmetic
+- a MinHash signature keeps the minimum of num_perm universal hash
+  permutations over the shingles; the fraction of equal positions in
+  two signatures estimates the Jaccard similarity of their shingle sets
+- LSH band keys (bands × rows_per_band = num_perm) hash signature slices
+  so that similar texts share a band key with high probability:
+  P(candidate) = 1 - (1 - J^rows)^bands, ~0.71 threshold at 16 × 8
+"""
+
+from typing import List, Optional, Sequence
+import re
+import zlib
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 32) - 5)   # (p-1)^2 + p < 2^64: no overflow
+_ROLL = np.uint64(1_000_003)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, k: int = 5) -> np.ndarray:
+    """
+    Hashes of the word k-grams of text (uint64, deduplicated).
+
+    Text shorter than k words is one shingle; empty text has none.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    k = min(k, len(hashes))
+    grams = np.zeros(len(hashes) - k + 1, dtype=np.uint64)
+    for offset in range(k):
+        grams = (grams * _ROLL + hashes[offset:offset + len(grams)]) & _MASK32
+    return np.unique(grams)
+
+
+class MinHasher:
+    """MinHash signatures with a fixed, seeded set of permutations."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1, shingle_size: int = 5):
+        """
+        Args:
+            num_perm: Signature length (estimate error ~ 1/sqrt(num_perm))
+            seed: Permutation seed; signatures are only comparable
+                between hashers with the same num_perm and seed
+            shingle_size: Words per shingle
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.seed = seed
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """uint32 signature of text, or None if it has no words."""
+        grams = shingles(text, self.shingle_size)
+        if not len(grams):
+            return None
+        permuted = (self._a * (grams % _PRIME)[None, :] + self._b) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        return [self.signature(text) for text in texts]
+
+
+def estimate_similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of one signature to each row of others."""
+    return (np.asarray(others) == signature).mean(axis=-1)
+
+
+def band_keys(signature: np.ndarray, bands: int) -> List[int]:
+    """
+    One 64-bit LSH key per band.
+
+    Keys are mixed with the band number, so equal slices in different
+    bands never collide and one hash table serves every band.
+    """
+    rows = signature.reshape(bands, -1).astype(np.uint64)
+    weights = np.uint64(0x9E3779B97F4A7C15) ** np.arange(1, rows.shape[1] + 1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        mixed = (rows * weights).sum(axis=1, dtype=np.uint64)
+        mixed += np.arange(bands, dtype=np.uint64) * np.uint64(0xBF58476D1CE4E5B9)
+    return mixed.tolist()
@@ -0,0 +1,108 @@
+"""
+Phase 3: Vector Quantization
+
+Compact codes for a first search pass over unit-normalized embeddings:
+- int8: per-vector symmetric scalar quantization (D + 4 bytes, ~4× smaller
+  than float32; scores within ~1% of exact)
+- binary: one sign bit per dimension packed 8 per byte (D / 8 bytes, 32×
+  smaller), scored by Hamming distance
+
+Codes only rank candidates. Callers rescore the top candidates against
+the exact float32 vectors, so returned similarities are exact.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from utils.vector_utils import as_matrix
+
+QUANTIZATION_MODES = ('int8', 'binary')
+
+_INT8_BLOCK = 1024  # rows widened per step in int8_scores
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scalar-quantize rows to int8.
+
+    Args:
+        vectors: N×D (or D) float vectors
+
+    Returns:
+        (N×D int8 codes, N float32 scales) with row ≈ codes * scale
+    """
+    matrix = as_matrix(vectors).astype(np.float32, copy=False)
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Approximate dot products of int8 rows with a float32 query.
+
+    Rows are widened to float32 a cache-sized block at a time through one
+    reused buffer, instead of materializing a full float32 copy.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    out = np.empty(len(codes), dtype=np.float32)
+    buffer = np.empty((min(_INT8_BLOCK, len(codes)), codes.shape[1]), dtype=np.float32)
+    for start in range(0, len(codes), _INT8_BLOCK):
+        block = codes[start:start + _INT8_BLOCK]
+        np.copyto(buffer[:len(block)], block, casting='unsafe')
+        np.matmul(buffer[:len(block)], query, out=out[start:start + len(block)])
+    return out * scales
+
+
+def quantize_binary(vectors) -> np.ndarray:
+    """
+    Pack the sign bit of every dimension (1 = positive).
+
+    Returns:
+        N×ceil(D/8) uint8 codes
+    """
+    return np.packbits(as_matrix(vectors) > 0, axis=1)
+
+
+def popcount(codes: np.ndarray) -> np.ndarray:
+    """Set bits per element (NumPy >= 2 has a native kernel)."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(codes)
+    return _POPCOUNT[codes.view(np.uint8)].reshape(codes.shape + (-1,)).sum(axis=-1)
+
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    """
+    Hamming distance between every packed row and a packed query.
+
+    Rows are compared 64 bits at a time when the width allows it.
+    """
+    xor = np.bitwise_xor(codes, query_code)
+    if xor.shape[1] % 8 == 0 and xor.flags['C_CONTIGUOUS']:
+        xor = xor.view(np.uint64)
+    return popcount(xor).sum(axis=1, dtype=np.int32)
+
+
+def binary_scores(codes: np.ndarray, query_code: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Cosine estimate from sign agreement: cos(pi * hamming / D).
+
+    Monotone in Hamming distance, so it ranks exactly like it.
+    """
+    hamming = hamming_distances(codes, query_code)
+    return np.cos(np.pi * hamming / dimensions).astype(np.float32)
+
+
+def code_bytes(dimensions: int, mode: str = 'float32') -> int:
+    """Bytes per vector for a representation ('float32', 'int8', 'binary')."""
+    if mode == 'float32':
+        return dimensions * 4
+    if mode == 'int8':
+        return dimensions + 4
+    if mode == 'binary':
+        return (dimensions + 7) // 8
+    raise ValueError(f"Unknown quantization mode: {mode}")
@@ -0,0 +1,72 @@
+"""
+Phase 3: Chunked Supabase Filters
+
+PostgREST encodes in_() filters in the request URL, so long id lists
+exceed URL-length limits. These helpers split the values into chunks
+and run one query per chunk, a bounded number at a time.
+"""
+
+from typing import Callable, Dict, List
+import asyncio
+
+
+async def run_in_chunks(
+    make_query: Callable[[List[str]], object],
+    values: List[str],
+    chunk_size: int = 200,
+    max_concurrency: int = 4
+) -> List[Dict]:
+    """
+    Execute make_query(chunk) for every chunk of values.
+
+    Args:
+        make_query: Builds the query for one chunk of values
+        values: Filter values (any length)
+        chunk_size: Values per query
+        max_concurrency: Queries in flight at once
+
+    Returns:
+        Rows of every chunk, in chunk order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(chunk: List[str]) -> List[Dict]:
+        async with semaphore:
+            query = make_query(chunk)
+            return (await asyncio.to_thread(query.execute)).data or []
+
+    pages = await asyncio.gather(*(
+        fetch(values[i:i + chunk_size]) for i in range(0, len(values), chunk_size)
+    ))
+    return [row for page in pages for row in page]
+
+
+async def select_in(
+    supabase,
+    table: str,
+    columns: str,
+    column: str,
+    values: List[str],
+    chunk_size: int = 200,
+    max_concurrency: int = 4
+) -> List[Dict]:
+    """Rows of table where column is in values (chunked in_() filters)."""
+    return await run_in_chunks(
+        lambda chunk: supabase.table(table).select(columns).in_(column, chunk),
+        values, chunk_size, max_concurrency
+    )
+
+
+async def delete_in(
+    supabase,
+    table: str,
+    column: str,
+    values: List[str],
+    chunk_size: int = 200,
+    max_concurrency: int = 4
+) -> List[Dict]:
+    """Delete rows of table where column is in values (chunked in_() filters)."""
+    return await run_in_chunks(
+        lambda chunk: supabase.table(table).delete().in_(column, chunk),
+        values, chunk_size, max_concurrency
+    )
@@ -0,0 +1,19 @@
+"""
+Tests for ingestion source expansion (discover_files).
+"""
+
+import os
+
+from utils.file_discovery import discover_files
+
+
+def test_directories_globs_and_files_are_expanded_once(tmp_path):
+    for name in ('a.md', 'sub/b.txt', 'sub/c.py', '.hidden/d.md', 'sub/.e.md'):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+    root = str(tmp_path)
+
+    found = discover_files([root, os.path.join(root, '**', '*.md'), os.path.join(root, 'sub', 'c.py')])
+
+    assert [os.path.relpath(p, root) for p in found] == ['a.md', os.path.join('sub', 'b.txt'), os.path.join('sub', 'c.py')]
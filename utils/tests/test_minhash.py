@@ -0,0 +1,42 @@
+"""
+Tests for MinHash signatures and LSH band keys.
+"""
+
+import numpy as np
+from utils.minhash import MinHasher, band_keys, estimate_similarity, shingles
+
+
+def words(start, count):
+    return ' '.join(f"w{i}" for i in range(start, start + count))
+
+
+def test_shingles_ignore_case_and_whitespace():
+    assert np.array_equal(shingles("Alpha  beta\ngamma delta epsilon"), shingles("alpha beta gamma delta EPSILON"))
+    assert len(shingles("")) == 0
+    assert len(shingles("two words")) == 1
+
+
+def test_signature_similarity_tracks_jaccard():
+    """200-word texts sharing 180 words: Jaccard of 5-grams ~0.8"""
+    hasher = MinHasher(num_perm=256)
+    a, b, c = hasher.signatures([words(0, 200), words(20, 200), words(1000, 200)])
+    shared = len(np.intersect1d(shingles(words(0, 200)), shingles(words(20, 200))))
+    union = len(np.union1d(shingles(words(0, 200)), shingles(words(20, 200))))
+
+    estimates = estimate_similarity(a, np.stack([b, c]))
+
+    assert abs(estimates[0] - shared / union) < 0.1
+    assert estimates[1] < 0.05
+    assert hasher.signature("") is None
+
+
+def test_band_keys_match_for_identical_bands_only():
+    hasher = MinHasher()
+    a, b = hasher.signatures([words(0, 100), words(0, 100)])
+    c = hasher.signature(words(500, 100))
+    assert band_keys(a, 16) == band_keys(b, 16)
+    assert not set(band_keys(a, 16)) & set(band_keys(c, 16))
+    # Same slice in another band position gives another key
+    flat = np.zeros(128, dtype=np.uint32)
+    keys = band_keys(flat, 16)
+    assert len(set(keys)) == 16
@@ -0,0 +1,71 @@
+"""
+Tests for vector quantization
+
+int8 and binary codes, Hamming scoring and code sizes.
+"""
+
+import numpy as np
+import pytest
+from utils.quantization import (
+    binary_scores,
+    code_bytes,
+    hamming_distances,
+    int8_scores,
+    popcount,
+    quantize_binary,
+    quantize_int8,
+)
+from utils.vector_utils import normalize_matrix
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    return normalize_matrix(rng.normal(size=(200, 128)).astype(np.float32))
+
+
+def test_int8_scores_close_to_exact(corpus):
+    """int8 dot products stay within quantization error of float32"""
+    codes, scales = quantize_int8(corpus)
+    query = corpus[0]
+
+    assert codes.dtype == np.int8 and scales.shape == (200,)
+    assert np.abs(codes).max() == 127
+    assert int8_scores(codes, scales, query) == pytest.approx(corpus @ query, abs=0.01)
+
+
+def test_int8_zero_vector():
+    """All-zero rows quantize to zero codes without dividing by zero"""
+    codes, scales = quantize_int8(np.zeros((1, 4), np.float32))
+    assert codes.tolist() == [[0, 0, 0, 0]]
+    assert scales.tolist() == [1.0]
+
+
+def test_binary_codes_and_hamming():
+    """Sign bits are packed 8 per byte and compared by popcount"""
+    vectors = np.array([[1, -1, 1, -1, 1, -1, 1, -1, 1], [-1] * 9], dtype=np.float32)
+    codes = quantize_binary(vectors)
+
+    assert codes.shape == (2, 2)
+    assert codes[0].tolist() == [0b10101010, 0b10000000]
+    assert hamming_distances(codes, codes[0]).tolist() == [0, 5]
+    assert popcount(np.array([255, 1], np.uint8)).tolist() == [8, 1]
+
+
+def test_binary_scores_rank_like_hamming(corpus):
+    """Wide codes (compared as uint64 words) rank the query first"""
+    codes = quantize_binary(corpus)
+    scores = binary_scores(codes, codes[5], corpus.shape[1])
+
+    assert scores[5] == pytest.approx(1.0)
+    assert np.argsort(-scores, kind='stable').tolist() == \
+        np.argsort(hamming_distances(codes, codes[5]), kind='stable').tolist()
+
+
+def test_code_bytes():
+    """Memory per 1536-d vector: 4×, ~4×, 32× reductions"""
+    assert code_bytes(1536) == 6144
+    assert code_bytes(1536, 'int8') == 1540
+    assert code_bytes(1536, 'binary') == 192
+    with pytest.raises(ValueError):
+        code_bytes(1536, 'pq')
@@ -0,0 +1,70 @@
+"""
+Tests for the tokenizer layer (utils/tokenizer.py, utils/bpe_tokenizer.py).
+"""
+
+import base64
+
+from utils.bpe_tokenizer import BPETokenizer, load_tiktoken_ranks
+from utils.tokenizer import CachedTokenCounter, HeuristicTokenizer, Tokenizer
+
+
+def _ranks():
+    tokens = [bytes([b]) for b in range(256)] + [b'he', b'll', b'hell', b'hello', b' w', b' wo', b' wor']
+    return {token: rank for rank, token in enumerate(tokens)}
+
+
+class CountingTokenizer(Tokenizer):
+    def __init__(self):
+        self.batches = []
+
+    def count(self, text):
+        return len(text.split())
+
+    def count_many(self, texts):
+        texts = list(texts)
+        self.batches.append(texts)
+        return [self.count(t) for t in texts]
+
+
+def test_bpe_merges_by_rank(tmp_path):
+    path = tmp_path / 'toy.tiktoken'
+    path.write_bytes(b''.join(
+        base64.b64encode(token) + b' ' + str(rank).encode() + b'\n'
+        for token, rank in _ranks().items()
+    ))
+    tokenizer = BPETokenizer(load_tiktoken_ranks(str(path)))
+
+    # "hello" is a single token; " world" → " wor" + "l" + "d"
+    assert tokenizer.count('hello') == 1
+    assert tokenizer.count('hello world') == 4
+    assert tokenizer.encode('hello') == [_ranks()[b'hello']]
+    assert tokenizer.count('') == 0
+
+
+def test_bpe_counts_non_ascii_bytes():
+    tokenizer = BPETokenizer(_ranks())
+    assert tokenizer.count('é') == 2  # two UTF-8 bytes, no merge
+
+
+def test_cached_counter_batches_misses_once():
+    backend = CountingTokenizer()
+    counter = CachedTokenCounter(backend, max_entries=10)
+
+    assert counter.count_many(['a b', 'c', 'a b']) == [2, 1, 2]
+    assert backend.batches == [['a b', 'c']]
+    assert counter.count_many(['c', 'd e f']) == [1, 3]
+    assert backend.batches[-1] == ['d e f']
+    assert counter.stats()['hits'] >= 1
+
+
+def test_cached_counter_evicts_lru():
+    counter = CachedTokenCounter(CountingTokenizer(), max_entries=2)
+    counter.count_many(['a', 'b', 'c'])
+    assert counter.stats()['entries'] == 2
+
+
+def test_heuristic_matches_legacy_estimate():
+    tokenizer = HeuristicTokenizer()
+    assert tokenizer.count('x' * 40) == 10
+    assert tokenizer.count('abc') == 1
+    assert tokenizer.count('') == 0
@@ -0,0 +1,122 @@
+"""
+Tests for vector utilities
+
+NumPy similarity kernels and their single-vector wrappers.
+"""
+
+import json
+import math
+import numpy as np
+import pytest
+from utils.vector_utils import (
+    cosine_similarity,
+    cosine_similarity_many,
+    cosine_similarity_matrix,
+    normalize_matrix,
+    normalize_vector,
+    top_k,
+    truncate_embeddings,
+    validate_vector_dimensions,
+    vector_to_string,
+)
+from utils.embedding_dimensions import cache_key, get_embedding_dimensions
+
+
+def test_cosine_similarity_wrapper():
+    """Single-pair wrapper matches the textbook formula"""
+    assert cosine_similarity([1, 0], [1, 1]) == pytest.approx(1 / math.sqrt(2))
+    assert cosine_similarity([0, 0], [1, 1]) == 0.0
+    with pytest.raises(ValueError):
+        cosine_similarity([1, 2], [1, 2, 3])
+
+
+def test_normalize_vector_wrapper():
+    """Normalization keeps full precision for Python lists"""
+    assert normalize_vector([3, 4]) == [0.6, 0.8]
+    assert normalize_vector([0, 0]) == [0.0, 0.0]
+
+
+def test_normalize_matrix_rows_are_unit_length():
+    """Every non-zero row is scaled to unit norm; zero rows stay zero"""
+    matrix = np.array([[3, 4], [0, 0], [1, 1]], dtype=np.float32)
+    normalized = normalize_matrix(matrix)
+
+    assert normalized.dtype == np.float32
+    assert np.linalg.norm(normalized, axis=1) == pytest.approx([1, 0, 1], abs=1e-6)
+
+
+def test_similarity_matrix_matches_pairwise():
+    """N×M kernel agrees with the pairwise wrapper"""
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(4, 16)), rng.normal(size=(3, 16))
+
+    sims = cosine_similarity_matrix(a, b)
+
+    assert sims.shape == (4, 3)
+    for i in range(4):
+        for j in range(3):
+            assert sims[i, j] == pytest.approx(cosine_similarity(a[i], b[j]), abs=1e-6)
+    assert cosine_similarity_many(a[0], b) == pytest.approx(sims[0], abs=1e-6)
+
+
+def test_top_k_returns_best_first():
+    """top_k returns the k highest scores in descending order"""
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3])
+
+    idx, best = top_k(scores, 3)
+
+    assert idx.tolist() == [1, 3, 2]
+    assert best.tolist() == [0.9, 0.7, 0.5]
+    assert top_k(scores, 10)[0].shape == (5,)
+    assert top_k(scores, 0)[0].shape == (0,)
+
+
+def test_vector_to_string_format():
+    """pgvector text format is preserved for lists and arrays"""
+    assert vector_to_string([0.1, 0.2, 0.3]) == '[0.1,0.2,0.3]'
+    assert vector_to_string(np.array([0.5, 1.0])) == '[0.5,1.0]'
+
+
+def test_vector_to_string_accepts_numpy_scalars():
+    """float32 arrays and lists of np.float32 (kernel outputs) serialize"""
+    assert vector_to_string(np.array([0.5, 1.0], dtype=np.float32)) == '[0.5,1.0]'
+    assert vector_to_string([np.float32(0.25), np.float32(-2.0)]) == '[0.25,-2.0]'
+
+
+def test_vector_to_string_compact_round_trips_float32():
+    """Compact form keeps exactly the float32 values pgvector stores"""
+    vec = np.random.default_rng(1).standard_normal(256)
+    text = vector_to_string(vec, compact=True)
+    assert len(text) < len(vector_to_string(vec))
+    assert np.array_equal(np.array(json.loads(text), dtype=np.float32), vec.astype(np.float32))
+
+
+def test_truncate_embeddings_keeps_prefix_unit_length():
+    """Matryoshka truncation keeps the leading dims and re-normalizes"""
+    rng = np.random.default_rng(0)
+    vectors = normalize_matrix(rng.standard_normal((4, 1536)).astype(np.float32))
+
+    reduced = truncate_embeddings(vectors, 256)
+
+    assert reduced.shape == (4, 256)
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(reduced, normalize_matrix(vectors[:, :256]))
+    with pytest.raises(ValueError):
+        truncate_embeddings(reduced, 512)
+
+
+def test_configured_dimensions(monkeypatch):
+    """EMBEDDING_DIMENSIONS drives validation; unsupported sizes are rejected"""
+    assert get_embedding_dimensions() == 1536
+    monkeypatch.setenv('EMBEDDING_DIMENSIONS', '512')
+    assert validate_vector_dimensions([0.0] * 512)
+    assert not validate_vector_dimensions([0.0] * 1536)
+    monkeypatch.setenv('EMBEDDING_DIMENSIONS', '300')
+    with pytest.raises(ValueError):
+        get_embedding_dimensions()
+
+
+def test_cache_key_keeps_legacy_full_size_key():
+    """Full-size rows keep the bare hash; reduced sizes get a suffix"""
+    assert cache_key('abc', 1536) == 'abc'
+    assert cache_key('abc', 256) == 'abc:256'
@@ -0,0 +1,156 @@
+"""
+Phase 3: Token Counting
+
+Pluggable tokenizers for chunk sizing and context budgets:
+- HeuristicTokenizer: chars / 4 (no dependencies, approximate)
+- TiktokenTokenizer: exact counts via the optional tiktoken package
+- BPETokenizer (utils.bpe_tokenizer): exact counts from a local rank file
+
+CachedTokenCounter wraps any of them with an LRU of counts keyed by text
+hash, so chunks seen again (re-ingestion, repeated RAG results) are
+never re-tokenized.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable, List, Optional
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class Tokenizer(ABC):
+    """Counts tokens in text."""
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """Token counts for several texts (override for batch backends)."""
+        return [self.count(text) for text in texts]
+
+
+class HeuristicTokenizer(Tokenizer):
+    """Approximate counts (chars / 4), the historical estimate."""
+
+    def count(self, text: str) -> int:
+        return max(1, len(text) // 4) if text else 0
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts with tiktoken (raises ImportError if not installed)."""
+
+    def __init__(self, encoding_name: str = 'cl100k_base'):
+        import tiktoken
+
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        return [len(ids) for ids in self.encoding.encode_ordinary_batch(list(texts))]
+
+
+class CachedTokenCounter(Tokenizer):
+    """Thread-safe LRU of token counts in front of a tokenizer."""
+
+    def __init__(self, tokenizer: Tokenizer, max_entries: int = 100_000):
+        """
+        Args:
+            tokenizer: Backing tokenizer
+            max_entries: Counts kept (16-byte key + int each)
+        """
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def count(self, text: str) -> int:
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        Counts for texts; cache misses go to the tokenizer in one batch.
+        """
+        texts = list(texts)
+        keys = [self._key(text) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._entries.get(key)
+                if cached is None:
+                    missing.setdefault(key, i)
+                    continue
+                self._entries.move_to_end(key)
+                counts[i] = cached
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            fresh = dict(zip(
+                missing,
+                self.tokenizer.count_many(texts[i] for i in missing.values())
+            ))
+            with self._lock:
+                for key, value in fresh.items():
+                    self._entries[key] = value
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            counts = [fresh[k] if c is None else c for k, c in zip(keys, counts)]
+
+        return counts
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'tokenizer': type(self.tokenizer).__name__,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+def load_tokenizer() -> Tokenizer:
+    """
+    Best available tokenizer.
+
+    TOKENIZER_BPE_FILE (a tiktoken rank file) selects the local BPE;
+    otherwise tiktoken with TOKENIZER_ENCODING (default cl100k_base);
+    otherwise the chars / 4 heuristic.
+    """
+    ranks_file = os.getenv('TOKENIZER_BPE_FILE')
+    if ranks_file:
+        from utils.bpe_tokenizer import BPETokenizer
+
+        return BPETokenizer.from_tiktoken_file(ranks_file)
+    try:
+        return TiktokenTokenizer(os.getenv('TOKENIZER_ENCODING', 'cl100k_base'))
+    except Exception as e:
+        logger.info(f"Exact tokenizer unavailable, using chars/4 heuristic: {e}")
+        return HeuristicTokenizer()
+
+
+_shared_counter: Optional[CachedTokenCounter] = None
+
+
+def get_shared_token_counter() -> CachedTokenCounter:
+    """Process-wide cached counter used by the chunker and context builder."""
+    global _shared_counter
+    if _shared_counter is None:
+        _shared_counter = CachedTokenCounter(load_tokenizer())
+    return _shared_counter
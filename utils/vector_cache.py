@@ -0,0 +1,124 @@
+"""
+Phase 3: In-Process Vector Cache
+
+Bounded LRU cache of embeddings stored as float32 arrays.
+Used as the L1 tier in front of the Supabase embedding_cache table.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Optional, Sequence, Union
+import json
+import os
+
+import numpy as np
+
+
+VectorLike = Union[Sequence[float], np.ndarray, str]
+
+
+def to_float32(vec: VectorLike) -> np.ndarray:
+    """
+    Convert a vector to a compact float32 array.
+
+    Accepts Python lists, NumPy arrays, or pgvector text ('[0.1,0.2]')
+    as returned by PostgREST.
+    """
+    if isinstance(vec, str):
+        vec = json.loads(vec)
+    return np.asarray(vec, dtype=np.float32)
+
+
+class VectorLRUCache:
+    """Thread-safe LRU cache of float32 vectors with a byte budget."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Memory budget for stored vectors (0 disables)
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return vector for key (marks it most recently used)."""
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the cached subset of keys."""
+        found = {}
+        for key in keys:
+            vec = self.get(key)
+            if vec is not None:
+                found[key] = vec
+        return found
+
+    def put(self, key: str, vec: VectorLike):
+        """Store vector, evicting least recently used entries as needed."""
+        arr = to_float32(vec)
+        if arr.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self._entries[key] = arr
+            self.current_bytes += arr.nbytes
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory usage."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+_shared_cache: Optional[VectorLRUCache] = None
+
+
+def get_shared_vector_cache() -> VectorLRUCache:
+    """
+    Process-wide cache shared by all EmbeddingService instances.
+
+    Budget comes from EMBEDDING_L1_CACHE_MB (default 64).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        budget_mb = int(os.getenv('EMBEDDING_L1_CACHE_MB', '64'))
+        _shared_cache = VectorLRUCache(max_bytes=budget_mb * 1024 * 1024)
+    return _shared_cache
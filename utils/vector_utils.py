@@ -2,10 +2,89 @@
 Phase 3: Vector Utilities
 
 Helper functions for pgvector operations.
+Matrix kernels operate on float32 NumPy arrays; the single-vector
+functions are thin wrappers over them.
 """
 
-from typing import List
-import math
+from typing import List, Optional, Sequence, Tuple, Union
+import json
+
+import numpy as np
+
+from utils.embedding_dimensions import get_embedding_dimensions
+
+
+VectorLike = Union[Sequence[float], np.ndarray]
+
+
+def as_matrix(vectors) -> np.ndarray:
+    """
+    Convert a vector or list of vectors to a 2-D matrix.
+    
+    Float arrays keep their dtype; anything else becomes float32.
+    """
+    if isinstance(vectors, np.ndarray) and vectors.dtype.kind == 'f':
+        matrix = vectors
+    else:
+        matrix = np.asarray(vectors, dtype=np.float32)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def normalize_matrix(matrix) -> np.ndarray:
+    """
+    Normalize every row to unit length (zero rows stay zero).
+    
+    Args:
+        matrix: N×D vectors
+        
+    Returns:
+        N×D matrix
+    """
+    matrix = as_matrix(matrix)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def cosine_similarity_many(query: VectorLike, matrix) -> np.ndarray:
+    """
+    Cosine similarity of one query against N vectors.
+    
+    Returns:
+        Array of N scores
+    """
+    return cosine_similarity_matrix(query, matrix)[0]
+
+
+def cosine_similarity_matrix(a, b) -> np.ndarray:
+    """
+    Pairwise cosine similarity.
+    
+    Args:
+        a: N×D vectors
+        b: M×D vectors
+        
+    Returns:
+        N×M similarity matrix
+    """
+    a, b = as_matrix(a), as_matrix(b)
+    if a.shape[1] != b.shape[1]:
+        raise ValueError(f"Vector dimension mismatch: {a.shape[1]} vs {b.shape[1]}")
+    return normalize_matrix(a) @ normalize_matrix(b).T
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and scores of the k highest scores, best first.
+    
+    Uses argpartition, so cost is O(N + k log k) rather than a full sort.
+    """
+    scores = np.asarray(scores)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), scores[:0]
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx], kind='stable')]
+    return idx, scores[idx]
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -22,18 +101,8 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     if len(vec1) != len(vec2):
         raise ValueError(f"Vector dimension mismatch: {len(vec1)} vs {len(vec2)}")
     
-    # Dot product
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    
-    # Magnitudes
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
-    
-    # Cosine similarity
-    if magnitude1 == 0 or magnitude2 == 0:
-        return 0.0
-    
-    return dot_product / (magnitude1 * magnitude2)
+    pair = np.asarray([vec1, vec2], dtype=np.float64)
+    return float(cosine_similarity_many(pair[0], pair[1:])[0])
 
 
 def normalize_vector(vec: List[float]) -> List[float]:
@@ -46,39 +115,54 @@ def normalize_vector(vec: List[float]) -> List[float]:
     Returns:
         Normalized vector (magnitude = 1)
     """
-    magnitude = math.sqrt(sum(x * x for x in vec))
-    
-    if magnitude == 0:
-        return vec
-    
-    return [x / magnitude for x in vec]
+    return normalize_matrix(np.asarray(vec, dtype=np.float64))[0].tolist()
 
 
-def vector_to_string(vec: List[float]) -> str:
+def vector_to_string(vec: VectorLike, compact: bool = False) -> str:
     """
     Convert vector to PostgreSQL array string format.
     
+    Serialized by the C JSON encoder rather than per-element str().
+    
     Args:
-        vec: Vector as list of floats
+        vec: Vector as list of floats or NumPy array
+        compact: Shortest float32 digits (pgvector stores float4, so
+            nothing is lost; ~45% smaller than float64 text)
         
     Returns:
-        String like '[0.1, 0.2, 0.3]'
+        String like '[0.1,0.2,0.3]'
     """
-    return '[' + ','.join(str(x) for x in vec) + ']'
+    if compact:
+        return '[' + ','.join(np.asarray(vec, dtype=np.float32).astype(str)) + ']'
+    return json.dumps(np.asarray(vec, dtype=float).tolist(), separators=(',', ':'))
 
 
-def validate_vector_dimensions(vec: List[float], expected: int = 1536) -> bool:
+def validate_vector_dimensions(vec: List[float], expected: Optional[int] = None) -> bool:
     """
     Validate vector has expected dimensions.
     
     Args:
         vec: Vector to validate
-        expected: Expected dimension count (default 1536 for OpenAI)
+        expected: Expected dimension count (default: configured
+            EMBEDDING_DIMENSIONS, 1536 unless reduced)
         
     Returns:
         True if valid, False otherwise
     """
-    return len(vec) == expected
+    return len(vec) == (expected or get_embedding_dimensions())
+
+
+def truncate_embeddings(vectors, dimensions: int) -> np.ndarray:
+    """
+    Shorten Matryoshka embeddings: keep the first dimensions, re-normalize.
+    
+    Raises:
+        ValueError: If the vectors are shorter than dimensions
+    """
+    matrix = as_matrix(vectors)
+    if matrix.shape[1] < dimensions:
+        raise ValueError(f"Cannot truncate {matrix.shape[1]}d vectors to {dimensions}d")
+    return normalize_matrix(matrix[:, :dimensions])
 
 
 def calculate_storage_size(num_vectors: int, dimensions: int = 1536) -> dict: